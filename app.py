@@ -2,22 +2,35 @@
 Flask Web Interface for Agentcore Memory Demo
 """
 
+import atexit
 import os
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from dotenv import load_dotenv
-from core import MemoryManager, KnightAgent
+from core import ChatService, MemoryUnavailableError, SESSION_COOKIE, SESSION_HEADER, METRICS_CONTENT_TYPE
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 
-# Initialize memory and agent
-memory_manager = MemoryManager(
-    stm_max_tokens=int(os.getenv("STM_MAX_TOKENS", 200)),
-    collection_name=os.getenv("LTM_COLLECTION_NAME", "knight_memories")
-)
-agent = KnightAgent(memory_manager)
+# Initialize memory and agent; LTM and the agent are shared, STM is per session
+service = ChatService.from_env()
+atexit.register(service.close)
+service.install_reload_signal()
+
+
+def get_session_id() -> str:
+    """Resolve the caller's session from header or cookie, starting a new one if absent"""
+    return service.resolve_session_id(
+        request.headers.get(SESSION_HEADER),
+        request.cookies.get(SESSION_COOKIE)
+    )
+
+
+def with_session(response, session_id: str):
+    """Attach the session cookie to a response"""
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite='Lax')
+    return response
 
 
 @app.route('/')
@@ -37,20 +50,14 @@ def chat():
             return jsonify({'error': 'No message provided'}), 400
         
         # Process message
-        response_data = agent.process_message(user_message)
-        
-        # Get memory stats
-        stats = agent.get_memory_stats()
-        
-        return jsonify({
-            'response': response_data['response'],
-            'stm_text': response_data.get('stm_text', ''),
-            'ltm_text': response_data.get('ltm_text', ''),
-            'has_stm': response_data.get('has_stm', False),
-            'has_ltm': response_data.get('has_ltm', False),
-            'stats': stats
-        })
+        session_id = get_session_id()
+        result = service.chat(session_id, user_message)
+        response = jsonify(result)
+        response.headers.update(service.timing_headers(result))
+        return with_session(response, session_id)
     
+    except (MemoryUnavailableError, ConnectionError) as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -58,26 +65,35 @@ def chat():
 @app.route('/api/greeting', methods=['GET'])
 def greeting():
     """Get initial greeting"""
-    return jsonify({
-        'greeting': agent.get_greeting(),
-        'stats': agent.get_memory_stats()
-    })
+    session_id = get_session_id()
+    return with_session(jsonify(service.greeting(session_id)), session_id)
 
 
 @app.route('/api/stats', methods=['GET'])
 def stats():
     """Get memory statistics"""
-    return jsonify(agent.get_memory_stats())
+    session_id = get_session_id()
+    return with_session(jsonify(service.stats(session_id)), session_id)
+
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Report whether embeddings and LTM are loaded"""
+    readiness = service.readiness()
+    return jsonify(readiness), 200 if readiness['ready'] else 503
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Expose latency histograms and gauges for Prometheus"""
+    return Response(service.metrics(), content_type=METRICS_CONTENT_TYPE)
 
 
 @app.route('/api/reset', methods=['POST'])
 def reset():
     """Reset short-term memory"""
-    agent.memory.clear_stm()
-    return jsonify({
-        'message': 'Short-term memory cleared',
-        'stats': agent.get_memory_stats()
-    })
+    session_id = get_session_id()
+    return with_session(jsonify(service.reset(session_id)), session_id)
 
 
 if __name__ == '__main__':
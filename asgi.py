@@ -0,0 +1,151 @@
+"""
+ASGI Web Interface for Agentcore Memory Demo
+Same API as app.py; every service call (embedding, index search, memory service RPCs) runs off the event loop
+
+Run with: uvicorn asgi:app --port 8000
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response
+from starlette.routing import Route
+from dotenv import load_dotenv
+from core import ChatService, MemoryUnavailableError, SESSION_COOKIE, SESSION_HEADER, METRICS_CONTENT_TYPE
+
+# Load environment variables
+load_dotenv()
+
+# Initialize memory and agent; LTM and the agent are shared, STM is per session
+service = ChatService.from_env()
+
+# CPU-bound work (SentenceTransformer inference, FAISS search) runs on a fixed
+# pool; a semaphore (app.state.pending, made in lifespan on the serving loop)
+# caps queued calls so a burst cannot grow memory unboundedly
+WORKER_THREADS = int(os.getenv('ASGI_WORKER_THREADS', 4))
+MAX_PENDING = int(os.getenv('ASGI_MAX_PENDING', 256))
+executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix='agentcore')
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'index.html'), encoding='utf-8') as f:
+    INDEX_HTML = f.read()
+
+
+async def run_in_executor(func, *args):
+    """Run blocking work on the bounded pool without blocking the event loop"""
+    async with app.state.pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args))
+
+
+def get_session_id(request: Request) -> str:
+    """Resolve the caller's session from header or cookie, starting a new one if absent"""
+    return service.resolve_session_id(
+        request.headers.get(SESSION_HEADER),
+        request.cookies.get(SESSION_COOKIE)
+    )
+
+
+def with_session(response: JSONResponse, session_id: str) -> JSONResponse:
+    """Attach the session cookie to a response"""
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite='lax')
+    return response
+
+
+async def index(request: Request):
+    """Render main page"""
+    return HTMLResponse(INDEX_HTML)
+
+
+async def chat(request: Request):
+    """Handle chat messages"""
+    try:
+        data = await request.json()
+        user_message = data.get('message', '')
+        
+        if not user_message:
+            return JSONResponse({'error': 'No message provided'}, status_code=400)
+        
+        # Process message
+        session_id = get_session_id(request)
+        result = await run_in_executor(service.chat, session_id, user_message)
+        return with_session(JSONResponse(result, headers=service.timing_headers(result)), session_id)
+    
+    except (MemoryUnavailableError, ConnectionError) as e:
+        return JSONResponse({'error': str(e)}, status_code=503)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+async def greeting(request: Request):
+    """Get initial greeting"""
+    session_id = get_session_id(request)
+    return with_session(JSONResponse(await run_in_executor(service.greeting, session_id)), session_id)
+
+
+async def stats(request: Request):
+    """Get memory statistics"""
+    session_id = get_session_id(request)
+    return with_session(JSONResponse(await run_in_executor(service.stats, session_id)), session_id)
+
+
+async def ready(request: Request):
+    """Report whether embeddings and LTM are loaded"""
+    readiness = await run_in_executor(service.readiness)
+    return JSONResponse(readiness, status_code=200 if readiness['ready'] else 503)
+
+
+async def metrics(request: Request):
+    """Expose latency histograms and gauges for Prometheus"""
+    return Response(await run_in_executor(service.metrics), media_type=METRICS_CONTENT_TYPE)
+
+
+async def reset(request: Request):
+    """Reset short-term memory"""
+    session_id = get_session_id(request)
+    return with_session(JSONResponse(await run_in_executor(service.reset, session_id)), session_id)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Hot-swap LTM on SIGHUP; finish in-flight turns and flush long-term memory on shutdown"""
+    # Created here, not at import: before Python 3.10 asyncio primitives bind to the loop current at creation
+    app.state.pending = asyncio.BoundedSemaphore(MAX_PENDING)
+    service.install_reload_signal()
+    yield
+    executor.shutdown(wait=True)
+    service.close()
+
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/api/chat', chat, methods=['POST']),
+        Route('/api/greeting', greeting, methods=['GET']),
+        Route('/api/stats', stats, methods=['GET']),
+        Route('/api/ready', ready, methods=['GET']),
+        Route('/api/metrics', metrics, methods=['GET']),
+        Route('/api/reset', reset, methods=['POST'])
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    
+    port = int(os.getenv('ASGI_PORT', 8000))
+    print(f"""
+╔═══════════════════════════════════════════════════════════╗
+║     AGENTCORE MEMORY DEMO - ASGI INTERFACE                ║
+║     Knight of the Seven Kingdoms                          ║
+║     ACD Ahmedabad 2026                                    ║
+╚═══════════════════════════════════════════════════════════╝
+
+Server running at: http://localhost:{port}
+    """)
+    
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,171 @@
+"""
+Core Micro-benchmarks for Agentcore Demo
+Times LTM writes, bulk ingest, retrieval by collection size, STM updates and full agent turns
+
+Run with: python -m benchmarks.bench_core --output results.json
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from core import MemoryManager, KnightAgent
+from core.ltm_index import DEFAULT_INDEX_SPEC
+
+from .common import synthetic_memories, synthetic_queries, summarize, measure, scratch_dir, write_results
+
+# Load environment variables
+load_dotenv()
+
+
+def make_manager(args, name: str, **overrides) -> MemoryManager:
+    """MemoryManager for one benchmark, with the query cache off so every search is timed"""
+    settings = {
+        "collection_name": name,
+        "embedding_backend": args.backend,
+        "index_spec": args.index_spec,
+        "fsync_policy": args.fsync_policy,
+        "query_cache_size": 0,
+        "compact_every": 10 ** 9  # Keep snapshot rewrites out of the timings
+    }
+    settings.update(overrides)
+    return MemoryManager(**settings)
+
+
+def bench_ltm_writes(args, results: Dict):
+    """Single add_to_ltm calls and a streamed bulk ingest"""
+    memory = make_manager(args, "bench_writes")
+    memories = list(synthetic_memories(args.iterations + 3, seed=10))
+    results["ltm.add_to_ltm"] = measure(
+        lambda i: memory.add_to_ltm(memories[i]["content"], memories[i]["category"], memories[i]["importance"]),
+        args.iterations
+    )
+    memory.close()
+    
+    memory = make_manager(args, "bench_ingest")
+    report = memory.add_many_to_ltm(synthetic_memories(args.ingest_size, seed=11))
+    results["ltm.bulk_ingest"] = {
+        "count": report["added"],
+        "seconds": report["seconds"],
+        "ops_per_sec": report["memories_per_sec"]
+    }
+    memory.close()
+
+
+def bench_ltm_retrieval(args, results: Dict):
+    """retrieve_from_ltm, unfiltered and category-filtered, at each collection size"""
+    queries = synthetic_queries(args.iterations + 3)
+    for size in args.sizes:
+        memory = make_manager(args, f"bench_retrieve_{size}")
+        start = time.perf_counter()
+        memory.add_many_to_ltm(synthetic_memories(size, seed=size), batch_size=512)
+        if memory._migrate_thread is not None:
+            memory._migrate_thread.join()  # Time the index_spec backend, not Flat during its build
+        setup_seconds = time.perf_counter() - start
+        
+        results[f"ltm.retrieve[{size}]"] = {
+            **measure(lambda i: memory.retrieve_from_ltm(queries[i], n_results=3), args.iterations),
+            "setup_seconds": setup_seconds
+        }
+        results[f"ltm.retrieve_filtered[{size}]"] = measure(
+            lambda i: memory.retrieve_from_ltm(queries[i], n_results=3, category="values", min_importance=5),
+            args.iterations
+        )
+        
+        # Query embedding excluded: index search, filtering and metadata lookup only
+        embeddings = memory._encode(queries)
+        results[f"ltm.search[{size}]"] = measure(
+            lambda i: memory.retrieve_from_ltm(queries[i], n_results=3, query_embedding=embeddings[i]),
+            args.iterations
+        )
+        memory.close()
+
+
+def bench_stm(args, results: Dict):
+    """add_to_stm with eviction and bulk _manage_stm_size at each window size"""
+    messages = [memory["content"] for memory in synthetic_memories(1000, seed=20, words=24)]
+    for window in args.windows:
+        memory = make_manager(args, "bench_stm", stm_max_tokens=window)
+        
+        # Fill the window so every timed add also evicts
+        for content in messages:
+            memory.add_to_stm("user", content)
+        results[f"stm.add_to_stm[{window}]"] = measure(
+            lambda i: memory.add_to_stm("user", messages[i % len(messages)]),
+            args.iterations
+        )
+        
+        # Halve the budget, then time trimming the full window back down
+        samples = []
+        for _ in range(max(args.iterations // 10, 5)):
+            memory.stm.max_tokens = window
+            for content in messages[:window // 20 + 1]:
+                memory.add_to_stm("user", content)
+            memory.stm.max_tokens = window // 2
+            start = time.perf_counter()
+            memory._manage_stm_size()
+            samples.append(time.perf_counter() - start)
+        results[f"stm.manage_stm_size[{window}]"] = summarize(samples)
+        memory.close()
+
+
+def bench_agent(args, results: Dict):
+    """KnightAgent.process_message over the persona's core memories, with per-stage timings"""
+    memory = make_manager(args, "bench_agent", stm_max_tokens=2000)
+    agent = KnightAgent(memory)
+    queries = synthetic_queries(args.iterations + 3, seed=30)
+    
+    stages: Dict[str, List[float]] = {}
+    
+    def turn(i: int):
+        response = agent.process_message(queries[i])
+        for stage, ms in response["timings_ms"].items():
+            stages.setdefault(stage, []).append(ms / 1000.0)
+    
+    results["agent.process_message"] = measure(turn, args.iterations)
+    for stage, samples in stages.items():
+        results[f"agent.stage.{stage}"] = summarize(samples[-args.iterations:])
+    memory.close()
+
+
+BENCHMARKS = {
+    "ltm_writes": bench_ltm_writes,
+    "ltm_retrieval": bench_ltm_retrieval,
+    "stm": bench_stm,
+    "agent": bench_agent
+}
+
+
+def main():
+    """Run the selected benchmarks and write JSON results"""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the memory core")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--sizes", default="1000,100000",
+                        help="Comma-separated LTM sizes for retrieval (add 1000000 for the full run)")
+    parser.add_argument("--windows", default="200,2000,20000", help="Comma-separated STM token budgets")
+    parser.add_argument("--ingest-size", type=int, default=10000, help="Memories in the bulk-ingest benchmark")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed operations per benchmark")
+    parser.add_argument("--backend", default="hash",
+                        help="Embedding backend (default: the offline hash stub; torch for real model cost)")
+    parser.add_argument("--index-spec", default=DEFAULT_INDEX_SPEC, help="FAISS index spec")
+    parser.add_argument("--fsync-policy", default="always", help="LTM write-ahead log fsync policy")
+    parser.add_argument("--output", help="JSON results file (default: print to stdout)")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    args.windows = [int(window) for window in args.windows.split(",")]
+    
+    results: Dict[str, Dict] = {}
+    with scratch_dir():
+        for name in args.only or BENCHMARKS:
+            start = time.perf_counter()
+            BENCHMARKS[name](args, results)
+            print(f"✓ {name} ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+    
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results("core", results, args.output, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark Helpers for Agentcore Demo
+Synthetic data, timing statistics and comparable JSON results
+"""
+
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Iterator
+import tempfile
+
+import numpy as np
+
+
+CATEGORIES = ("identity", "relationship", "experience", "values", "knowledge", "conversation")
+WORDS = (
+    "knight honor duty squire egg sword shield horse thunder tourney ashford trial seven prince "
+    "baelor arlan pennytree hedge road kingdom castle lord lady smallfolk battle oath banner "
+    "falling star elm sunset tall flea bottom dragon silver hair maester inn river bridge"
+).split()
+
+
+def synthetic_memories(count: int, seed: int = 0, words: int = 16) -> Iterator[Dict]:
+    """Reproducible random memories"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "content": f"Memory {i}: " + " ".join(rng.choice(WORDS) for _ in range(words)),
+            "category": rng.choice(CATEGORIES),
+            "importance": rng.randint(1, 10)
+        }
+
+
+def synthetic_queries(count: int, seed: int = 1, words: int = 6) -> List[str]:
+    """Reproducible random queries"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(words)) for _ in range(count)]
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Latency percentiles (ms) and throughput for per-operation samples in seconds"""
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    total = float(values.sum()) / 1000.0
+    return {
+        "count": len(samples),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "ops_per_sec": len(samples) / total if total else 0.0
+    }
+
+
+def measure(operation: Callable[[int], None], iterations: int, warmup: int = 3) -> Dict:
+    """Time operation(i) for each iteration after a few untimed warm-up calls"""
+    for i in range(warmup):
+        operation(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+@contextmanager
+def scratch_dir() -> Iterator[str]:
+    """Run inside a temporary directory so LTM collections never touch the working tree"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="agentcore-bench-") as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(previous)
+
+
+def git_commit() -> Optional[str]:
+    """Commit of the checked-out tree, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(suite: str, results: Dict[str, Dict], path: Optional[str], config: Optional[Dict] = None) -> Dict:
+    """Wrap results with run metadata and write them as JSON (stdout if path is None)"""
+    report = {
+        "suite": suite,
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count()
+        },
+        "config": config or {},
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✓ Results written to {path}")
+    else:
+        print(text)
+    return report
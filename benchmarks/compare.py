@@ -0,0 +1,87 @@
+"""
+Benchmark Comparison for Agentcore Demo
+Diffs two JSON result files and fails on regressions beyond a tolerance
+
+Run with: python -m benchmarks.compare baseline.json candidate.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Dict
+
+
+# Metric per result, lower is better unless listed in HIGHER_IS_BETTER
+LATENCY_METRIC = "p50_ms"
+THROUGHPUT_METRICS = ("requests_per_sec", "ops_per_sec")
+HIGHER_IS_BETTER = set(THROUGHPUT_METRICS)
+
+
+def pick_metric(result: Dict, metric: str) -> str:
+    """The metric to compare for one result entry"""
+    if metric in result:
+        return metric
+    for fallback in (LATENCY_METRIC,) + THROUGHPUT_METRICS:
+        if fallback in result:
+            return fallback
+    return ""
+
+
+def compare(baseline: Dict, candidate: Dict, metric: str, tolerance: float, noise_floor_ms: float = 0.0) -> List[Dict]:
+    """Per-benchmark change between two reports; regressions are beyond the tolerance
+
+    Latencies below noise_floor_ms in both reports never count as regressions.
+    """
+    rows = []
+    for name in sorted(set(baseline["results"]) & set(candidate["results"])):
+        before, after = baseline["results"][name], candidate["results"][name]
+        key = pick_metric(before, metric)
+        if not key or key not in after or not before[key]:
+            continue
+        change = (after[key] - before[key]) / before[key]
+        worse = -change if key in HIGHER_IS_BETTER else change
+        if key.endswith("_ms") and max(before[key], after[key]) < noise_floor_ms:
+            worse = 0.0
+        rows.append({
+            "name": name,
+            "metric": key,
+            "before": before[key],
+            "after": after[key],
+            "change": change,
+            "regression": worse > tolerance
+        })
+    return rows
+
+
+def main():
+    """Print the comparison and exit non-zero on any regression"""
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", help="Results from the reference commit")
+    parser.add_argument("candidate", help="Results from the commit under test")
+    parser.add_argument("--metric", default=LATENCY_METRIC,
+                        help="Metric to compare where present (default: p50_ms; throughput entries use their rate)")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown (0.15 = 15%%)")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.05,
+                        help="Ignore changes in latencies below this in both runs")
+    args = parser.parse_args()
+    
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    
+    rows = compare(baseline, candidate, args.metric, args.tolerance, args.noise_floor_ms)
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')} (tolerance {args.tolerance:.0%})")
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"  {row['name']:<40} {row['metric']:<17} {row['before']:>12.3f} -> {row['after']:>12.3f} "
+              f"{row['change']:+8.1%} {flag}")
+    
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        sys.exit(f"✗ {len(regressions)} regression(s)")
+    print(f"✓ No regressions across {len(rows)} benchmarks")
+
+
+if __name__ == "__main__":
+    main()
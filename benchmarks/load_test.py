@@ -0,0 +1,186 @@
+"""
+HTTP Load Generator for Agentcore Demo
+Drives /api/chat with concurrent sessions and reports latency percentiles and throughput
+
+Run against a running server:  python -m benchmarks.load_test --url http://localhost:5000
+Or start one for the run:      python -m benchmarks.load_test --serve asgi --output load.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Optional
+from urllib.parse import urlparse
+
+from .common import synthetic_queries, summarize, scratch_dir, write_results
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVE_PORTS = {"flask": 5055, "asgi": 8055}
+
+
+def start_server(kind: str, backend: str) -> subprocess.Popen:
+    """Start the Flask or ASGI app in the current (scratch) directory"""
+    env = {
+        **os.environ,
+        "EMBEDDING_BACKEND": backend,
+        "LTM_COLLECTION_NAME": "bench_load",
+        "FLASK_PORT": str(SERVE_PORTS["flask"]),
+        "FLASK_DEBUG": "False"
+    }
+    if kind == "flask":
+        command = [sys.executable, os.path.join(REPO_DIR, "app.py")]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "asgi:app", "--app-dir", REPO_DIR,
+                   "--port", str(SERVE_PORTS["asgi"]), "--log-level", "warning"]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(url: str, timeout: float, server: Optional[subprocess.Popen] = None) -> bool:
+    """Poll /api/ready until the server has loaded its memory systems"""
+    target = urlparse(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and (server is None or server.poll() is None):
+        try:
+            connection = http.client.HTTPConnection(target.hostname, target.port, timeout=5)
+            connection.request("GET", "/api/ready")
+            status = connection.getresponse().status
+            connection.close()
+            if status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+class Worker(threading.Thread):
+    def __init__(self, url: str, session_id: str, messages: List[str], deadline: Optional[float],
+                 requests: Optional[int]):
+        """One keep-alive connection sending one session's turns back to back"""
+        super().__init__(daemon=True)
+        self.target = urlparse(url)
+        self.session_id = session_id
+        self.messages = messages
+        self.deadline = deadline
+        self.requests = requests
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.server_ms: Dict[str, List[float]] = {}  # Stage timings reported by the server
+    
+    def _connect(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection(self.target.hostname, self.target.port, timeout=60)
+    
+    def run(self):
+        connection = self._connect()
+        sent = 0
+        while (self.requests is None or sent < self.requests) and \
+                (self.deadline is None or time.monotonic() < self.deadline):
+            body = json.dumps({"message": self.messages[sent % len(self.messages)]})
+            headers = {"Content-Type": "application/json", "X-Session-ID": self.session_id}
+            start = time.perf_counter()
+            try:
+                connection.request("POST", "/api/chat", body, headers)
+                response = connection.getresponse()
+                payload = response.read()
+                self.latencies.append(time.perf_counter() - start)
+                self.statuses[response.status] += 1
+                if response.status == 200:
+                    for stage, ms in json.loads(payload).get("timings_ms", {}).items():
+                        self.server_ms.setdefault(stage, []).append(ms / 1000.0)
+            except (OSError, http.client.HTTPException):
+                self.statuses["connection_error"] += 1
+                connection.close()
+                connection = self._connect()
+            sent += 1
+        connection.close()
+
+
+def run_load(url: str, concurrency: int, requests: Optional[int], duration: Optional[float]) -> Dict[str, Dict]:
+    """Run the workers and summarize client latency, throughput and server stage timings"""
+    messages = synthetic_queries(200, seed=40)
+    per_worker = -(-requests // concurrency) if requests else None
+    deadline = time.monotonic() + duration if duration else None
+    workers = [
+        Worker(url, f"bench-{i}", messages[i:] + messages[:i], deadline, per_worker)
+        for i in range(concurrency)
+    ]
+    
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies = [latency for worker in workers for latency in worker.latencies]
+    statuses = sum((worker.statuses for worker in workers), Counter())
+    ok = statuses.get(200, 0)
+    results = {
+        "http.chat": {
+            **(summarize(latencies) if latencies else {"count": 0}),
+            "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+            "ok": ok,
+            "errors": sum(statuses.values()) - ok,
+            "statuses": {str(status): count for status, count in statuses.items()},
+            "seconds": elapsed
+        }
+    }
+    
+    stages: Dict[str, List[float]] = {}
+    for worker in workers:
+        for stage, samples in worker.server_ms.items():
+            stages.setdefault(stage, []).extend(samples)
+    for stage, samples in stages.items():
+        results[f"http.server_stage.{stage}"] = summarize(samples)
+    return results
+
+
+def main():
+    """Generate load and write JSON results"""
+    parser = argparse.ArgumentParser(description="Load generator for /api/chat")
+    parser.add_argument("--url", help="Server base URL (default: the server started by --serve)")
+    parser.add_argument("--serve", choices=list(SERVE_PORTS),
+                        help="Start app.py (flask) or asgi.py (asgi) in a scratch directory for the run")
+    parser.add_argument("--backend", default="hash", help="Embedding backend for --serve (default: offline hash stub)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent sessions, one connection each")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a request count")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests before measuring")
+    parser.add_argument("--ready-timeout", type=float, default=300.0, help="Seconds to wait for /api/ready")
+    parser.add_argument("--output", help="JSON results file (default: print to stdout)")
+    args = parser.parse_args()
+    if not args.url and not args.serve:
+        parser.error("pass --url or --serve")
+    
+    output = os.path.abspath(args.output) if args.output else None
+    with scratch_dir():
+        server = start_server(args.serve, args.backend) if args.serve else None
+        url = args.url or f"http://127.0.0.1:{SERVE_PORTS[args.serve]}"
+        try:
+            if not wait_until_ready(url, args.ready_timeout, server):
+                sys.exit(f"Server at {url} did not become ready")
+            if args.warmup:
+                run_load(url, min(args.concurrency, args.warmup), args.warmup, None)
+            results = run_load(url, args.concurrency, None if args.duration else args.requests, args.duration)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    
+    chat = results["http.chat"]
+    print(f"✓ {chat['count']} requests, {chat['errors']} errors, {chat['requests_per_sec']:.1f} req/s, "
+          f"p50 {chat.get('p50_ms', 0):.1f} ms, p95 {chat.get('p95_ms', 0):.1f} ms, p99 {chat.get('p99_ms', 0):.1f} ms",
+          file=sys.stderr)
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results("http", results, output, config)
+
+
+if __name__ == "__main__":
+    main()
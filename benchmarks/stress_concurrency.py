@@ -0,0 +1,228 @@
+"""
+Concurrency Stress Test for Agentcore Demo
+Many searching threads, concurrent writers and hot swaps on one MemoryManager, checking every result for consistency
+
+Run with: python -m benchmarks.stress_concurrency --readers 16 --writers 2 --swappers 1 --seconds 10
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from typing import List, Dict
+
+from dotenv import load_dotenv
+from core import MemoryManager
+
+from .common import synthetic_memories, summarize, scratch_dir, write_results
+
+# Load environment variables
+load_dotenv()
+
+
+class Stress:
+    def __init__(self, memory: MemoryManager, stored: List[Dict], deadline: float):
+        """Shared state: memories known to be committed, and everything that went wrong"""
+        self.memory = memory
+        self.stored = stored  # Appended only after add_many_to_ltm returns
+        self.deadline = deadline
+        self.errors: List[str] = []
+        self.read_latencies: List[float] = []
+        self.write_latencies: List[float] = []
+        self.stm_operations = 0
+        self.swaps = 0
+        self._lock = threading.Lock()
+    
+    def fail(self, message: str):
+        with self._lock:
+            if len(self.errors) < 20:
+                self.errors.append(message)
+            else:
+                self.errors[-1] = f"... and more, last: {message}"
+    
+    def running(self) -> bool:
+        return time.monotonic() < self.deadline
+    
+    def reader(self, seed: int):
+        """Search for committed memories by their own text; each must come back as its own top hit"""
+        rng = random.Random(seed)
+        latencies = []
+        while self.running():
+            expected = self.stored[rng.randrange(len(self.stored))]
+            category = expected["category"] if rng.random() < 0.5 else None
+            start = time.perf_counter()
+            try:
+                results = self.memory.retrieve_from_ltm(expected["content"], n_results=3, category=category)
+            except Exception as e:
+                self.fail(f"retrieve raised {type(e).__name__}: {e}")
+                continue
+            latencies.append(time.perf_counter() - start)
+            
+            if not results or results[0]["content"] != expected["content"]:
+                found = results[0]["content"] if results else None
+                self.fail(f"searched {expected['content']!r}, top hit {found!r}")
+            for result in results:
+                if result["metadata"]["content"] != result["content"]:
+                    self.fail(f"result content and metadata disagree: {result['content']!r}")
+                if category is not None and result["metadata"]["category"] != category:
+                    self.fail(f"category filter {category!r} returned {result['metadata']['category']!r}")
+        with self._lock:
+            self.read_latencies.extend(latencies)
+    
+    def writer(self, writer_id: int, batch_size: int):
+        """Add batches of new memories; readers may search for them once the call returns"""
+        source = synthetic_memories(10 ** 9, seed=1000 + writer_id)
+        latencies = []
+        while self.running():
+            batch = [
+                {**memory, "content": f"Writer {writer_id} {memory['content']}"}
+                for memory in (next(source) for _ in range(batch_size))
+            ]
+            start = time.perf_counter()
+            try:
+                added = self.memory.add_many_to_ltm(batch, batch_size=batch_size)["added"]
+            except Exception as e:
+                self.fail(f"add_many_to_ltm raised {type(e).__name__}: {e}")
+                continue
+            latencies.append(time.perf_counter() - start)
+            if added != len(batch):
+                self.fail(f"writer {writer_id} added {added} of {len(batch)}")
+            self.stored.extend(batch)  # list.extend is atomic under the GIL
+        with self._lock:
+            self.write_latencies.extend(latencies)
+    
+    def stm_worker(self, seed: int):
+        """Add to and read the shared STM window, checking its token total against its messages"""
+        rng = random.Random(seed)
+        stm = self.memory.stm
+        operations = 0
+        while self.running():
+            try:
+                if rng.random() < 0.5:
+                    self.memory.add_to_stm("user", f"stm {seed} {operations}", tokens=rng.randint(1, 20))
+                else:
+                    window = self.memory.get_stm_context(recent=rng.randint(1, 10))
+                    if any("tokens" not in message for message in window):
+                        self.fail("STM returned a half-built message")
+            except Exception as e:
+                self.fail(f"STM raised {type(e).__name__}: {e}")
+            operations += 1
+        with self._lock:
+            self.stm_operations += operations
+        
+        with stm._lock:
+            total = sum(message["tokens"] for message in stm.messages)
+            if total != stm.tokens:
+                self.fail(f"STM token total {stm.tokens} but messages hold {total}")
+            if stm.tokens > stm.max_tokens and len(stm.messages) > 1:
+                self.fail(f"STM holds {stm.tokens} tokens over its {stm.max_tokens} budget")
+    
+    
+    def swapper(self, seed: int):
+        """Alternate reload_ltm() and rebuild_ltm() while the other threads read and write"""
+        rng = random.Random(seed)
+        swaps = 0
+        while self.running():
+            try:
+                if rng.random() < 0.5:
+                    self.memory.reload_ltm()
+                else:
+                    self.memory.rebuild_ltm()
+            except Exception as e:
+                self.fail(f"swap raised {type(e).__name__}: {e}")
+            swaps += 1
+        with self._lock:
+            self.swaps += swaps
+
+
+def check_final_state(stress: Stress, expected_total: int):
+    """Index, metadata and filter columns must all describe the same memories, including every committed one"""
+    memory = stress.memory
+    sizes = {
+        "index": memory.ltm_index.ntotal,
+        "metadata": len(memory.ltm_metadata),
+        "filters": memory.ltm_filters.size,
+        "expected": expected_total
+    }
+    if len(set(sizes.values())) != 1:
+        stress.fail(f"LTM sizes disagree: {sizes}")
+    
+    contents = {row["content"] for row in memory.ltm_metadata}
+    lost = [expected["content"] for expected in stress.stored if expected["content"] not in contents]
+    if lost:
+        stress.fail(f"{len(lost)} committed memories lost, e.g. {lost[0]!r}")
+
+
+def main():
+    """Run the stress test, print a summary and exit non-zero on any inconsistency"""
+    parser = argparse.ArgumentParser(description="Concurrent readers and writers against one MemoryManager")
+    parser.add_argument("--readers", type=int, default=16, help="Searching threads")
+    parser.add_argument("--writers", type=int, default=2, help="Writing threads")
+    parser.add_argument("--swappers", type=int, default=1, help="Threads alternating hot reloads and rebuilds")
+    parser.add_argument("--stm-threads", type=int, default=4, help="Threads sharing the STM window")
+    parser.add_argument("--seconds", type=float, default=10.0, help="How long to run")
+    parser.add_argument("--initial", type=int, default=5000, help="Memories stored before the threads start")
+    parser.add_argument("--batch-size", type=int, default=8, help="Memories per write")
+    parser.add_argument("--backend", default="hash", help="Embedding backend (default: the offline hash stub)")
+    parser.add_argument("--output", help="JSON results file (default: print to stdout)")
+    args = parser.parse_args()
+    
+    with scratch_dir():
+        memory = MemoryManager(
+            collection_name="stress",
+            embedding_backend=args.backend,
+            fsync_policy="never",
+            stm_max_tokens=500,
+            compact_every=10 ** 9
+        )
+        stored = list(synthetic_memories(args.initial, seed=7))
+        memory.add_many_to_ltm(stored, batch_size=512)
+        
+        stress = Stress(memory, list(stored), time.monotonic() + args.seconds)
+        threads = [threading.Thread(target=stress.reader, args=(i,)) for i in range(args.readers)]
+        threads += [threading.Thread(target=stress.writer, args=(i, args.batch_size)) for i in range(args.writers)]
+        threads += [threading.Thread(target=stress.swapper, args=(i,)) for i in range(args.swappers)]
+        threads += [threading.Thread(target=stress.stm_worker, args=(i,)) for i in range(args.stm_threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        
+        check_final_state(stress, len(stress.stored))
+        lock_stats = memory.get_ltm_stats()["ltm_lock"]
+        memory.close()
+    
+    results = {
+        "stress.retrieve": {
+            **summarize(stress.read_latencies),
+            "ops_per_sec": len(stress.read_latencies) / elapsed
+        },
+        "stress.add_many_to_ltm": {
+            **summarize(stress.write_latencies),
+            "ops_per_sec": len(stress.write_latencies) / elapsed
+        },
+        "stress.swaps": {"count": stress.swaps},
+        "stress.stm": {"count": stress.stm_operations, "ops_per_sec": stress.stm_operations / elapsed},
+        "stress.ltm_lock": lock_stats,
+        "stress.errors": {"count": len(stress.errors), "messages": stress.errors}
+    }
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results("stress", results, args.output, config)
+    
+    reads = results["stress.retrieve"]
+    print(f"{reads['count']} searches ({reads['ops_per_sec']:.0f}/s, p99 {reads['p99_ms']:.2f} ms), "
+          f"{results['stress.add_many_to_ltm']['count']} writes, {stress.swaps} reloads/rebuilds, "
+          f"{stress.stm_operations} STM operations, "
+          f"{len(stress.stored)} memories", file=sys.stderr)
+    if stress.errors:
+        for error in stress.errors:
+            print(f"  {error}", file=sys.stderr)
+        sys.exit(f"✗ {len(stress.errors)} consistency error(s)")
+    print("✓ No consistency errors", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
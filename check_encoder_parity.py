@@ -0,0 +1,76 @@
+"""
+Embedding Backend Parity Check
+Confirms a faster encoder backend retrieves the same top-k persona memories as the reference
+"""
+
+import argparse
+import json
+import sys
+from dotenv import load_dotenv
+from core import KNIGHT_PERSONA
+from core.encoders import EMBEDDING_BACKENDS, DEFAULT_EMBEDDING_MODEL, load_encoder, retrieval_parity
+
+# Load environment variables
+load_dotenv()
+
+# Demo questions plus one probe per persona topic
+QUERIES = [
+    "Who are you?",
+    "Do you remember your name?",
+    "Tell me about honor and duty",
+    "What do you know about trials?",
+    "Who is your squire?",
+    "Tell me about a battle you fought",
+    "Why did you fight in that battle?",
+    "What values guided your decision?",
+    "Tell me about your shield",
+    "Who knighted you?",
+    "Where did you grow up?",
+    "What happened at Ashford?",
+    "Tell me about Egg",
+    "How tall are you?",
+    "What is your horse called?",
+    "Do you fear death?",
+    "What do you think of lords and princes?",
+    "Who taught you to fight?",
+    "What is a hedge knight?",
+    "Tell me about Tanselle",
+    "Why do you protect the smallfolk?",
+    "Can you read?",
+    "What would you die for?",
+    "Tell me about the trial of seven"
+]
+
+
+def main():
+    """Run the parity check and exit non-zero if retrieval diverges"""
+    parser = argparse.ArgumentParser(description="Compare retrieval top-k of an embedding backend with the reference")
+    parser.add_argument("backend", choices=EMBEDDING_BACKENDS, help="Candidate embedding backend")
+    parser.add_argument("--reference", choices=EMBEDDING_BACKENDS, default="torch", help="Reference backend")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL, help="Sentence embedding model")
+    parser.add_argument("--onnx-dir", help="ONNX export directory (defaults to onnx_models/<model>)")
+    parser.add_argument("-k", type=int, default=3, help="Memories retrieved per query")
+    parser.add_argument("--min-match-rate", type=float, default=1.0,
+                        help="Fraction of queries whose top-k must match exactly")
+    args = parser.parse_args()
+    
+    corpus = [memory["content"] for memory in KNIGHT_PERSONA["core_memories"]]
+    queries = QUERIES + corpus  # Each memory should also find itself first
+    
+    reference = load_encoder(args.reference, args.model, args.onnx_dir)
+    candidate = load_encoder(args.backend, args.model, args.onnx_dir)
+    report = retrieval_parity(reference, candidate, corpus, queries, k=args.k)
+    
+    print(json.dumps(report, indent=2))
+    speedup = report["reference_seconds"] / max(report["candidate_seconds"], 1e-9)
+    print(f"\nTop-{report['k']} match rate: {report['top_k_match_rate']:.1%} over {report['queries']} queries "
+          f"(min cosine {report['min_cosine']:.4f}, {speedup:.2f}x encoding speed)")
+    
+    if report["top_k_match_rate"] < args.min_match_rate:
+        print(f"✗ {args.backend} diverges from {args.reference}")
+        sys.exit(1)
+    print(f"✓ {args.backend} matches {args.reference}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Offline Long-term Memory Compaction
+Removes near-duplicate memories, rebuilds the index and snapshot and reports space reclaimed
+
+Needs the collection to itself: stop the server (or memory service) that has it open first.
+"""
+
+import argparse
+import sys
+from dotenv import load_dotenv
+from core import MemoryManager, memory_settings_from_env
+
+# Load environment variables
+load_dotenv()
+
+
+def main():
+    """Deduplicate the collection and report what was removed"""
+    parser = argparse.ArgumentParser(description="Remove near-duplicate memories from long-term memory")
+    parser.add_argument("--similarity", type=float,
+                        help="Cosine similarity above which memories are duplicates (defaults to LTM_DEDUP_SIMILARITY)")
+    parser.add_argument("--collection", help="LTM collection (defaults to LTM_COLLECTION_NAME)")
+    parser.add_argument("--dry-run", action="store_true", help="Report duplicates without rewriting anything")
+    parser.add_argument("--reindex", metavar="SPEC",
+                        help="Also rebuild the index with this FAISS spec, e.g. HNSW32 or IVF1024,PQ16")
+    args = parser.parse_args()
+    
+    settings = memory_settings_from_env()
+    if args.collection:
+        settings["collection_name"] = args.collection
+    try:
+        memory_manager = MemoryManager(**settings)
+    except RuntimeError as e:
+        # Compacting under a live writer would delete log segments it is still appending to
+        sys.exit(f"✗ {e}\nStop the server or memory service before compacting")
+    
+    report = memory_manager.deduplicate_ltm(similarity=args.similarity, dry_run=args.dry_run)
+    rebuild = memory_manager.rebuild_ltm(args.reindex) if args.reindex and not args.dry_run else None
+    version = memory_manager.ltm_store.snapshot_version
+    memory_manager.close()
+    
+    action = "Would remove" if args.dry_run else "Removed"
+    print(f"✓ {action} {report['removed']} of {report['memories_before']} memories "
+          f"in {report['seconds']:.2f}s")
+    if not args.dry_run:
+        print(f"Disk usage: {report['bytes_before'] / 1e6:.2f} MB -> {report['bytes_after'] / 1e6:.2f} MB "
+              f"({report['bytes_reclaimed'] / 1e6:.2f} MB reclaimed)")
+        if rebuild is not None:
+            print(f"✓ Rebuilt index as {rebuild['ltm_index']} in {rebuild['seconds']:.2f}s")
+        print(f"Snapshot version {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,33 @@ Agentcore Memory Demo - Core Module
 """
 
 from .memory_manager import MemoryManager
+from .remote_memory import RemoteMemoryManager
+from .memory_service import MemoryService
 from .knight_persona import KNIGHT_PERSONA, get_system_prompt, get_initial_greeting
 from .agent import KnightAgent
+from .session_store import SessionMemory, SessionStore
+from .config import memory_settings_from_env, agent_settings_from_env, session_settings_from_env, \
+    remote_memory_settings_from_env
+from .chat_service import ChatService, MemoryUnavailableError, SESSION_COOKIE, SESSION_HEADER, \
+    METRICS_CONTENT_TYPE
 
 __all__ = [
     'MemoryManager',
+    'RemoteMemoryManager',
+    'MemoryService',
     'KnightAgent',
+    'SessionMemory',
+    'SessionStore',
+    'ChatService',
+    'MemoryUnavailableError',
+    'SESSION_COOKIE',
+    'SESSION_HEADER',
+    'METRICS_CONTENT_TYPE',
     'KNIGHT_PERSONA',
     'get_system_prompt',
-    'get_initial_greeting'
+    'get_initial_greeting',
+    'memory_settings_from_env',
+    'agent_settings_from_env',
+    'session_settings_from_env',
+    'remote_memory_settings_from_env'
 ]
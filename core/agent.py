@@ -2,148 +2,111 @@
 Agentcore - Main Agent with Memory Integration
 """
 
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 from .memory_manager import MemoryManager
-from .knight_persona import KNIGHT_PERSONA, get_system_prompt, get_initial_greeting
+from .knight_persona import KNIGHT_PERSONA, RESPONSE_TOPICS, DEFAULT_TOPIC, get_system_prompt, get_initial_greeting
+from .intent_router import IntentRouter
+from .turn_context import TurnContext
+from .context_builder import ContextBuilder
+from .metrics import TURN_METRIC, TURN_STAGE_METRIC
 
 
 class KnightAgent:
-    def __init__(self, memory_manager: MemoryManager):
-        """Initialize the Knight Agent"""
+    def __init__(self, memory_manager: MemoryManager, seed_core_memories: bool = True,
+                 context_max_tokens: int = 2000, context_recent: int = 5):
+        """Initialize the Knight Agent
+        
+        Pass seed_core_memories=False to defer initialize_core_memories(),
+        e.g. to run it during a background warm-up. The context for each
+        turn holds at most context_max_tokens tokens and context_recent
+        conversation turns.
+        """
         self.memory = memory_manager
         self.persona = KNIGHT_PERSONA
         self.system_prompt = get_system_prompt()
+        self.router = IntentRouter(RESPONSE_TOPICS, DEFAULT_TOPIC)
+        self.context_builder = ContextBuilder(
+            self.system_prompt,
+            lambda: self.memory.encoding,
+            max_tokens=context_max_tokens,
+            recent=context_recent
+        )
         
         # Initialize LTM with core memories
-        self._initialize_core_memories()
+        if seed_core_memories:
+            self.initialize_core_memories()
     
-    def _initialize_core_memories(self):
-        """Load core persona memories into LTM"""
-        for memory in self.persona["core_memories"]:
-            self.memory.add_to_ltm(
-                content=memory["content"],
-                category=memory["category"],
-                importance=memory["importance"]
-            )
+    def initialize_core_memories(self):
+        """Load core persona memories into LTM, skipping ones already stored"""
+        # Warm starts find every core memory already loaded from disk
+        missing = [
+            memory for memory in self.persona["core_memories"]
+            if not self.memory.has_memory(memory["content"], memory["category"])
+        ]
+        if missing:
+            self.memory.add_many_to_ltm(missing)
     
-    def process_message(self, user_message: str) -> Dict:
-        """Process user message and generate response with memory sources"""
-        # Add user message to STM
-        self.memory.add_to_stm("user", user_message)
+    def process_message(self, user_message: str, memory: Optional[MemoryManager] = None) -> Dict:
+        """Process user message and generate response with memory sources
         
-        # Retrieve relevant LTM
-        relevant_memories = self.memory.retrieve_from_ltm(user_message, n_results=3)
+        memory overrides the agent's own memory for this turn, e.g. a
+        per-session view that shares long-term memory. The turn runs as
+        tokenize -> embed -> retrieve -> route -> respond -> STM update;
+        each stage's output is computed once and shared through a
+        TurnContext, and the response carries per-stage timings.
+        """
+        turn = TurnContext(user_message, memory if memory is not None else self.memory)
         
-        # Build context
-        context = self._build_context(relevant_memories)
+        with turn.stage("tokenize"):
+            turn.tokens = turn.memory.count_tokens(user_message)
         
-        # Generate response (simplified - in production use LLM)
-        response_data = self._generate_response(user_message, context, relevant_memories)
-        
-        # Add response to STM
-        self.memory.add_to_stm("assistant", response_data["response"])
-        
-        return response_data
-    
-    def _build_context(self, relevant_memories: List[Dict]) -> str:
-        """Build context from STM and relevant LTM"""
-        context_parts = []
-        
-        # Add system prompt
-        context_parts.append(f"SYSTEM: {self.system_prompt}\n")
+        # One embedding per turn, reused by retrieval and consolidation
+        with turn.stage("embed"):
+            turn.embedding = turn.memory.encode_query(user_message)
         
-        # Add relevant long-term memories
-        if relevant_memories:
-            context_parts.append("RELEVANT MEMORIES:")
-            for mem in relevant_memories:
-                context_parts.append(f"- {mem['content']} (importance: {mem['metadata'].get('importance', 'N/A')})")
-            context_parts.append("")
+        with turn.stage("retrieve"):
+            turn.memories = turn.memory.retrieve_from_ltm(user_message, n_results=3, query_embedding=turn.embedding)
         
-        # Add recent conversation
-        context_parts.append("RECENT CONVERSATION:")
-        for msg in self.memory.get_stm_context()[-5:]:
-            context_parts.append(f"{msg['role'].upper()}: {msg['content']}")
+        with turn.stage("route"):
+            turn.topic = self.router.route(user_message)
         
-        return "\n".join(context_parts)
+        # Generate response (simplified - in production use LLM)
+        metrics = turn.memory.metrics
+        with turn.stage("respond"):
+            with metrics.stage("context_build"):
+                turn.context = self._build_context(turn)
+            with metrics.stage("response_generation"):
+                turn.response = self._generate_response(turn)
+        
+        with turn.stage("stm_update"):
+            turn.memory.add_to_stm("user", user_message, tokens=turn.tokens, embedding=turn.embedding)
+            turn.memory.add_to_stm("assistant", turn.response["response"])
+        
+        for stage, seconds in turn.timings.items():
+            metrics.observe(TURN_STAGE_METRIC, seconds, stage)
+        metrics.observe(TURN_METRIC, sum(turn.timings.values()))
+        
+        return {**turn.response, "memories": turn.memories, "timings_ms": turn.timings_ms()}
     
-    def _generate_response(self, user_message: str, context: str, memories: List[Dict]) -> Dict:
-        """Generate response based on context and memories with source tracking"""
+    def _build_context(self, turn: TurnContext) -> str:
+        """Build context from STM, the incoming message and relevant LTM within the token budget"""
+        # The incoming message joins STM after the response, so it takes one of the recent slots
+        conversation = turn.memory.get_stm_context(recent=self.context_builder.recent - 1)
+        context, turn.context_tokens = self.context_builder.build(
+            turn.memories, conversation, turn.message, turn.tokens
+        )
+        return context
+    
+    def _generate_response(self, turn: TurnContext) -> Dict:
+        """Generate response for the routed topic and retrieved memories with source tracking"""
         # This is a simplified response generator
-        # In production, this would call an LLM with the context
+        # In production, this would call an LLM with turn.context
+        topic = turn.topic
         
-        stm_parts = []  # Parts from short-term memory (conversation context)
+        stm_parts = [topic["response"]]  # Parts from short-term memory (conversation context)
         ltm_parts = []  # Parts from long-term memory (core memories)
-        
-        # Analyze user message for keywords
-        message_lower = user_message.lower()
-        
-        if any(word in message_lower for word in ["honor", "duty", "knight", "chivalry"]):
-            stm_parts.append("Aye, honor and duty are the foundation of knighthood. Ser Arlan taught me that a knight's worth is measured by his deeds, not his name or castle.")
-            if memories:
-                ltm_parts.append(f"I recall: {memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["egg", "aegon", "squire", "prince"]):
-            stm_parts.append("Ah, you speak of my squire, young Egg. He's a Targaryen prince, though he shaves his silver hair to hide it. He's clever and brave, and I'm proud to have him at my side.")
-            if memories:
-                ltm_parts.append(f"I remember: {memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["fight", "battle", "combat", "war"]):
-            stm_parts.append("I have seen my share of battles. War is not glorious - it's bloody and cruel. A knight must be ready to defend the innocent, but I take no joy in killing.")
-            if memories:
-                ltm_parts.append(f"I remember well: {memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["arlan", "master", "teacher"]):
-            stm_parts.append("Ser Arlan of Pennytree was the only father I ever knew. He found me in Flea Bottom and taught me everything about being a knight. He died on the road to Ashford, and I think of him every day.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["ashford", "tourney", "trial"]):
-            stm_parts.append("The Tourney at Ashford Meadow changed my life. I defended a puppeteer from Prince Aerion's cruelty and fought in a Trial of Seven. Prince Baelor Breakspear died saving me that day.")
-            if memories:
-                ltm_parts.append(f"I'll never forget: {memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["tall", "height", "size"]):
-            stm_parts.append("I'm nearly seven feet tall, which is how I got my name. My size helps in a fight, but it also means I can't hide in a crowd. People remember Dunk the Tall.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["shield", "sigil", "star", "elm"]):
-            stm_parts.append("My shield bears a falling star and an elm tree on a sunset field. The star is for the night Ser Arlan found me, and the elm for Pennytree, his home. Tanselle painted it for me at Ashford.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["flea bottom", "poor", "orphan", "lowborn"]):
-            stm_parts.append("I grew up in Flea Bottom, the poorest part of King's Landing. I was an orphan, surviving by my wits until Ser Arlan took me in. Those hard years taught me never to look down on the smallfolk.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["thunder", "horse", "destrier"]):
-            stm_parts.append("Thunder is my destrier, a chestnut stallion I inherited from Ser Arlan. He's old but strong, and he's carried me through many dangers. I care for him as Ser Arlan cared for me.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["baelor", "breakspear", "death"]):
-            stm_parts.append("Prince Baelor Breakspear was the finest knight I ever knew. He died in the Trial of Seven, struck by his own brother's mace while defending me. His death haunts me still.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["tanselle", "puppeteer", "love"]):
-            stm_parts.append("Tanselle Too-Tall was a puppeteer I met at Ashford. She was kind and talented, and I defended her from Prince Aerion's cruelty. She painted my shield for me. I think of her sometimes.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        elif any(word in message_lower for word in ["who are you", "tell me about yourself", "introduce"]):
-            stm_parts.append(get_initial_greeting())
-        
-        elif any(word in message_lower for word in ["hedge knight", "wandering", "travel"]):
-            stm_parts.append("I'm a hedge knight - we have no lands or keeps, just our honor and our swords. I've slept under hedges more nights than I can count, traveling the Seven Kingdoms with Egg.")
-            if memories:
-                ltm_parts.append(f"{memories[0]['content']}")
-        
-        else:
-            stm_parts.append("I hear your words, friend. As a knight, I strive to serve with honor and protect those who cannot protect themselves.")
-            if memories:
-                ltm_parts.append(f"Your question reminds me: {memories[0]['content']}")
+        if turn.memories and topic["memory_prefix"] is not None:
+            ltm_parts.append(f"{topic['memory_prefix']}{turn.memories[0]['content']}")
         
         # Combine response parts
         full_response = " ".join(stm_parts + ltm_parts)
@@ -153,13 +116,15 @@ class KnightAgent:
             "stm_text": " ".join(stm_parts) if stm_parts else "",
             "ltm_text": " ".join(ltm_parts) if ltm_parts else "",
             "has_stm": len(stm_parts) > 0,
-            "has_ltm": len(ltm_parts) > 0
+            "has_ltm": len(ltm_parts) > 0,
+            "topic": topic["name"]
         }
     
     def get_greeting(self) -> str:
         """Get initial greeting"""
         return get_initial_greeting()
     
-    def get_memory_stats(self) -> Dict:
+    def get_memory_stats(self, memory: Optional[MemoryManager] = None) -> Dict:
         """Get current memory statistics"""
-        return self.memory.get_memory_stats()
+        memory = memory if memory is not None else self.memory
+        return {**memory.get_memory_stats(), "context": self.context_builder.get_stats()}
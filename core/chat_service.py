@@ -0,0 +1,163 @@
+"""
+Chat Service for Agentcore Demo
+Transport-independent handlers behind the web API (Flask and ASGI)
+"""
+
+from typing import Dict, Optional, Union
+import os
+import signal
+import uuid
+
+from .memory_manager import MemoryManager
+from .remote_memory import RemoteMemoryManager
+from .agent import KnightAgent
+from .session_store import SessionStore
+from .config import memory_settings_from_env, agent_settings_from_env, session_settings_from_env, \
+    remote_memory_settings_from_env
+
+
+SESSION_COOKIE = 'session_id'
+SESSION_HEADER = 'X-Session-ID'
+SERVER_TIMING_HEADER = 'Server-Timing'
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MemoryUnavailableError(RuntimeError):
+    """Memory is not ready to serve a turn (still loading, failed, or its service unreachable)"""
+
+
+class ChatService:
+    def __init__(self, memory_manager: Union[MemoryManager, RemoteMemoryManager], agent: KnightAgent,
+                 sessions: SessionStore, server_timing: bool = False, ready_timeout: Optional[float] = None):
+        """Bundle the shared memory, agent and session store
+        
+        With server_timing, chat responses carry a Server-Timing header
+        with the turn's per-stage durations. Turns wait at most
+        ready_timeout seconds for memory to become ready (no limit if None).
+        """
+        self.memory_manager = memory_manager
+        self.agent = agent
+        self.sessions = sessions
+        self.server_timing = server_timing
+        self.ready_timeout = ready_timeout
+        
+        metrics = memory_manager.metrics
+        metrics.gauge("agentcore_live_sessions", "Sessions with a short-term memory window",
+                      lambda: sessions.get_stats()["live_sessions"])
+        metrics.gauge("agentcore_session_tokens", "Short-term memory tokens held across sessions",
+                      lambda: sessions.get_stats()["session_tokens"])
+    
+    @classmethod
+    def from_env(cls, background_warmup: bool = True) -> "ChatService":
+        """Build the service from environment configuration
+        
+        With background_warmup the model, tokenizer and LTM load (and the
+        persona is seeded) on a background thread, so the server can start
+        answering greeting, stats and readiness requests immediately.
+        With MEMORY_SERVICE_URL set, memory is served by a shared memory
+        service (which seeds the persona) instead of loaded in-process.
+        """
+        remote_settings = remote_memory_settings_from_env()
+        ready_timeout = None
+        if remote_settings is not None:
+            memory_manager = RemoteMemoryManager(**remote_settings)
+            ready_timeout = remote_settings["timeout"]
+            agent = KnightAgent(memory_manager, seed_core_memories=False, **agent_settings_from_env())
+            if background_warmup:
+                memory_manager.start_warmup()
+        else:
+            memory_manager = MemoryManager(**memory_settings_from_env(), lazy_load=background_warmup)
+            agent = KnightAgent(memory_manager, seed_core_memories=not background_warmup, **agent_settings_from_env())
+            if background_warmup:
+                memory_manager.start_warmup(then=agent.initialize_core_memories)
+        sessions = SessionStore(memory_manager, **session_settings_from_env())
+        server_timing = os.getenv("SERVER_TIMING_HEADER", "False").lower() == "true"
+        return cls(memory_manager, agent, sessions, server_timing=server_timing, ready_timeout=ready_timeout)
+    
+    @staticmethod
+    def resolve_session_id(header: Optional[str], cookie: Optional[str]) -> str:
+        """Pick the session id from header or cookie, or start a new session"""
+        return header or cookie or uuid.uuid4().hex
+    
+    def chat(self, session_id: str, user_message: str) -> Dict:
+        """Run one conversation turn; CPU-bound (embedding and index search)"""
+        # Turns arriving during a background warm-up wait for the seeded LTM
+        if not self.memory_manager.wait_until_ready(self.ready_timeout):
+            raise MemoryUnavailableError(f"Memory systems not ready: {self.memory_manager.warmup_error or 'timed out'}")
+        
+        session = self.sessions.get(session_id)
+        
+        # One turn at a time per conversation
+        with session.lock:
+            response_data = self.agent.process_message(user_message, memory=session)
+            stats = self.agent.get_memory_stats(memory=session)
+        
+        return {
+            'response': response_data['response'],
+            'stm_text': response_data.get('stm_text', ''),
+            'ltm_text': response_data.get('ltm_text', ''),
+            'has_stm': response_data.get('has_stm', False),
+            'has_ltm': response_data.get('has_ltm', False),
+            'topic': response_data.get('topic'),
+            'timings_ms': response_data.get('timings_ms', {}),
+            'stats': stats
+        }
+    
+    def greeting(self, session_id: str) -> Dict:
+        """Initial greeting with the session's stats"""
+        session = self.sessions.get(session_id)
+        return {
+            'greeting': self.agent.get_greeting(),
+            'stats': self.agent.get_memory_stats(memory=session)
+        }
+    
+    def stats(self, session_id: str) -> Dict:
+        """Session memory stats plus session store stats"""
+        session = self.sessions.get(session_id)
+        return {
+            **self.agent.get_memory_stats(memory=session),
+            'sessions': self.sessions.get_stats()
+        }
+    
+    def reset(self, session_id: str) -> Dict:
+        """Clear the session's short-term memory"""
+        session = self.sessions.get(session_id)
+        session.clear_stm()
+        return {
+            'message': 'Short-term memory cleared',
+            'stats': self.agent.get_memory_stats(memory=session)
+        }
+    
+    def timing_headers(self, result: Dict) -> Dict[str, str]:
+        """Server-Timing header for a chat result, if enabled"""
+        if not self.server_timing or not result.get('timings_ms'):
+            return {}
+        return {SERVER_TIMING_HEADER: ", ".join(
+            f"{stage};dur={ms}" for stage, ms in result['timings_ms'].items()
+        )}
+    
+    def metrics(self) -> str:
+        """Latency histograms and gauges in Prometheus text format"""
+        return self.memory_manager.metrics.render()
+    
+    def install_reload_signal(self) -> bool:
+        """Hot-swap LTM to the newest snapshot on SIGHUP
+        
+        Returns False where the platform has no SIGHUP or when not called
+        from the main thread.
+        """
+        if not hasattr(signal, "SIGHUP"):
+            return False
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.memory_manager.start_reload())
+        except ValueError:
+            return False
+        return True
+    
+    def readiness(self) -> Dict:
+        """Whether embeddings and LTM are loaded, with startup phase timings"""
+        return self.memory_manager.get_readiness()
+    
+    def close(self):
+        """Flush pending long-term memory writes"""
+        self.memory_manager.close()
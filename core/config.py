@@ -0,0 +1,77 @@
+"""
+Configuration for Agentcore Demo
+Reads memory settings from environment variables
+"""
+
+import os
+from typing import Dict, Optional
+
+
+def memory_settings_from_env() -> Dict:
+    """MemoryManager keyword arguments from environment variables"""
+    return {
+        "stm_max_tokens": int(os.getenv("STM_MAX_TOKENS", 200)),
+        "collection_name": os.getenv("LTM_COLLECTION_NAME", "knight_memories"),
+        "fsync_policy": os.getenv("LTM_FSYNC_POLICY", "always"),
+        "compact_every": int(os.getenv("LTM_COMPACT_EVERY", 1000)),
+        "index_spec": os.getenv("LTM_INDEX_SPEC", "Flat"),
+        "ann_threshold": int(os.getenv("LTM_ANN_THRESHOLD", 10000)),
+        "nprobe": int(os.getenv("LTM_NPROBE", 8)),
+        "ef_search": int(os.getenv("LTM_EF_SEARCH", 64)),
+        "mmap_index": os.getenv("LTM_MMAP_INDEX", "False").lower() == "true",
+        "keep_snapshots": int(os.getenv("LTM_KEEP_SNAPSHOTS", 2)),
+        "query_batching": os.getenv("EMBED_QUERY_BATCHING", "False").lower() == "true",
+        "query_batch_size": int(os.getenv("EMBED_QUERY_BATCH_SIZE", 32)),
+        "query_batch_wait_ms": float(os.getenv("EMBED_QUERY_BATCH_WAIT_MS", 2.0)),
+        "query_cache_size": int(os.getenv("QUERY_CACHE_SIZE", 1024)),
+        "rerank": os.getenv("LTM_RERANK", "False").lower() == "true",
+        "rerank_overfetch": int(os.getenv("LTM_RERANK_OVERFETCH", 4)),
+        "similarity_weight": float(os.getenv("LTM_RERANK_SIMILARITY_WEIGHT", 1.0)),
+        "importance_weight": float(os.getenv("LTM_RERANK_IMPORTANCE_WEIGHT", 0.3)),
+        "recency_weight": float(os.getenv("LTM_RERANK_RECENCY_WEIGHT", 0.2)),
+        "recency_half_life_hours": float(os.getenv("LTM_RERANK_HALF_LIFE_HOURS", 168.0)),
+        "consolidation": os.getenv("CONSOLIDATION_ENABLED", "False").lower() == "true",
+        "consolidation_min_importance": int(os.getenv("CONSOLIDATION_MIN_IMPORTANCE", 6)),
+        "consolidation_high_importance": int(os.getenv("CONSOLIDATION_HIGH_IMPORTANCE", 7)),
+        "consolidation_batch_size": int(os.getenv("CONSOLIDATION_BATCH_SIZE", 32)),
+        "consolidation_max_wait_ms": float(os.getenv("CONSOLIDATION_MAX_WAIT_MS", 1000.0)),
+        "consolidation_similarity": float(os.getenv("CONSOLIDATION_DEDUP_SIMILARITY", 0.95)),
+        "dedup": os.getenv("LTM_DEDUP", "off"),
+        "dedup_similarity": float(os.getenv("LTM_DEDUP_SIMILARITY", 0.95)),
+        "embedding_model_name": os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+        "embedding_backend": os.getenv("EMBEDDING_BACKEND", "torch"),
+        "onnx_dir": os.getenv("EMBEDDING_ONNX_DIR") or None,
+        "metrics": os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    }
+
+
+def agent_settings_from_env() -> Dict:
+    """KnightAgent keyword arguments from environment variables"""
+    return {
+        "context_max_tokens": int(os.getenv("CONTEXT_MAX_TOKENS", 2000)),
+        "context_recent": int(os.getenv("CONTEXT_RECENT_TURNS", 5))
+    }
+
+
+def remote_memory_settings_from_env() -> Optional[Dict]:
+    """RemoteMemoryManager keyword arguments from environment variables, or None without MEMORY_SERVICE_URL"""
+    url = os.getenv("MEMORY_SERVICE_URL")
+    if not url:
+        return None
+    return {
+        "url": url,
+        "stm_max_tokens": int(os.getenv("STM_MAX_TOKENS", 200)),
+        "pool_size": int(os.getenv("MEMORY_SERVICE_POOL_SIZE", 4)),
+        "timeout": float(os.getenv("MEMORY_SERVICE_TIMEOUT", 30.0)),
+        "metrics": os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    }
+
+
+def session_settings_from_env() -> Dict:
+    """SessionStore keyword arguments from environment variables"""
+    max_total_tokens = os.getenv("SESSION_MAX_TOTAL_TOKENS")
+    return {
+        "max_sessions": int(os.getenv("SESSION_MAX_SESSIONS", 10000)),
+        "ttl_seconds": float(os.getenv("SESSION_TTL_SECONDS", 3600)),
+        "max_total_tokens": int(max_total_tokens) if max_total_tokens else None
+    }
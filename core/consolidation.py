@@ -0,0 +1,158 @@
+"""
+Memory Consolidation for Agentcore Demo
+Background worker that moves STM messages into LTM off the request path
+"""
+
+import numpy as np
+from typing import List, Dict, Optional, Callable, Tuple
+import queue
+import threading
+import time
+
+from .ltm_dedup import find_near_duplicates
+
+
+class ConsolidationWorker:
+    def __init__(self, encode: Callable[[List[str]], np.ndarray],
+                 nearest: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+                 commit: Callable[[List[Dict], np.ndarray], int],
+                 batch_size: int = 32, max_wait_ms: float = 1000.0,
+                 similarity_threshold: float = 0.95, max_queue: int = 10000):
+        """Start the worker thread
+
+        encode embeds texts of memories submitted without an "embedding",
+        nearest gives each embedding's squared L2 distance to, and id of,
+        its nearest stored memory and commit adds embedded memories to LTM. Memories whose embedding has cosine
+        similarity of at least similarity_threshold to one already kept in
+        the batch, or already stored, are dropped as duplicates.
+        """
+        self._encode = encode
+        self._nearest = nearest
+        self._commit_memories = commit
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.similarity_threshold = similarity_threshold
+        
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.counters = {
+            "submitted": 0,
+            "consolidated": 0,
+            "duplicates": 0,
+            "embeddings_reused": 0,  # Embedded with the turn, not again here
+            "dropped": 0,  # Queue full
+            "batches": 0,
+            "errors": 0
+        }
+        self.last_lag = 0.0  # Seconds from enqueue to commit, oldest message of the last batch
+        self.last_error: Optional[str] = None
+        
+        self._thread = threading.Thread(target=self._run, name="memory-consolidation", daemon=True)
+        self._thread.start()
+    
+    def submit(self, memory: Dict) -> bool:
+        """Queue a memory for LTM without waiting; False if the queue is full or closed"""
+        with self._lock:
+            if self._closed:
+                return False
+        try:
+            self._queue.put_nowait((time.monotonic(), memory))
+        except queue.Full:
+            with self._lock:
+                self.counters["dropped"] += 1
+            return False
+        with self._lock:
+            self.counters["submitted"] += 1
+        return True
+    
+    def _run(self):
+        """Collect queued memories into batches and commit them"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            self._commit(batch)
+            if stop:
+                return
+    
+    def _unique(self, embeddings: np.ndarray) -> List[int]:
+        """Rows not near-identical to an earlier row of the batch or to a stored memory"""
+        stored, earlier = find_near_duplicates(embeddings, *self._nearest(embeddings), self.similarity_threshold)
+        return np.flatnonzero((stored < 0) & (earlier < 0)).tolist()
+    
+    def _embed(self, memories: List[Dict]) -> np.ndarray:
+        """Embeddings of a batch, encoding only memories that did not arrive with one"""
+        embeddings = [memory.pop("embedding", None) for memory in memories]
+        missing = [row for row, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            for row, embedding in zip(missing, self._encode([memories[row]["content"] for row in missing])):
+                embeddings[row] = embedding
+        
+        with self._lock:
+            self.counters["embeddings_reused"] += len(memories) - len(missing)
+        return np.stack(embeddings).astype(np.float32)
+    
+    def _commit(self, batch: List):
+        """Embed a batch once, drop near-duplicates and add the rest to LTM"""
+        memories = [memory for _, memory in batch]
+        try:
+            embeddings = self._embed(memories)
+            kept = self._unique(embeddings)
+            if kept:
+                self._commit_memories([memories[row] for row in kept], embeddings[kept])
+        except Exception as e:
+            with self._lock:
+                self.counters["errors"] += 1
+                self.last_error = str(e)
+            return
+        
+        with self._lock:
+            self.counters["batches"] += 1
+            self.counters["consolidated"] += len(kept)
+            self.counters["duplicates"] += len(memories) - len(kept)
+            self.last_lag = time.monotonic() - batch[0][0]
+    
+    def close(self):
+        """Commit everything still queued and stop the worker thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+    
+    def get_stats(self) -> Dict:
+        """Queue depth, lag and outcome counters"""
+        with self._queue.mutex:
+            oldest = self._queue.queue[0] if self._queue.queue else None
+        oldest_pending = time.monotonic() - oldest[0] if oldest is not None else 0.0
+        
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "oldest_pending_seconds": oldest_pending,
+                "last_batch_lag_seconds": self.last_lag,
+                **self.counters,
+                "last_error": self.last_error
+            }
@@ -0,0 +1,162 @@
+"""
+Context Builder for Agentcore Demo
+Packs the system prompt, retrieved memories and recent turns into a token budget
+"""
+
+from typing import List, Dict, Optional, Callable, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+
+class ContextBuilder:
+    def __init__(self, system_prompt: str, get_encoding: Callable, max_tokens: int = 2000, recent: int = 5,
+                 min_truncated_tokens: int = 16, cache_size: int = 4096):
+        """Initialize the packer
+
+        get_encoding returns the tokenizer (encode/decode). Parts are added
+        greedily by priority: system prompt, incoming message, memories in
+        rank order, then recent turns newest first. A part that does not fit
+        is cut to the remaining budget if at least min_truncated_tokens are
+        left, otherwise left out.
+        """
+        self.system_prompt = system_prompt
+        self._get_encoding = get_encoding
+        self.max_tokens = max_tokens
+        self.recent = recent
+        self.min_truncated_tokens = min_truncated_tokens
+        self.cache_size = cache_size
+        
+        self._system: Optional[Tuple[str, int]] = None  # Tokenized once, on the first build
+        self._line_tokens: "OrderedDict[str, int]" = OrderedDict()  # LRU of memory line token counts
+        self._lock = threading.Lock()
+        
+        self.builds = 0
+        self.truncated = 0
+        self.dropped = 0
+        self.last_tokens = 0
+        self.total_seconds = 0.0
+    
+    def _count(self, text: str) -> int:
+        """Token count of a line plus its newline"""
+        return len(self._get_encoding().encode(text)) + 1
+    
+    def _cached_count(self, line: str) -> int:
+        """Token count of a line, cached across turns"""
+        with self._lock:
+            tokens = self._line_tokens.get(line)
+            if tokens is not None:
+                self._line_tokens.move_to_end(line)
+                return tokens
+        
+        tokens = self._count(line)
+        with self._lock:
+            self._line_tokens[line] = tokens
+            if len(self._line_tokens) > self.cache_size:
+                self._line_tokens.popitem(last=False)
+        return tokens
+    
+    def _truncate(self, line: str, tokens: int) -> Tuple[str, int]:
+        """A line cut to fit within tokens, with room for its newline and an ellipsis"""
+        encoding = self._get_encoding()
+        text = encoding.decode(encoding.encode(line)[:max(tokens - 2, 0)]) + "…"
+        return text, tokens
+    
+    def _fit(self, line: str, tokens: int, remaining: int) -> Optional[Tuple[str, int]]:
+        """The line as it fits in the remaining budget, or None to leave it out"""
+        if tokens <= remaining:
+            return line, tokens
+        with self._lock:
+            if remaining >= self.min_truncated_tokens:
+                self.truncated += 1
+                return self._truncate(line, remaining)
+            self.dropped += 1
+            return None
+    
+    def system_part(self) -> Tuple[str, int]:
+        """System prompt block and its tokens, cut to half the budget if larger"""
+        if self._system is None:
+            text = f"SYSTEM: {self.system_prompt}\n"
+            tokens = self._count(text)
+            if tokens > self.max_tokens // 2:
+                text, tokens = self._truncate(text, self.max_tokens // 2)
+            self._system = (text, tokens)
+        return self._system
+    
+    def build(self, memories: List[Dict], conversation: List[Dict], message: str,
+              message_tokens: Optional[int] = None) -> Tuple[str, int]:
+        """Context text and its token count for an incoming message
+
+        conversation is the recent STM messages, oldest first; each carries
+        its own token count, as may the message (message_tokens).
+        """
+        start = time.perf_counter()
+        system_text, used = self.system_part()
+        
+        memory_header = "RELEVANT MEMORIES:"
+        conversation_header = "RECENT CONVERSATION:"
+        used += self._cached_count(conversation_header)
+        
+        # The incoming message comes first; other parts share what is left
+        user_line = f"USER: {message}"
+        user_tokens = self._cached_count("USER: ") + message_tokens if message_tokens is not None \
+            else self._count(user_line)
+        fitted = self._fit(user_line, user_tokens, self.max_tokens - used)
+        user_part = [fitted[0]] if fitted else []
+        used += fitted[1] if fitted else 0
+        
+        memory_lines = []
+        if memories:
+            header_tokens = self._cached_count(memory_header) + 1  # Header plus the blank line after the block
+            for mem in memories:
+                line = f"- {mem['content']} (importance: {mem['metadata'].get('importance', 'N/A')})"
+                header = 0 if memory_lines else header_tokens
+                fitted = self._fit(line, self._cached_count(line), self.max_tokens - used - header)
+                if fitted is None:
+                    continue
+                memory_lines.append(fitted[0])
+                used += fitted[1] + header
+        
+        # Most recent turns first; stop at the first that does not fit to keep the window contiguous
+        turn_lines = []
+        for msg in reversed(conversation):
+            prefix = f"{msg['role'].upper()}: "
+            line = prefix + msg["content"]
+            tokens = self._cached_count(prefix) + msg.get("tokens", 0)
+            fitted = self._fit(line, tokens, self.max_tokens - used)
+            if fitted is None:
+                break
+            turn_lines.append(fitted[0])
+            used += fitted[1]
+            if fitted[1] < tokens:
+                break
+        turn_lines.reverse()
+        
+        context_parts = [system_text]
+        if memory_lines:
+            context_parts.append(memory_header)
+            context_parts.extend(memory_lines)
+            context_parts.append("")
+        context_parts.append(conversation_header)
+        context_parts.extend(turn_lines)
+        context_parts.extend(user_part)
+        
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.builds += 1
+            self.last_tokens = used
+            self.total_seconds += elapsed
+        return "\n".join(context_parts), used
+    
+    def get_stats(self) -> Dict:
+        """Budget, last size and packing outcomes"""
+        with self._lock:
+            return {
+                "max_tokens": self.max_tokens,
+                "system_tokens": self._system[1] if self._system is not None else None,
+                "last_tokens": self.last_tokens,
+                "builds": self.builds,
+                "truncated": self.truncated,
+                "dropped": self.dropped,
+                "mean_ms": 1000 * self.total_seconds / self.builds if self.builds else 0.0
+            }
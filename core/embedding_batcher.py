@@ -0,0 +1,120 @@
+"""
+Embedding Batcher for Agentcore Demo
+Coalesces concurrent single-text encode calls into batched forward passes
+"""
+
+import numpy as np
+from typing import List, Dict, Callable
+from collections import Counter
+from concurrent.futures import Future
+import queue
+import threading
+import time
+
+
+class EmbeddingBatcher:
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0):
+        """Start the scheduler thread
+
+        A batch is dispatched as soon as it is full, when max_wait_ms has
+        passed since its first request, or when no other caller is waiting,
+        so a lone request never pays the wait.
+        """
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._in_flight = 0  # Callers inside encode(), queued or being served
+        self.batch_sizes: Counter = Counter()
+        self._closed = False
+        
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+    
+    def encode(self, text: str) -> np.ndarray:
+        """Embed one text, sharing a forward pass with concurrent callers"""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._in_flight += 1
+        try:
+            self._queue.put((text, future))
+            return future.result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+    
+    def _others_waiting(self, batch_size: int) -> bool:
+        """Whether callers beyond the current batch have announced themselves"""
+        with self._lock:
+            return self._in_flight > batch_size
+    
+    def _run(self):
+        """Collect requests into batches and run them"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._others_waiting(len(batch)):
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            self._dispatch(batch)
+            if stop:
+                return
+    
+    def _dispatch(self, batch: List):
+        """Encode a batch and hand each caller its own vector"""
+        with self._lock:
+            self.batch_sizes[len(batch)] += 1
+        try:
+            vectors = np.asarray(self._encode([text for text, _ in batch]), dtype=np.float32)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
+    
+    def close(self):
+        """Serve queued requests and stop the scheduler thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+    
+    def get_stats(self) -> Dict:
+        """Batch count, items served and batch-size histogram"""
+        with self._lock:
+            sizes = dict(self.batch_sizes)
+        batches = sum(sizes.values())
+        items = sum(size * count for size, count in sizes.items())
+        return {
+            "batches": batches,
+            "items": items,
+            "mean_batch_size": items / batches if batches else 0.0,
+            "batch_size_histogram": {str(size): sizes[size] for size in sorted(sizes)}
+        }
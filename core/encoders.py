@@ -0,0 +1,274 @@
+"""
+Embedding Encoders for Agentcore Demo
+Pluggable sentence-embedding backends: PyTorch, int8-quantized PyTorch, ONNX Runtime and an offline hash stub
+"""
+
+import abc
+import json
+import os
+import re
+import time
+import zlib
+import faiss
+import numpy as np
+from typing import List, Dict, Optional
+
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_BACKENDS = ("torch", "int8", "onnx", "onnx-int8", "hash")
+DEFAULT_ONNX_DIR = "onnx_models"
+
+
+class Encoder(abc.ABC):
+    """Turns texts into unit-length float32 sentence embeddings
+    
+    Search, re-ranking, dedup and consolidation read squared L2 distance
+    as cosine similarity, so every backend must L2-normalize its output.
+    """
+    backend = "base"
+    
+    def __init__(self, model_name: str):
+        """Remember the model name; subclasses load the model and set dim"""
+        self.model_name = model_name
+        self.dim: Optional[int] = None
+    
+    @abc.abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts as a (len(texts), dim) float32 matrix of L2-normalized rows"""
+
+
+class TorchEncoder(Encoder):
+    """Full-precision SentenceTransformer (the reference encoder)"""
+    backend = "torch"
+    
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+        """Load the model"""
+        super().__init__(model_name)
+        # Deferred import: pulling in torch alone takes seconds
+        from sentence_transformers import SentenceTransformer
+        self.model = self._load(SentenceTransformer, model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+    
+    def _load(self, model_class, model_name: str):
+        """Load the SentenceTransformer"""
+        return model_class(model_name)
+    
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts as an L2-normalized float32 matrix"""
+        embeddings = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class QuantizedEncoder(TorchEncoder):
+    """SentenceTransformer with its Linear layers dynamically quantized to int8 (CPU only)"""
+    backend = "int8"
+    
+    def _load(self, model_class, model_name: str):
+        """Load the SentenceTransformer on CPU and quantize it in place"""
+        import torch
+        model = model_class(model_name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def export_onnx(model_name: str, model_dir: str):
+    """Export a SentenceTransformer to ONNX with its tokenizer and pooling settings
+
+    Needs torch and sentence-transformers once; OnnxEncoder only needs
+    onnxruntime and tokenizers afterwards.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Pooling
+    
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = next(module for module in model if isinstance(module, Pooling))
+    if not pooling.pooling_mode_mean_tokens:
+        raise ValueError(f"ONNX export supports mean-pooling models only, not {model_name}")
+    
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["export"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["token_embeddings"]}
+    
+    os.makedirs(model_dir, exist_ok=True)
+    auto_model = transformer.auto_model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            auto_model,
+            tuple(sample[name] for name in input_names),
+            os.path.join(model_dir, "model.onnx"),
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+    
+    tokenizer.backend_tokenizer.save(os.path.join(model_dir, "tokenizer.json"))
+    with open(os.path.join(model_dir, "encoder_config.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "dim": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.max_seq_length,
+            "pad_token": tokenizer.pad_token,
+            "pad_token_id": tokenizer.pad_token_id
+        }, f, indent=2)
+
+
+class OnnxEncoder(Encoder):
+    """Transformer exported to ONNX, run with ONNX Runtime plus numpy mean pooling
+
+    The export is made on first use under model_dir and reused afterwards,
+    so serving does not import torch. With quantize the weights are
+    dynamically quantized to int8 as well.
+    """
+    backend = "onnx"
+    
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, model_dir: Optional[str] = None,
+                 quantize: bool = False):
+        """Load (exporting first if needed) the ONNX model and its tokenizer"""
+        super().__init__(model_name)
+        self.model_dir = model_dir or os.path.join(DEFAULT_ONNX_DIR, model_name.replace("/", "_"))
+        if quantize:
+            self.backend = "onnx-int8"
+        
+        model_path = os.path.join(self.model_dir, "model.onnx")
+        if not os.path.exists(model_path):
+            export_onnx(model_name, self.model_dir)
+        if quantize:
+            fp32_path, model_path = model_path, os.path.join(self.model_dir, "model.int8.onnx")
+            if not os.path.exists(model_path):
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+                quantize_dynamic(fp32_path, model_path, weight_type=QuantType.QInt8)
+        
+        import onnxruntime
+        from tokenizers import Tokenizer
+        
+        with open(os.path.join(self.model_dir, "encoder_config.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        self.dim = config["dim"]
+        
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=config["pad_token_id"], pad_token=config["pad_token"])
+    
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts as an L2-normalized float32 matrix"""
+        embeddings = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+                "attention_mask": attention_mask
+            }
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+            
+            token_embeddings = self.session.run(["token_embeddings"], feeds)[0]
+            
+            # Mean over real tokens, as the SentenceTransformer Pooling module does, then unit length
+            # whether or not the model ends in a Normalize module
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            embeddings[start:start + len(encodings)] = pooled
+        return embeddings
+
+
+class HashEncoder(Encoder):
+    """Deterministic bag-of-words feature hashing; needs no model download
+
+    Not a semantic encoder: it only shares dimensions between texts with
+    shared words. Meant for benchmarks and offline smoke runs, where it
+    keeps index, storage and request-path costs realistic without torch.
+    """
+    backend = "hash"
+    
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, dim: int = 384):
+        """Set the output dimension"""
+        super().__init__(model_name)
+        self.dim = dim
+    
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts as L2-normalized hashed word counts"""
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                code = zlib.crc32(word.encode('utf-8'))
+                embeddings[row, code % self.dim] += 1.0 if code & 0x80000000 else -1.0
+            if not embeddings[row].any():
+                embeddings[row, zlib.crc32(text.encode('utf-8')) % self.dim] = 1.0
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings
+
+
+def load_encoder(backend: str = "torch", model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 onnx_dir: Optional[str] = None) -> Encoder:
+    """Build the encoder for a backend name"""
+    if backend == "torch":
+        return TorchEncoder(model_name)
+    if backend == "int8":
+        return QuantizedEncoder(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEncoder(model_name, onnx_dir, quantize=backend == "onnx-int8")
+    if backend == "hash":
+        return HashEncoder(model_name)
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+
+
+def retrieval_parity(reference: Encoder, candidate: Encoder, corpus: List[str], queries: List[str],
+                     k: int = 3) -> Dict:
+    """Compare exact top-k retrieval over a corpus between two encoders
+
+    Reports how often the candidate returns the reference's top-k (in
+    order), the mean top-k overlap, embedding cosine agreement and
+    encoding time for each encoder.
+    """
+    k = min(k, len(corpus))
+    rankings = {}
+    seconds = {}
+    embeddings = {}
+    for name, encoder in (("reference", reference), ("candidate", candidate)):
+        start = time.perf_counter()
+        corpus_embeddings = encoder.encode(corpus)
+        query_embeddings = encoder.encode(queries)
+        seconds[name] = time.perf_counter() - start
+        
+        index = faiss.IndexFlatL2(corpus_embeddings.shape[1])
+        index.add(corpus_embeddings)
+        _, rankings[name] = index.search(query_embeddings, k)
+        embeddings[name] = np.vstack([corpus_embeddings, query_embeddings])
+    
+    mismatches = []
+    overlap = 0.0
+    for query, expected, actual in zip(queries, rankings["reference"], rankings["candidate"]):
+        overlap += len(set(expected) & set(actual)) / k
+        if list(expected) != list(actual):
+            mismatches.append({
+                "query": query,
+                "reference": [int(idx) for idx in expected],
+                "candidate": [int(idx) for idx in actual]
+            })
+    
+    reference_embeddings, candidate_embeddings = embeddings["reference"], embeddings["candidate"]
+    cosine = (reference_embeddings * candidate_embeddings).sum(axis=1) / np.maximum(
+        np.linalg.norm(reference_embeddings, axis=1) * np.linalg.norm(candidate_embeddings, axis=1), 1e-12
+    )
+    
+    return {
+        "reference_backend": reference.backend,
+        "candidate_backend": candidate.backend,
+        "queries": len(queries),
+        "k": k,
+        "top_k_match_rate": 1.0 - len(mismatches) / len(queries),
+        "mean_top_k_overlap": overlap / len(queries),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "reference_seconds": seconds["reference"],
+        "candidate_seconds": seconds["candidate"],
+        "mismatches": mismatches
+    }
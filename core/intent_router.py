@@ -0,0 +1,45 @@
+"""
+Intent Router for Agentcore Demo
+Picks a response topic from keyword matches in a single regex pass
+"""
+
+import re
+from typing import List, Dict
+
+
+class IntentRouter:
+    def __init__(self, topics: List[Dict], default: Dict):
+        """Compile every topic's keywords into one pattern
+
+        topics are in priority order; a message goes to the first topic
+        with any of its keywords anywhere in the (lowercased) message.
+        """
+        self.topics = topics
+        self.default = default
+        
+        # Keyword -> index of the first topic listing it
+        self._priority: Dict[str, int] = {}
+        for priority, topic in enumerate(topics):
+            for keyword in topic["keywords"]:
+                self._priority.setdefault(keyword.lower(), priority)
+        
+        # A zero-width lookahead matches at every position, so overlapping keywords
+        # ("hedge knight" / "knight") are all seen; alternatives are tried in priority
+        # order, so at each position the highest-priority keyword starting there wins
+        keywords = sorted(self._priority, key=lambda keyword: (self._priority[keyword], -len(keyword)))
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in keywords) + "))") \
+            if keywords else None
+    
+    def route(self, message: str) -> Dict:
+        """Highest-priority topic with a keyword in the message, or the default topic"""
+        if self._pattern is None:
+            return self.default
+        
+        best = None
+        for match in self._pattern.finditer(message.lower()):
+            priority = self._priority[match.group(1)]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return self.topics[best] if best is not None else self.default
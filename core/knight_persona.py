@@ -185,3 +185,96 @@ def get_initial_greeting() -> str:
 of chivalry and honor. Though I come from humble beginnings, I serve the realm as best I can. 
 
 How may I be of service to you this day?"""
+
+
+# Canned replies by topic, in priority order: the first topic with a keyword
+# anywhere in the message wins. memory_prefix introduces the top LTM memory
+# ("" quotes it bare, None leaves it out).
+RESPONSE_TOPICS = [
+    {
+        "name": "honor",
+        "keywords": ["honor", "duty", "knight", "chivalry"],
+        "response": "Aye, honor and duty are the foundation of knighthood. Ser Arlan taught me that a knight's worth is measured by his deeds, not his name or castle.",
+        "memory_prefix": "I recall: "
+    },
+    {
+        "name": "egg",
+        "keywords": ["egg", "aegon", "squire", "prince"],
+        "response": "Ah, you speak of my squire, young Egg. He's a Targaryen prince, though he shaves his silver hair to hide it. He's clever and brave, and I'm proud to have him at my side.",
+        "memory_prefix": "I remember: "
+    },
+    {
+        "name": "battle",
+        "keywords": ["fight", "battle", "combat", "war"],
+        "response": "I have seen my share of battles. War is not glorious - it's bloody and cruel. A knight must be ready to defend the innocent, but I take no joy in killing.",
+        "memory_prefix": "I remember well: "
+    },
+    {
+        "name": "arlan",
+        "keywords": ["arlan", "master", "teacher"],
+        "response": "Ser Arlan of Pennytree was the only father I ever knew. He found me in Flea Bottom and taught me everything about being a knight. He died on the road to Ashford, and I think of him every day.",
+        "memory_prefix": ""
+    },
+    {
+        "name": "ashford",
+        "keywords": ["ashford", "tourney", "trial"],
+        "response": "The Tourney at Ashford Meadow changed my life. I defended a puppeteer from Prince Aerion's cruelty and fought in a Trial of Seven. Prince Baelor Breakspear died saving me that day.",
+        "memory_prefix": "I'll never forget: "
+    },
+    {
+        "name": "height",
+        "keywords": ["tall", "height", "size"],
+        "response": "I'm nearly seven feet tall, which is how I got my name. My size helps in a fight, but it also means I can't hide in a crowd. People remember Dunk the Tall.",
+        "memory_prefix": ""
+    },
+    {
+        "name": "shield",
+        "keywords": ["shield", "sigil", "star", "elm"],
+        "response": "My shield bears a falling star and an elm tree on a sunset field. The star is for the night Ser Arlan found me, and the elm for Pennytree, his home. Tanselle painted it for me at Ashford.",
+        "memory_prefix": ""
+    },
+    {
+        "name": "origin",
+        "keywords": ["flea bottom", "poor", "orphan", "lowborn"],
+        "response": "I grew up in Flea Bottom, the poorest part of King's Landing. I was an orphan, surviving by my wits until Ser Arlan took me in. Those hard years taught me never to look down on the smallfolk.",
+        "memory_prefix": ""
+    },
+    {
+        "name": "thunder",
+        "keywords": ["thunder", "horse", "destrier"],
+        "response": "Thunder is my destrier, a chestnut stallion I inherited from Ser Arlan. He's old but strong, and he's carried me through many dangers. I care for him as Ser Arlan cared for me.",
+        "memory_prefix": ""
+    },
+    {
+        "name": "baelor",
+        "keywords": ["baelor", "breakspear", "death"],
+        "response": "Prince Baelor Breakspear was the finest knight I ever knew. He died in the Trial of Seven, struck by his own brother's mace while defending me. His death haunts me still.",
+        "memory_prefix": ""
+    },
+    {
+        "name": "tanselle",
+        "keywords": ["tanselle", "puppeteer", "love"],
+        "response": "Tanselle Too-Tall was a puppeteer I met at Ashford. She was kind and talented, and I defended her from Prince Aerion's cruelty. She painted my shield for me. I think of her sometimes.",
+        "memory_prefix": ""
+    },
+    {
+        "name": "introduction",
+        "keywords": ["who are you", "tell me about yourself", "introduce"],
+        "response": get_initial_greeting(),
+        "memory_prefix": None
+    },
+    {
+        "name": "hedge_knight",
+        "keywords": ["hedge knight", "wandering", "travel"],
+        "response": "I'm a hedge knight - we have no lands or keeps, just our honor and our swords. I've slept under hedges more nights than I can count, traveling the Seven Kingdoms with Egg.",
+        "memory_prefix": ""
+    }
+]
+
+# Reply when no topic matches
+DEFAULT_TOPIC = {
+    "name": "general",
+    "keywords": [],
+    "response": "I hear your words, friend. As a knight, I strive to serve with honor and protect those who cannot protect themselves.",
+    "memory_prefix": "Your question reminds me: "
+}
@@ -0,0 +1,74 @@
+"""
+Long-term Memory Deduplication for Agentcore Demo
+Finds near-identical memories by embedding similarity
+"""
+
+import faiss
+import numpy as np
+from typing import Tuple
+
+from .ltm_index import index_vectors
+
+
+DEDUP_POLICIES = ("off", "reject", "merge")
+
+
+def similarity_to_distance(similarity: float) -> float:
+    """Squared L2 distance between normalized embeddings with the given cosine similarity"""
+    return 2.0 * (1.0 - similarity)
+
+
+def find_near_duplicates(embeddings: np.ndarray, nearest_distances: np.ndarray, nearest_ids: np.ndarray,
+                         similarity: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Match each new embedding to a stored memory or earlier new row it nearly duplicates
+
+    nearest_distances/nearest_ids describe each embedding's nearest stored
+    memory. Returns (stored, earlier): the id of the stored duplicate or -1,
+    and the batch row of the earlier duplicate or -1.
+    """
+    stored = np.where(nearest_distances <= similarity_to_distance(similarity), nearest_ids, -1)
+    earlier = np.full(len(embeddings), -1, dtype=np.int64)
+    
+    kept = []
+    for row in range(len(embeddings)):
+        if stored[row] >= 0:
+            continue
+        if kept:
+            similarities = embeddings[kept] @ embeddings[row]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= similarity:
+                earlier[row] = kept[best]
+                continue
+        kept.append(row)
+    return stored, earlier
+
+
+def duplicate_clusters(index: faiss.Index, similarity: float, neighbors: int = 8,
+                       batch_size: int = 4096) -> np.ndarray:
+    """Label every stored memory with the smallest id among its near-duplicates
+
+    Each memory is linked to those of its nearest neighbors within the
+    similarity threshold, and linked groups form one cluster.
+    """
+    total = index.ntotal
+    parent = np.arange(total)
+    
+    def find(memory_id: int) -> int:
+        root = memory_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[memory_id] != root:
+            parent[memory_id], memory_id = root, parent[memory_id]
+        return root
+    
+    vectors = index_vectors(index)
+    max_distance = similarity_to_distance(similarity)
+    for start in range(0, total, batch_size):
+        distances, ids = index.search(vectors[start:start + batch_size], min(neighbors, total))
+        rows, columns = np.nonzero((distances <= max_distance) & (ids >= 0))
+        for row, column in zip(rows, columns):
+            a, b = find(start + row), find(int(ids[row, column]))
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+    
+    return np.array([find(memory_id) for memory_id in range(total)], dtype=np.int64)
@@ -0,0 +1,107 @@
+"""
+Long-term Memory Search Filters for Agentcore Demo
+Per-memory columns that turn metadata predicates into FAISS ID selectors
+"""
+
+import faiss
+import numpy as np
+from typing import List, Dict, Optional, Tuple, Union
+from datetime import datetime
+
+
+TimeBound = Optional[Union[str, datetime, float]]
+
+
+def to_epoch(value: Union[str, datetime, float]) -> float:
+    """Convert an ISO string, datetime or epoch seconds to epoch seconds"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class FilterColumns:
+    def __init__(self, capacity: int = 1024):
+        """Initialize empty growable columns"""
+        self.size = 0
+        self.category_codes: Dict[str, int] = {}
+        self._category = np.empty(capacity, dtype=np.int32)
+        self._importance = np.empty(capacity, dtype=np.float32)
+        self._timestamp = np.empty(capacity, dtype=np.float64)
+    
+    def _reserve(self, size: int):
+        """Grow the columns geometrically so appends stay amortized O(1)"""
+        capacity = len(self._category)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self._category = np.resize(self._category, capacity)
+        self._importance = np.resize(self._importance, capacity)
+        self._timestamp = np.resize(self._timestamp, capacity)
+    
+    def extend(self, records: List[Dict]):
+        """Append the filterable fields of new memories"""
+        start = self.size
+        self._reserve(start + len(records))
+        for offset, record in enumerate(records):
+            code = self.category_codes.setdefault(record["category"], len(self.category_codes))
+            self._category[start + offset] = code
+            self._importance[start + offset] = record.get("importance", 5)
+            self._timestamp[start + offset] = to_epoch(record["timestamp"])
+        self.size += len(records)
+    
+    def extend_columns(self, categories: List[str], category: np.ndarray, importance: np.ndarray,
+                       timestamp: np.ndarray):
+        """Append filterable columns in bulk; category holds codes into the categories list"""
+        start = self.size
+        self._reserve(start + len(category))
+        lookup = np.array([self.category_codes.setdefault(name, len(self.category_codes)) for name in categories],
+                          dtype=np.int32)
+        end = start + len(category)
+        self._category[start:end] = lookup[category] if len(lookup) else category
+        self._importance[start:end] = importance
+        self._timestamp[start:end] = timestamp
+        self.size = end
+    
+    def update(self, idx: int, importance: float, timestamp: TimeBound):
+        """Change a memory's importance and timestamp"""
+        self._importance[idx] = importance
+        self._timestamp[idx] = to_epoch(timestamp)
+    
+    def values(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Importance and epoch timestamps of the given memories"""
+        return self._importance[ids], self._timestamp[ids]
+    
+    def mask(self, category: Optional[str] = None, min_importance: Optional[float] = None,
+             max_importance: Optional[float] = None, since: TimeBound = None,
+             until: TimeBound = None) -> Optional[np.ndarray]:
+        """Boolean mask of memories matching every given predicate, or None if unfiltered"""
+        if category is None and min_importance is None and max_importance is None \
+                and since is None and until is None:
+            return None
+        
+        mask = np.ones(self.size, dtype=bool)
+        if category is not None:
+            code = self.category_codes.get(category)
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= self._category[:self.size] == code
+        if min_importance is not None:
+            mask &= self._importance[:self.size] >= min_importance
+        if max_importance is not None:
+            mask &= self._importance[:self.size] <= max_importance
+        if since is not None:
+            mask &= self._timestamp[:self.size] >= to_epoch(since)
+        if until is not None:
+            mask &= self._timestamp[:self.size] <= to_epoch(until)
+        return mask
+
+
+class MaskSelector:
+    def __init__(self, mask: np.ndarray):
+        """Wrap a boolean mask as a FAISS bitmap ID selector"""
+        # FAISS only keeps a pointer, so the packed bitmap must outlive the search
+        self.bitmap = np.packbits(mask, bitorder='little')
+        self.selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(self.bitmap))
@@ -0,0 +1,109 @@
+"""
+Long-term Memory Index Backends for Agentcore Demo
+Builds FAISS indexes from a factory spec and tunes them at query time
+"""
+
+import faiss
+import numpy as np
+from typing import Optional, Tuple
+
+
+# FAISS index_factory strings, e.g. "Flat", "IVF1024,Flat", "HNSW32", "IVF1024,PQ16"
+DEFAULT_INDEX_SPEC = "Flat"
+
+# Maps stored vectors/codes read-only instead of copying them (FAISS >= 1.10)
+MMAP_FLAG = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+
+
+def build_index(spec: str, dim: int, vectors: Optional[np.ndarray] = None, train_size: int = 50000) -> faiss.Index:
+    """Create an L2 index from a factory spec, training it on a sample of vectors if needed"""
+    index = faiss.index_factory(dim, spec, faiss.METRIC_L2)
+    
+    # Keep id -> vector lookups available for filtered fallbacks and rebuilds
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    
+    if vectors is not None and len(vectors):
+        if not index.is_trained:
+            sample = vectors
+            if len(vectors) > train_size:
+                rows = np.random.default_rng(0).choice(len(vectors), train_size, replace=False)
+                sample = vectors[rows]
+            index.train(sample)
+        index.add(vectors)
+    
+    return index
+
+
+def read_index(path: str, mmap: bool = False) -> Tuple[faiss.Index, bool]:
+    """Read an index file, memory-mapping its vectors when asked and supported
+    
+    Returns the index and whether it is mapped. A mapped index shares the
+    page cache with every other process mapping the same file, but must
+    not be modified; see materialize_index.
+    """
+    if mmap and MMAP_FLAG is not None:
+        return faiss.read_index(path, MMAP_FLAG), True
+    return faiss.read_index(path), False
+
+
+def materialize_index(index: faiss.Index) -> faiss.Index:
+    """Private in-memory copy of a (mapped) index that can be modified"""
+    return faiss.deserialize_index(faiss.serialize_index(index))
+
+
+def min_training_points(spec: str, dim: int) -> int:
+    """Smallest number of vectors an index built from spec can be trained on"""
+    index = faiss.index_factory(dim, spec, faiss.METRIC_L2)
+    if index.is_trained:
+        return 0
+    
+    ivf = faiss.try_extract_index_ivf(index)
+    points = ivf.nlist if ivf is not None else 0
+    if "PQ" in spec:
+        # 8-bit PQ codebooks need one point per centroid
+        points = max(points, 256)
+    return points
+
+
+def is_flat(index: faiss.Index) -> bool:
+    """Whether the index is an exact brute-force scan"""
+    return isinstance(index, faiss.IndexFlat)
+
+
+def index_vectors(index: faiss.Index) -> np.ndarray:
+    """All stored vectors in id order"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                  selector: Optional[faiss.IDSelector] = None) -> Optional[faiss.SearchParameters]:
+    """Per-query recall/latency knobs and ID filter for the index type, or None for a plain search"""
+    if faiss.try_extract_index_ivf(index) is not None and (nprobe or selector is not None):
+        params = faiss.SearchParametersIVF(nprobe=nprobe) if nprobe else faiss.SearchParametersIVF()
+    elif isinstance(index, faiss.IndexHNSW) and (ef_search or selector is not None):
+        params = faiss.SearchParametersHNSW(efSearch=ef_search) if ef_search else faiss.SearchParametersHNSW()
+    elif selector is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+    
+    if selector is not None:
+        params.sel = selector
+    return params
+
+
+def search_subset(index: faiss.Index, query: np.ndarray, ids: np.ndarray, k: int):
+    """Exact top-k over the given ids, in the same (distances, indices) shape as Index.search"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    
+    vectors = index.reconstruct_batch(ids.astype(np.int64))
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    top = np.argsort(distances)[:k]
+    return distances[top][np.newaxis, :], ids[top][np.newaxis, :]
@@ -0,0 +1,227 @@
+"""
+Long-term Memory Metadata for Agentcore Demo
+Columnar, memory-mapped memory metadata with an in-memory tail for new rows
+"""
+
+import hashlib
+import json
+import struct
+import numpy as np
+from typing import List, Dict, Iterator, Tuple, BinaryIO
+from datetime import datetime
+
+from .ltm_filter import to_epoch
+
+
+# File layout: magic, header length, JSON header, then 8-byte aligned column sections
+MAGIC = b"LTMCOL01"
+HEADER_LENGTH = struct.Struct("<Q")
+ALIGNMENT = 8
+
+# Fields stored in their own columns; anything else goes to the per-row JSON extras
+CORE_FIELDS = ("content", "category", "importance", "timestamp", "content_hash")
+
+
+def content_hash(content: str, category: str) -> str:
+    """Stable key identifying a memory by its content and category"""
+    return hashlib.sha1(f"{category}\x00{content}".encode('utf-8')).hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the section alignment"""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class ColumnarMetadata:
+    def __init__(self):
+        """Initialize an empty table"""
+        self.categories: List[str] = []
+        self.category_codes: Dict[str, int] = {}
+        self._rows = 0  # Rows served from the mapped file
+        self._columns: Dict[str, np.ndarray] = {}
+        self._tail: List[Dict] = []  # Rows added since the file was written
+        self._overrides: Dict[int, Dict] = {}  # Updated importance/timestamp of mapped rows
+    
+    @classmethod
+    def open(cls, path: str) -> "ColumnarMetadata":
+        """Map a snapshot file; only the header is read up front"""
+        table = cls()
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        if raw[:len(MAGIC)].tobytes() != MAGIC:
+            raise ValueError(f"Not a columnar metadata file: {path}")
+        
+        start = len(MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack(raw[len(MAGIC):start].tobytes())
+        header = json.loads(raw[start:start + header_length].tobytes().decode('utf-8'))
+        
+        data_start = _aligned(start + header_length)
+        for name, (offset, dtype, count) in header["columns"].items():
+            dtype = np.dtype(dtype)
+            begin = data_start + offset
+            table._columns[name] = raw[begin:begin + count * dtype.itemsize].view(dtype)
+        
+        for category in header["categories"]:
+            table._intern(category)
+        table._rows = header["rows"]
+        return table
+    
+    def _intern(self, category: str) -> int:
+        """Code of a category, assigning the next one if new"""
+        code = self.category_codes.get(category)
+        if code is None:
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+    
+    def __len__(self) -> int:
+        return self._rows + len(self._tail)
+    
+    def __getitem__(self, idx: int) -> Dict:
+        """One memory's metadata; mapped rows are decoded on demand"""
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("metadata row out of range")
+        if idx >= self._rows:
+            return self._tail[idx - self._rows]
+        
+        columns = self._columns
+        record = {
+            "content": self._blob("content", idx).decode('utf-8'),
+            "category": self.categories[columns["category"][idx]],
+            "importance": int(columns["importance"][idx]),
+            "timestamp": datetime.fromtimestamp(float(columns["timestamp"][idx])).isoformat(),
+            "content_hash": columns["content_hash"][idx].decode('ascii')
+        }
+        extras = self._blob("extras", idx)
+        if extras:
+            record.update(json.loads(extras.decode('utf-8')))
+        record.update(self._overrides.get(idx, {}))
+        return record
+    
+    def __iter__(self) -> Iterator[Dict]:
+        for idx in range(len(self)):
+            yield self[idx]
+    
+    def _blob(self, name: str, idx: int) -> bytes:
+        """Bytes of one row of a variable-length column"""
+        offsets = self._columns[f"{name}_offsets"]
+        return self._columns[name][offsets[idx]:offsets[idx + 1]].tobytes()
+    
+    def append(self, record: Dict):
+        """Add one memory's metadata"""
+        self._intern(record["category"])
+        self._tail.append(record)
+    
+    def extend(self, records: List[Dict]):
+        """Add metadata for several memories"""
+        for record in records:
+            self.append(record)
+    
+    def update(self, idx: int, importance: int, timestamp: str):
+        """Change a memory's importance and timestamp"""
+        if idx >= self._rows:
+            self._tail[idx - self._rows].update(importance=importance, timestamp=timestamp)
+        else:
+            self._overrides[idx] = {"importance": importance, "timestamp": timestamp}
+    
+    def truncate(self, rows: int):
+        """Drop rows beyond the first ones"""
+        if rows <= self._rows:
+            self._rows = rows
+            self._tail = []
+            self._overrides = {idx: fields for idx, fields in self._overrides.items() if idx < rows}
+        else:
+            del self._tail[rows - self._rows:]
+    
+    def columns(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Category names plus per-row category codes, importance and epoch timestamps"""
+        rows = len(self)
+        category = np.empty(rows, dtype=np.int32)
+        importance = np.empty(rows, dtype=np.int32)
+        timestamp = np.empty(rows, dtype=np.float64)
+        if self._rows:
+            category[:self._rows] = self._columns["category"][:self._rows]
+            importance[:self._rows] = self._columns["importance"][:self._rows]
+            timestamp[:self._rows] = self._columns["timestamp"][:self._rows]
+        for idx, fields in self._overrides.items():
+            importance[idx] = fields["importance"]
+            timestamp[idx] = to_epoch(fields["timestamp"])
+        
+        for idx, record in enumerate(self._tail, self._rows):
+            category[idx] = self.category_codes[record["category"]]
+            importance[idx] = record.get("importance", 5)
+            timestamp[idx] = to_epoch(record["timestamp"])
+        return self.categories, category, importance, timestamp
+    
+    def content_hashes(self) -> Iterator[str]:
+        """Content hash of every row"""
+        if self._rows:
+            for value in self._columns["content_hash"][:self._rows].tolist():
+                yield value.decode('ascii')
+        for record in self._tail:
+            yield record.get("content_hash") or content_hash(record["content"], record["category"])
+    
+    def _blob_column(self, name: str, tail_values: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """Offsets and data of a variable-length column covering every row"""
+        if self._rows:
+            base_offsets = self._columns[f"{name}_offsets"][:self._rows + 1]
+            base_data = self._columns[name][:base_offsets[-1]]
+        else:
+            base_offsets = np.zeros(1, dtype=np.uint64)
+            base_data = np.zeros(0, dtype=np.uint8)
+        
+        tail_offsets = base_offsets[-1] + np.cumsum([len(value) for value in tail_values], dtype=np.uint64)
+        offsets = np.concatenate([base_offsets, tail_offsets]).astype(np.uint64)
+        data = np.concatenate([base_data, np.frombuffer(b"".join(tail_values), dtype=np.uint8)])
+        return offsets, data
+    
+    def write(self, f: BinaryIO):
+        """Write every row to a snapshot file"""
+        _, category, importance, timestamp = self.columns()
+        
+        hashes = np.empty(len(self), dtype="S40")
+        if self._rows:
+            hashes[:self._rows] = self._columns["content_hash"][:self._rows]
+        contents, extras = [], []
+        for idx, record in enumerate(self._tail, self._rows):
+            hashes[idx] = record.get("content_hash") or content_hash(record["content"], record["category"])
+            contents.append(record["content"].encode('utf-8'))
+            extra = {key: value for key, value in record.items() if key not in CORE_FIELDS}
+            extras.append(json.dumps(extra, default=str).encode('utf-8') if extra else b"")
+        
+        content_offsets, content = self._blob_column("content", contents)
+        extras_offsets, extras_data = self._blob_column("extras", extras)
+        
+        sections = {
+            "category": category,
+            "importance": importance,
+            "timestamp": timestamp,
+            "content_hash": hashes,
+            "content_offsets": content_offsets,
+            "content": content,
+            "extras_offsets": extras_offsets,
+            "extras": extras_data
+        }
+        
+        columns = {}
+        offset = 0
+        for name, array in sections.items():
+            offset = _aligned(offset)
+            columns[name] = [offset, array.dtype.str, len(array)]
+            offset += array.nbytes
+        header = json.dumps({"rows": len(self), "categories": self.categories, "columns": columns}).encode('utf-8')
+        
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        position = len(MAGIC) + HEADER_LENGTH.size + len(header)
+        data_start = _aligned(position)
+        f.write(b"\0" * (data_start - position))
+        position = data_start
+        
+        for name, array in sections.items():
+            begin = data_start + columns[name][0]
+            f.write(b"\0" * (begin - position))
+            f.write(np.ascontiguousarray(array).data)
+            position = begin + array.nbytes
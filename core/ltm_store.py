@@ -0,0 +1,556 @@
+"""
+Long-term Memory Store for Agentcore Demo
+Persists the FAISS index and columnar metadata as versioned snapshots plus an append-only log
+"""
+
+import faiss
+import numpy as np
+from typing import List, Dict, Optional, Tuple, Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .ltm_metadata import ColumnarMetadata
+from .ltm_index import read_index, materialize_index
+
+
+# Each log record: payload length, memory id, crc32 of payload
+RECORD_HEADER = struct.Struct("<IQI")
+# Set in the memory id of records that update an existing memory's fields (JSON payload only)
+UPDATE_FLAG = 1 << 63
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class LTMStore:
+    def __init__(self, collection_name: str, embedding_dim: int, base_dir: str = ".",
+                 fsync_policy: str = "always", fsync_interval: float = 1.0,
+                 compact_every: int = 1000, mmap_index: bool = False, keep_snapshots: int = 2):
+        """Initialize snapshot and log locations for a collection
+        
+        With mmap_index, load() folds the log into the snapshot and maps the
+        snapshot index instead of reading it into private memory. Each
+        snapshot is written as a new version and committed by atomically
+        replacing a small manifest; the newest keep_snapshots versions stay
+        on disk so processes still reading an older one are not cut off.
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync_policy}', expected one of {FSYNC_POLICIES}")
+        
+        self.collection_name = collection_name
+        self.embedding_dim = embedding_dim
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.mmap_index = mmap_index
+        self.index_mapped = False  # Whether the index returned by load() is memory-mapped
+        self.keep_snapshots = max(keep_snapshots, 1)
+        self.snapshot_version = 0  # Version last loaded or written by this process
+        
+        self.base_dir = base_dir
+        self.index_path = os.path.join(base_dir, f"{collection_name}_index.faiss")
+        self.metadata_path = os.path.join(base_dir, f"{collection_name}_metadata.col")
+        self.legacy_metadata_path = os.path.join(base_dir, f"{collection_name}_metadata.pkl")
+        self.manifest_path = os.path.join(base_dir, f"{collection_name}_snapshot.json")
+        self.lock_path = os.path.join(base_dir, f"{collection_name}.lock")
+        
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._log_file = None
+        self._log_seq = 0
+        self._log_records = 0
+        self._last_fsync = time.monotonic()
+        self._fsync_timer: Optional[threading.Timer] = None  # Pending "interval" fsync of the active segment
+        self._compactor: Optional[threading.Thread] = None
+        self._compaction_holds = 0  # hold_compaction() callers; background compaction waits for them
+        self._lock_file = None  # Held from load() to close(): this store is the collection's only writer
+    
+    def _segment_path(self, seq: int) -> str:
+        """Path of a log segment"""
+        return os.path.join(self.base_dir, f"{self.collection_name}_wal.{seq:06d}.log")
+    
+    def _segments(self) -> List[int]:
+        """Sequence numbers of log segments on disk, oldest first"""
+        prefix = f"{self.collection_name}_wal."
+        seqs = []
+        for name in os.listdir(self.base_dir):
+            if name.startswith(prefix) and name.endswith(".log"):
+                seq = name[len(prefix):-len(".log")]
+                if seq.isdigit():
+                    seqs.append(int(seq))
+        return sorted(seqs)
+    
+    def _snapshot_paths(self, version: int) -> Tuple[str, str]:
+        """Index and metadata paths of a snapshot version; version 0 is the unversioned layout"""
+        if version == 0:
+            return self.index_path, self.metadata_path
+        return (
+            os.path.join(self.base_dir, f"{self.collection_name}_index.v{version:06d}.faiss"),
+            os.path.join(self.base_dir, f"{self.collection_name}_metadata.v{version:06d}.col")
+        )
+    
+    def _versions(self) -> List[int]:
+        """Snapshot versions with files on disk, oldest first"""
+        prefix = f"{self.collection_name}_index.v"
+        versions = []
+        for name in os.listdir(self.base_dir):
+            if name.startswith(prefix) and name.endswith(".faiss"):
+                version = name[len(prefix):-len(".faiss")]
+                if version.isdigit():
+                    versions.append(int(version))
+        return sorted(versions)
+    
+    def latest_version(self) -> int:
+        """Snapshot version named by the manifest, 0 before the first versioned snapshot"""
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return int(json.load(f)["version"])
+        except FileNotFoundError:
+            return 0
+    
+    def _migrate_legacy_metadata(self):
+        """Convert metadata pickled by earlier versions into the columnar format, once"""
+        with open(self.legacy_metadata_path, 'rb') as f:
+            records = pickle.load(f)
+        
+        metadata = ColumnarMetadata()
+        metadata.extend(records)
+        self._write_metadata(metadata, self.metadata_path)
+        os.remove(self.legacy_metadata_path)
+    
+    def _read_snapshot(self, mmap: bool = False) -> Tuple[faiss.Index, ColumnarMetadata, bool, int]:
+        """Read the newest snapshot, or an empty index, whether the index is mapped, and its version"""
+        version = self.latest_version()
+        index_path, metadata_path = self._snapshot_paths(version)
+        if version == 0 and os.path.exists(index_path) and not os.path.exists(metadata_path) \
+                and os.path.exists(self.legacy_metadata_path):
+            self._migrate_legacy_metadata()
+        if not (os.path.exists(index_path) and os.path.exists(metadata_path)):
+            return faiss.IndexFlatL2(self.embedding_dim), ColumnarMetadata(), False, version
+        
+        index, mapped = read_index(index_path, mmap)
+        metadata = ColumnarMetadata.open(metadata_path)
+        
+        # Unversioned snapshots rename metadata into place before the index, so a
+        # crash in between leaves extra rows; they are still in the log and get replayed
+        metadata.truncate(index.ntotal)
+        return index, metadata, mapped, version
+    
+    def _read_segment(self, seq: int):
+        """Yield (memory_id, vector, metadata) records, stopping at a torn tail
+        
+        Update records come back with their flagged id and no vector.
+        """
+        vector_bytes = self.embedding_dim * 4
+        with open(self._segment_path(seq), 'rb') as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                length, memory_id, crc = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                if memory_id & UPDATE_FLAG:
+                    yield memory_id, None, json.loads(payload.decode('utf-8'))
+                    continue
+                vector = np.frombuffer(payload[:vector_bytes], dtype=np.float32)
+                yield memory_id, vector, json.loads(payload[vector_bytes:].decode('utf-8'))
+    
+    def _replay(self, index: faiss.Index, metadata: ColumnarMetadata, seqs: List[int],
+                mapped: bool = False) -> Tuple[faiss.Index, List[Tuple[int, Dict, bool]]]:
+        """Apply log records that are not yet in the index
+        
+        Returns the index, copied out of its mapping if records had to be
+        added to a mapped one, and (memory id, record, is_update) for every
+        record applied.
+        """
+        applied = []
+        for seq in seqs:
+            if not os.path.exists(self._segment_path(seq)):
+                # Already folded into the snapshot by a concurrent rewrite
+                continue
+            vectors = []
+            for memory_id, vector, record in self._read_segment(seq):
+                if vector is None:
+                    target = memory_id & ~UPDATE_FLAG
+                    if target < len(metadata):
+                        metadata.update(target, record["importance"], record["timestamp"])
+                        applied.append((target, record, True))
+                    continue
+                if memory_id < len(metadata):
+                    continue
+                if memory_id > len(metadata):
+                    break
+                vectors.append(vector)
+                metadata.append(record)
+                applied.append((memory_id, record, False))
+            if vectors:
+                if mapped:
+                    # FAISS aborts the process on writes to a mapped index
+                    index, mapped = materialize_index(index), False
+                index.add(np.vstack(vectors))
+        return index, applied
+    
+    def _write_metadata(self, metadata: ColumnarMetadata, path: str):
+        """Atomically replace a metadata file"""
+        metadata_tmp = f"{path}.tmp"
+        with open(metadata_tmp, 'wb') as f:
+            metadata.write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(metadata_tmp, path)
+    
+    def _write_manifest(self, version: int, memories: int):
+        """Atomically point the manifest at a snapshot version"""
+        index_path, metadata_path = self._snapshot_paths(version)
+        manifest = {
+            "version": version,
+            "index": os.path.basename(index_path),
+            "metadata": os.path.basename(metadata_path),
+            "memories": memories,
+            "created": datetime.now().isoformat()
+        }
+        manifest_tmp = f"{self.manifest_path}.tmp"
+        with open(manifest_tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(manifest_tmp, self.manifest_path)
+    
+    def _write_snapshot(self, index: faiss.Index, metadata: ColumnarMetadata) -> int:
+        """Write a new snapshot version and commit it through the manifest"""
+        version = max(self.latest_version(), self.snapshot_version) + 1
+        index_path, metadata_path = self._snapshot_paths(version)
+        index_tmp = f"{index_path}.tmp"
+        
+        # Files of a new version are complete before the manifest names them,
+        # and readers that mapped an older version keep their view of it
+        self._write_metadata(metadata, metadata_path)
+        faiss.write_index(index, index_tmp)
+        with open(index_tmp, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(index_tmp, index_path)
+        self._write_manifest(version, index.ntotal)
+        
+        self.snapshot_version = version
+        self._prune_snapshots(version)
+        return version
+    
+    def _prune_snapshots(self, current: int):
+        """Remove snapshot versions (and the unversioned layout) older than the ones kept"""
+        stale = [version for version in [0] + self._versions() if version <= current - self.keep_snapshots]
+        for version in stale:
+            for path in self._snapshot_paths(version):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    # Still mapped on platforms that refuse to delete open files; retried next time
+                    pass
+    
+    def _acquire_writer_lock(self):
+        """Take the collection's lock file, or raise if another process (or store) has it open
+        
+        The OS drops the lock when its holder exits, so a killed writer
+        never leaves the collection locked.
+        """
+        lock_file = open(self.lock_path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            try:
+                lock_file.seek(0)
+                holder = lock_file.read().strip()
+            except OSError:
+                holder = ""
+            lock_file.close()
+            raise RuntimeError(
+                f"LTM collection '{self.collection_name}' is already open for writing"
+                f"{f' by process {holder}' if holder else ''}; only one process may own it, so share it "
+                f"between worker processes through memory_service.py (MEMORY_SERVICE_URL)"
+            )
+        
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+    
+    def load(self) -> Tuple[faiss.Index, ColumnarMetadata]:
+        """Lock the collection, load the snapshot, replay the log on top of it and open a fresh segment
+        
+        Segments on disk were left by earlier writers; holding the lock
+        means none of them is still being written, so they can be
+        compacted away once replayed.
+        """
+        self._acquire_writer_lock()
+        seqs = self._segments()
+        if self.mmap_index and seqs:
+            # A mapped index is read-only, so fold the log in before mapping
+            self._compact(seqs)
+        
+        index, metadata, self.index_mapped, self.snapshot_version = self._read_snapshot(mmap=self.mmap_index)
+        if not self.index_mapped:
+            self._replay(index, metadata, seqs)
+        
+        with self._lock:
+            self._open_segment(seqs[-1] + 1 if seqs else 0)
+            if seqs and not self.mmap_index:
+                self._start_compaction()
+        
+        return index, metadata
+    
+    def _open_segment(self, seq: int):
+        """Start writing to a new log segment"""
+        if self._log_file is not None:
+            self._log_file.flush()
+            os.fsync(self._log_file.fileno())
+            self._log_file.close()
+        
+        self._log_seq = seq
+        self._log_records = 0
+        self._log_file = open(self._segment_path(seq), 'ab')
+        self._cancel_fsync_timer()  # The segment it was for has just been synced
+    
+    def _sync(self):
+        """Flush the active segment according to the fsync policy"""
+        self._log_file.flush()
+        
+        now = time.monotonic()
+        if self.fsync_policy == "always" or (
+            self.fsync_policy == "interval" and now - self._last_fsync >= self.fsync_interval
+        ):
+            os.fsync(self._log_file.fileno())
+            self._last_fsync = now
+            self._cancel_fsync_timer()
+        elif self.fsync_policy == "interval" and self._fsync_timer is None:
+            # Bound the window even if no further write comes to trigger the next fsync
+            self._fsync_timer = threading.Timer(self.fsync_interval - (now - self._last_fsync), self._fsync_due)
+            self._fsync_timer.daemon = True
+            self._fsync_timer.start()
+    
+    def _fsync_due(self):
+        """Timer callback: fsync writes the "interval" policy has left unsynced"""
+        with self._lock:
+            if self._fsync_timer is threading.current_thread():
+                self._fsync_timer = None
+            if self._log_file is not None:
+                os.fsync(self._log_file.fileno())
+                self._last_fsync = time.monotonic()
+    
+    def _cancel_fsync_timer(self):
+        if self._fsync_timer is not None:
+            self._fsync_timer.cancel()
+            self._fsync_timer = None
+    
+    def append(self, start_id: int, vectors: np.ndarray, records: List[Dict], sync: bool = True):
+        """Append memories to the log; they are durable once synced under 'always'"""
+        with self._lock:
+            chunks = []
+            for offset, (vector, record) in enumerate(zip(vectors, records)):
+                payload = (np.asarray(vector, dtype=np.float32).tobytes()
+                           + json.dumps(record, default=str).encode('utf-8'))
+                chunks.append(RECORD_HEADER.pack(len(payload), start_id + offset, zlib.crc32(payload)))
+                chunks.append(payload)
+            
+            self._log_file.write(b"".join(chunks))
+            if sync:
+                self._sync()
+            self._log_records += len(records)
+            
+            if self._log_records >= self.compact_every:
+                self._open_segment(self._log_seq + 1)
+                self._start_compaction()
+    
+    def append_update(self, memory_id: int, fields: Dict, sync: bool = True):
+        """Log a change to an existing memory's importance and timestamp"""
+        with self._lock:
+            payload = json.dumps(fields, default=str).encode('utf-8')
+            self._log_file.write(RECORD_HEADER.pack(len(payload), memory_id | UPDATE_FLAG, zlib.crc32(payload)))
+            self._log_file.write(payload)
+            if sync:
+                self._sync()
+            self._log_records += 1
+    
+    def disk_usage(self) -> int:
+        """Bytes used by the snapshots and log segments"""
+        paths = [self.index_path, self.metadata_path, self.manifest_path]
+        for version in self._versions():
+            paths.extend(self._snapshot_paths(version))
+        paths.extend(self._segment_path(seq) for seq in self._segments())
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+    
+    def flush(self):
+        """Sync the active segment according to the fsync policy"""
+        with self._lock:
+            self._sync()
+    
+    def _start_compaction(self, forced: bool = False):
+        """Fold sealed segments into the snapshot on a background thread"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if self._compaction_holds and not forced:
+            return
+        
+        sealed = [seq for seq in self._segments() if seq < self._log_seq]
+        if not sealed:
+            return
+        
+        self._compactor = threading.Thread(target=self._compact, args=(sealed,), daemon=True)
+        self._compactor.start()
+    
+    def _compact(self, sealed: List[int]):
+        """Build a new snapshot from the old one plus sealed segments"""
+        # Works on its own copy of the index, so live reads and writes are never blocked
+        with self._snapshot_lock:
+            index, metadata, _, _ = self._read_snapshot()
+            self._replay(index, metadata, sealed)
+            self._write_snapshot(index, metadata)
+            
+            for seq in sealed:
+                if os.path.exists(self._segment_path(seq)):
+                    os.remove(self._segment_path(seq))
+    
+    def rewrite(self, index: faiss.Index, metadata: ColumnarMetadata):
+        """Replace the snapshot with a live index and drop the log it already covers"""
+        with self._lock:
+            self._open_segment(self._log_seq + 1)
+            covered = [seq for seq in self._segments() if seq < self._log_seq]
+        
+        with self._snapshot_lock:
+            self._write_snapshot(index, metadata)
+            for seq in covered:
+                if os.path.exists(self._segment_path(seq)):
+                    os.remove(self._segment_path(seq))
+    
+    def rebuild(self, build: Callable[[faiss.Index], faiss.Index]) -> int:
+        """Write a new snapshot version whose index is build() of everything logged so far
+        
+        Runs on the caller's thread without blocking appends, which go to a
+        freshly opened segment meanwhile. Returns the new version.
+        """
+        with self._lock:
+            self._open_segment(self._log_seq + 1)
+            active = self._log_seq
+        
+        with self._snapshot_lock:
+            sealed = [seq for seq in self._segments() if seq < active]
+            index, metadata, _, _ = self._read_snapshot()
+            index, _ = self._replay(index, metadata, sealed)
+            version = self._write_snapshot(build(index), metadata)
+            for seq in sealed:
+                if os.path.exists(self._segment_path(seq)):
+                    os.remove(self._segment_path(seq))
+        return version
+    
+    def read_latest(self) -> Tuple[faiss.Index, ColumnarMetadata, bool, int]:
+        """Read the newest snapshot plus the log into a new state, leaving the live log alone
+        
+        Returns the index, metadata, whether the index is mapped and the
+        snapshot version. Records appended afterwards are picked up by
+        catch_up().
+        """
+        if self.mmap_index:
+            # Fold the log in first so the new snapshot can be mapped as is
+            self.compact()
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.flush()
+        
+        # Hold off compaction so no segment is folded away between reading the snapshot and replaying it
+        with self._snapshot_lock:
+            snapshot, metadata, mapped, version = self._read_snapshot(mmap=self.mmap_index)
+            index, _ = self._replay(snapshot, metadata, self._segments(), mapped=mapped)
+        return index, metadata, mapped and index is snapshot, version
+    
+    def catch_up(self, index: faiss.Index, metadata: ColumnarMetadata,
+                 mapped: bool) -> Tuple[faiss.Index, bool, List[Tuple[int, Dict, bool]]]:
+        """Replay records logged since read_latest(); the caller keeps writers out
+        
+        Returns the index (copied out of its mapping if records had to be
+        added), whether it is still mapped, and the records applied. If a
+        compaction has meanwhile folded segments away, latest_version() has
+        moved on and the caller should read again.
+        """
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.flush()
+            seqs = self._segments()
+        
+        caught_up, applied = self._replay(index, metadata, seqs, mapped=mapped)
+        return caught_up, mapped and caught_up is index, applied
+    
+    @contextmanager
+    def hold_compaction(self) -> Iterator[None]:
+        """Keep background compaction from folding segments away while a hot swap replays them
+        
+        Waits for a compaction already running; segments sealed meanwhile
+        are compacted once the last hold is released. compact() still runs.
+        """
+        with self._lock:
+            self._compaction_holds += 1
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._compaction_holds -= 1
+                if self._log_file is not None:
+                    self._start_compaction()
+    
+    def adopt(self, version: int):
+        """Take a swapped-in snapshot version as current"""
+        with self._lock:
+            self.snapshot_version = version
+    
+    def compact(self):
+        """Seal the active segment and compact synchronously"""
+        with self._lock:
+            if self._log_records:
+                self._open_segment(self._log_seq + 1)
+        
+        # A compaction already in flight may predate the segment sealed above,
+        # so wait for it and then run one more pass
+        for _ in range(2):
+            with self._lock:
+                self._start_compaction(forced=True)
+                compactor = self._compactor
+            if compactor is not None:
+                compactor.join()
+    
+    def close(self):
+        """Flush the log and wait for any running compaction"""
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.flush()
+                os.fsync(self._log_file.fileno())
+                self._log_file.close()
+                self._log_file = None
+            self._cancel_fsync_timer()
+            compactor = self._compactor
+        
+        if compactor is not None:
+            compactor.join()
+        
+        if self._lock_file is not None:
+            self._lock_file.close()  # Releases the writer lock
+            self._lock_file = None
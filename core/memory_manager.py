@@ -5,129 +5,843 @@ Handles both short-term and long-term memory operations
 
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, Callable
+from contextlib import contextmanager
 import json
 from datetime import datetime
-import tiktoken
-import pickle
+import csv
+import itertools
 import os
+import threading
+import time
+import tiktoken
+
+from .short_term_memory import ShortTermMemory
+from .ltm_store import LTMStore
+from .ltm_metadata import ColumnarMetadata, content_hash
+from .ltm_index import (
+    DEFAULT_INDEX_SPEC, build_index, materialize_index, min_training_points, is_flat, index_vectors,
+    search_params, search_subset
+)
+from .ltm_filter import FilterColumns, MaskSelector, TimeBound
+from .embedding_batcher import EmbeddingBatcher
+from .query_cache import QueryCache
+from .reranker import Reranker
+from .consolidation import ConsolidationWorker
+from .ltm_dedup import DEDUP_POLICIES, find_near_duplicates, duplicate_clusters
+from .encoders import DEFAULT_EMBEDDING_MODEL, load_encoder
+from .metrics import Metrics
+from .rwlock import RWLock
+
+
+def iter_memory_file(path: str) -> Iterator[Dict]:
+    """Stream memories from a JSONL or CSV file
+    
+    CSV files need "content" and "category" columns; "importance" is optional
+    and any other column is kept as metadata.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == ".csv":
+            for row in csv.DictReader(f):
+                content = row.pop("content")
+                category = row.pop("category")
+                importance = row.pop("importance", None)
+                yield {
+                    "content": content,
+                    "category": category,
+                    "importance": int(importance) if importance else 5,
+                    "metadata": {key: value for key, value in row.items() if value}
+                }
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported memory file format: {path}")
+
+
+# Unlocked replay passes before a hot swap, stopping once a pass adds no more than this many memories
+CATCH_UP_PASSES = 5
+CATCH_UP_LOCKED_MAX = 32
+# STM roles never consolidated into LTM: assistant replies quote LTM back
+CONSOLIDATION_SKIP_ROLES = ("assistant",)
 
 
 class MemoryManager:
-    def __init__(self, stm_max_tokens: int = 200, collection_name: str = "knight_memories"):
-        """Initialize memory management system"""
+    def __init__(self, stm_max_tokens: int = 200, collection_name: str = "knight_memories",
+                 fsync_policy: str = "always", compact_every: int = 1000,
+                 index_spec: str = DEFAULT_INDEX_SPEC, ann_threshold: int = 10000,
+                 nprobe: int = 8, ef_search: int = 64, mmap_index: bool = False, keep_snapshots: int = 2,
+                 query_batching: bool = False, query_batch_size: int = 32, query_batch_wait_ms: float = 2.0,
+                 query_cache_size: int = 1024, rerank: bool = False, rerank_overfetch: int = 4,
+                 similarity_weight: float = 1.0, importance_weight: float = 0.3, recency_weight: float = 0.2,
+                 recency_half_life_hours: float = 168.0, consolidation: bool = False,
+                 consolidation_min_importance: int = 6, consolidation_high_importance: int = 7,
+                 consolidation_batch_size: int = 32, consolidation_max_wait_ms: float = 1000.0,
+                 consolidation_similarity: float = 0.95, dedup: str = "off", dedup_similarity: float = 0.95,
+                 embedding_model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 embedding_backend: str = "torch", onnx_dir: Optional[str] = None, lazy_load: bool = False,
+                 metrics: bool = True):
+        """Initialize memory management system
+        
+        With lazy_load the embedding model, tokenizer and LTM index are
+        loaded on first use or by warm_up()/start_warmup(), so construction
+        returns immediately. embedding_backend picks the encoder: "torch"
+        (reference), "int8", "onnx", "onnx-int8" or "hash" (offline stub
+        for benchmarks). With mmap_index the LTM index is memory-mapped from
+        the page cache until the first write. Only one process may open a
+        collection; other workers reach it through memory_service.py. With
+        consolidation, user STM messages that are evicted (importance >= consolidation_min_importance) or
+        added with importance >= consolidation_high_importance are moved to
+        LTM by a background worker; assistant replies, which quote LTM back,
+        never are, and messages without an importance count as 5. dedup ("reject" or "merge") stops memories
+        with cosine similarity >= dedup_similarity to a stored one from
+        being added; "merge" raises the stored memory's importance and
+        refreshes its timestamp instead. metrics records latency histograms
+        for embedding, index search, metadata lookup, tokenization and
+        persistence (see self.metrics). Snapshots are versioned;
+        reload_ltm() and rebuild_ltm() swap in a new version while the
+        manager keeps serving, and keep_snapshots versions stay on disk.
+        """
+        if dedup not in DEDUP_POLICIES:
+            raise ValueError(f"Unknown dedup policy '{dedup}', expected one of {DEDUP_POLICIES}")
+        
         self.stm_max_tokens = stm_max_tokens
-        self.short_term_memory = []
+        self.metrics = Metrics(enabled=metrics)
+        self.metrics.gauge(
+            "agentcore_ltm_memories", "Memories in long-term storage",
+            lambda: self.ltm_index.ntotal if self._ltm_loaded else None
+        )
+        
+        # Heavy resources, loaded once under _load_lock
+        self._load_lock = threading.RLock()
+        self._embedding_model = None
+        self.embedding_model_name = embedding_model_name
+        self.embedding_backend = embedding_backend
+        self.onnx_dir = onnx_dir
+        self._encoding = None
+        self._ltm_loaded = False
+        self._ready = threading.Event()
+        self._warmup_thread = None
+        self.warmup_error: Optional[BaseException] = None
+        self.startup_timings: Dict[str, float] = {}  # Phase -> seconds
         
         # Initialize FAISS for long-term memory
         self.collection_name = collection_name
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
         self.embedding_dim = 384  # Dimension for all-MiniLM-L6-v2
         
-        # Initialize FAISS index
+        # Optionally share query-embedding forward passes across concurrent requests
+        self.query_batcher = None
+        if query_batching:
+            self.query_batcher = EmbeddingBatcher(
+                self._encode,
+                max_batch_size=query_batch_size,
+                max_wait_ms=query_batch_wait_ms
+            )
+        
+        # Repeated queries reuse their embedding and, until LTM changes, their results
+        self.query_cache = QueryCache(query_cache_size) if query_cache_size > 0 else None
+        self.ltm_version = 0  # Bumped on every LTM change to invalidate cached results
+        
+        # Optional re-rank of over-fetched neighbors by similarity, importance and recency
+        self.rerank = rerank
+        self.reranker = Reranker(
+            similarity_weight=similarity_weight,
+            importance_weight=importance_weight,
+            recency_weight=recency_weight,
+            half_life_hours=recency_half_life_hours,
+            overfetch=rerank_overfetch
+        )
+        
+        # Moves STM messages into LTM off the request path
+        self.consolidation_min_importance = consolidation_min_importance
+        self.consolidation_high_importance = consolidation_high_importance
+        self.consolidator = None
+        if consolidation:
+            self.consolidator = ConsolidationWorker(
+                self._encode,
+                self.nearest_ltm,
+                self.add_embedded_to_ltm,
+                batch_size=consolidation_batch_size,
+                max_wait_ms=consolidation_max_wait_ms,
+                similarity_threshold=consolidation_similarity
+            )
+        self.stm = self.create_stm()
+        
+        # Concurrent searches, one writer at a time for the LTM index, metadata and log
+        self._ltm_lock = RWLock()
+        self._reload_lock = threading.Lock()  # One hot swap at a time
+        self._rebuild_lock = threading.Lock()  # One index rebuild at a time
+        self._reload_thread = None
+        self._migrate_thread = None
+        self.last_reload: Optional[Dict] = None
+        self.reload_error: Optional[BaseException] = None
+        
+        # Near-duplicate handling on insert
+        self.dedup = dedup
+        self.dedup_similarity = dedup_similarity
+        self.dedup_counts = {"rejected": 0, "merged": 0}
+        
+        # Initialize FAISS index; exact search until the collection
+        # grows past ann_threshold, then the index_spec backend
         self.ltm_index = faiss.IndexFlatL2(self.embedding_dim)
-        self.ltm_metadata = []  # Store metadata separately
+        self.ltm_index_mapped = False  # Read-only memory-mapped index, copied on first write
+        self.ltm_metadata = ColumnarMetadata()  # Store metadata separately
+        self.index_spec = index_spec
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self.ef_search = ef_search
         
-        # Load existing memories if available
-        self._load_ltm()
+        # Snapshot + write-ahead log persistence
+        self.ltm_store = LTMStore(
+            collection_name,
+            self.embedding_dim,
+            fsync_policy=fsync_policy,
+            compact_every=compact_every,
+            mmap_index=mmap_index,
+            keep_snapshots=keep_snapshots
+        )
         
-        # Token counter
-        self.encoding = tiktoken.get_encoding("cl100k_base")
+        if not lazy_load:
+            self.warm_up()
+    
+    @contextmanager
+    def _timed(self, phase: str):
+        """Record how long a startup phase takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[phase] = time.perf_counter() - start
+    
+    @property
+    def embedding_model(self):
+        """Sentence encoder for the configured backend, loaded on first use"""
+        if self._embedding_model is None:
+            with self._load_lock:
+                if self._embedding_model is None:
+                    with self._timed("embedding_model"):
+                        encoder = load_encoder(self.embedding_backend, self.embedding_model_name, self.onnx_dir)
+                    if encoder.dim != self.embedding_dim:
+                        raise ValueError(f"Encoder {self.embedding_model_name} produces {encoder.dim}-dim "
+                                         f"embeddings, LTM expects {self.embedding_dim}")
+                    self._embedding_model = encoder
+        return self._embedding_model
+    
+    @property
+    def encoding(self):
+        """Token counter, loaded on first use"""
+        if self._encoding is None:
+            with self._load_lock:
+                if self._encoding is None:
+                    with self._timed("tokenizer"):
+                        self._encoding = tiktoken.get_encoding("cl100k_base")
+        return self._encoding
+    
+    def _ensure_ltm(self):
+        """Load existing memories on first use"""
+        if not self._ltm_loaded:
+            with self._load_lock:
+                if not self._ltm_loaded:
+                    with self._timed("ltm_load"):
+                        self._load_ltm()
+                    self._ltm_loaded = True
+    
+    def warm_up(self, then: Optional[Callable[[], None]] = None):
+        """Load LTM, tokenizer and embedding model now, then run an optional follow-up step"""
+        try:
+            self._ensure_ltm()
+            self.encoding
+            self.embedding_model
+            if then is not None:
+                with self._timed(getattr(then, "__name__", "then")):
+                    then()
+        except BaseException as e:
+            self.warmup_error = e
+            raise
+        finally:
+            self._ready.set()
+    
+    def start_warmup(self, then: Optional[Callable[[], None]] = None) -> threading.Thread:
+        """Run warm_up() on a background thread"""
+        def run():
+            try:
+                self.warm_up(then)
+            except Exception:
+                pass  # Kept in warmup_error and reported by get_readiness()
+        
+        self._warmup_thread = threading.Thread(target=run, name="memory-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+    
+    def is_ready(self) -> bool:
+        """Whether warm-up has finished successfully"""
+        return self._ready.is_set() and self.warmup_error is None
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up finishes"""
+        return self._ready.wait(timeout) and self.warmup_error is None
+    
+    def get_readiness(self) -> Dict:
+        """Readiness and startup phase timings"""
+        return {
+            "ready": self.is_ready(),
+            "ltm_loaded": self._ltm_loaded,
+            "embeddings_loaded": self._embedding_model is not None,
+            "embedding_backend": self.embedding_backend,
+            "startup_timings": {phase: round(seconds, 4) for phase, seconds in self.startup_timings.items()},
+            "error": str(self.warmup_error) if self.warmup_error is not None else None
+        }
     
     def _load_ltm(self):
-        """Load long-term memory from disk"""
-        index_path = f"./{self.collection_name}_index.faiss"
-        metadata_path = f"./{self.collection_name}_metadata.pkl"
+        """Load long-term memory snapshot and replay the write-ahead log"""
+        self.ltm_index, self.ltm_metadata = self.ltm_store.load()
+        self.ltm_index_mapped = self.ltm_store.index_mapped
+        self.ltm_filters = FilterColumns()
+        self.ltm_filters.extend_columns(*self.ltm_metadata.columns())
+        self._content_hashes = None  # Built on first duplicate check
+        self._maybe_migrate_index()
+    
+    def _maybe_migrate_index(self):
+        """Start moving from the exact Flat index to the configured ANN index once LTM is large enough
+        
+        The ANN index is trained and built on a background thread and
+        hot-swapped in by rebuild_ltm(); searches keep using Flat until then.
+        """
+        if self.index_spec == DEFAULT_INDEX_SPEC or not is_flat(self.ltm_index):
+            return
+        if self._rebuild_lock.locked() or (self._migrate_thread is not None and self._migrate_thread.is_alive()):
+            return  # rebuild_ltm() is about to swap in a rebuilt index
+        
+        threshold = max(self.ann_threshold, min_training_points(self.index_spec, self.embedding_dim))
+        if self.ltm_index.ntotal < threshold:
+            return
+        
+        def run():
+            try:
+                self.rebuild_ltm()
+                self.reload_error = None
+            except Exception as e:
+                self.reload_error = e  # Reported by get_ltm_stats(); the next write tries again
+        
+        self._migrate_thread = threading.Thread(target=run, name="ltm-migrate", daemon=True)
+        self._migrate_thread.start()
+    
+    def _writable_index(self) -> faiss.Index:
+        """The LTM index, first copied into private memory if it is memory-mapped"""
+        if self.ltm_index_mapped:
+            # FAISS aborts the process on writes to a mapped index
+            self.ltm_index = materialize_index(self.ltm_index)
+            self.ltm_index_mapped = False
+        return self.ltm_index
+    
+    def reload_ltm(self) -> Dict:
+        """Load the newest on-disk snapshot and swap it in without pausing searches
+        
+        The snapshot is read and its filters built off the serving path;
+        only replaying writes logged meanwhile and swapping the references
+        happen under the write lock. Searches already running finish on the
+        old version. rebuild_ltm() uses it to swap in the snapshot it wrote;
+        no other process writes snapshots while this one holds the collection.
+        """
+        self._ensure_ltm()
+        # Under steady writes, background compactions would otherwise keep
+        # publishing versions newer than the one being caught up
+        with self._reload_lock, self.ltm_store.hold_compaction():
+            start = time.perf_counter()
+            report = None
+            while report is None:
+                report = self._swap_in_latest()
+            report["seconds"] = time.perf_counter() - start
+        self.last_reload = report
+        return report
+    
+    def _swap_in_latest(self) -> Optional[Dict]:
+        """One attempt at reload_ltm(); None if a compaction raced it and it must read again"""
+        index, metadata, mapped, version = self.ltm_store.read_latest()
+        # Replay what was logged while loading, so the locked pass only sees the last few writes
+        for _ in range(CATCH_UP_PASSES):
+            index, mapped, applied = self.ltm_store.catch_up(index, metadata, mapped)
+            if sum(not is_update for _, _, is_update in applied) <= CATCH_UP_LOCKED_MAX:
+                break
+        filters = FilterColumns()
+        filters.extend_columns(*metadata.columns())
+        
+        with self._ltm_lock.write():
+            swap_start = time.perf_counter()
+            index, mapped, applied = self.ltm_store.catch_up(index, metadata, mapped)
+            if self.ltm_store.latest_version() != version:
+                return None
+            for memory_id, record, is_update in applied:
+                if is_update:
+                    filters.update(memory_id, record["importance"], record["timestamp"])
+                else:
+                    filters.extend([record])
+            
+            before = self.ltm_index.ntotal
+            self.ltm_index = index
+            self.ltm_index_mapped = mapped
+            self.ltm_metadata = metadata
+            self.ltm_filters = filters
+            self._content_hashes = None
+            self.ltm_version += 1
+            self.ltm_store.adopt(version)
+            swap_ms = 1000 * (time.perf_counter() - swap_start)
+        
+        return {
+            "version": version,
+            "memories_before": before,
+            "memories_after": index.ntotal,
+            "replayed": len(applied),
+            "swap_ms": swap_ms
+        }
+    
+    def start_reload(self) -> threading.Thread:
+        """Run reload_ltm() on a background thread"""
+        def run():
+            try:
+                self.reload_ltm()
+                self.reload_error = None
+            except Exception as e:
+                self.reload_error = e  # Reported by get_ltm_stats()
+        
+        self._reload_thread = threading.Thread(target=run, name="ltm-reload", daemon=True)
+        self._reload_thread.start()
+        return self._reload_thread
+    
+    def rebuild_ltm(self, index_spec: Optional[str] = None) -> Dict:
+        """Rebuild the LTM index as a new snapshot version and hot-swap it in
         
-        if os.path.exists(index_path) and os.path.exists(metadata_path):
-            self.ltm_index = faiss.read_index(index_path)
-            with open(metadata_path, 'rb') as f:
-                self.ltm_metadata = pickle.load(f)
+        index_spec (default: the configured one) may name a different FAISS
+        backend; small collections that cannot train it stay exact. Writes
+        and searches continue while the index is built.
+        """
+        self._ensure_ltm()
+        spec = index_spec or self.index_spec
+        
+        def build(index: faiss.Index) -> faiss.Index:
+            chosen = spec if index.ntotal >= min_training_points(spec, self.embedding_dim) else DEFAULT_INDEX_SPEC
+            return build_index(chosen, self.embedding_dim, index_vectors(index))
+        
+        start = time.perf_counter()
+        with self._rebuild_lock:
+            self.ltm_store.rebuild(build)
+            report = dict(self.reload_ltm())
+            # Only now, so writers meanwhile do not migrate the old Flat index to spec as well
+            self.index_spec = spec
+        report["seconds"] = time.perf_counter() - start
+        report["ltm_index"] = type(self.ltm_index).__name__
+        return report
+    
+    def close(self):
+        """Flush pending long-term memory writes and stop background threads"""
+        if self._warmup_thread is not None:
+            self._warmup_thread.join()
+        if self._reload_thread is not None:
+            self._reload_thread.join()
+        if self._migrate_thread is not None:
+            self._migrate_thread.join()
+        if self.consolidator is not None:
+            self.consolidator.close()
+        if self.query_batcher is not None:
+            self.query_batcher.close()
+        with self._ltm_lock.write():
+            self.ltm_store.close()
+    
+    def _encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts as a float32 matrix"""
+        encoder = self.embedding_model
+        with self.metrics.stage("embed"):
+            return encoder.encode(texts, batch_size=batch_size)
     
-    def _save_ltm(self):
-        """Save long-term memory to disk"""
-        index_path = f"./{self.collection_name}_index.faiss"
-        metadata_path = f"./{self.collection_name}_metadata.pkl"
+    def encode_query(self, query: str) -> np.ndarray:
+        """Embed a search query, from the cache or through the micro-batcher when enabled"""
+        if self.query_cache is not None:
+            embedding = self.query_cache.get_embedding(query)
+            if embedding is not None:
+                return embedding
         
-        faiss.write_index(self.ltm_index, index_path)
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(self.ltm_metadata, f)
+        if self.query_batcher is not None:
+            embedding = self.query_batcher.encode(query)
+        else:
+            embedding = self._encode([query])[0]
+        
+        if self.query_cache is not None:
+            self.query_cache.put_embedding(query, embedding)
+        return embedding
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
-        return len(self.encoding.encode(text))
+        encoding = self.encoding
+        with self.metrics.stage("stm_tokenize"):
+            return len(encoding.encode(text))
     
-    def add_to_stm(self, role: str, content: str, metadata: Optional[Dict] = None):
-        """Add message to short-term memory"""
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
-        self.short_term_memory.append(message)
-        self._manage_stm_size()
+    @property
+    def short_term_memory(self):
+        """Messages in the default short-term memory window"""
+        return self.stm.messages
+    
+    @property
+    def stm_tokens(self) -> int:
+        """Token total of the default short-term memory window"""
+        return self.stm.tokens
+    
+    def create_stm(self, on_resize=None) -> ShortTermMemory:
+        """Create an independent short-term memory window with this manager's budget"""
+        return ShortTermMemory(
+            self.stm_max_tokens,
+            self.count_tokens,
+            on_resize=on_resize,
+            on_add=self._offer_important if self.consolidator is not None else None,
+            on_evict=self._offer_evicted if self.consolidator is not None else None
+        )
+    
+    def _offer_important(self, message: Dict):
+        """Queue a newly added STM message for LTM if it is important enough"""
+        if message["role"] not in CONSOLIDATION_SKIP_ROLES \
+                and message["metadata"].get("importance", 5) >= self.consolidation_high_importance:
+            message["consolidation_queued"] = self._submit_for_consolidation(message)
+    
+    def _offer_evicted(self, message: Dict):
+        """Queue an evicted STM message for LTM unless it is already queued or unimportant"""
+        if not message.get("consolidation_queued") and message["role"] not in CONSOLIDATION_SKIP_ROLES \
+                and message["metadata"].get("importance", 5) >= self.consolidation_min_importance:
+            self._submit_for_consolidation(message)
+    
+    def _submit_for_consolidation(self, message: Dict) -> bool:
+        """Hand an STM message to the consolidation worker; never blocks"""
+        metadata = dict(message["metadata"])
+        importance = metadata.pop("importance", 5)
+        return self.consolidator.submit({
+            "content": message["content"],
+            "category": "conversation",
+            "importance": importance,
+            "metadata": {**metadata, "role": message["role"], "stm_timestamp": message["timestamp"]},
+            "embedding": message.get("embedding")
+        })
+    
+    def offer_for_consolidation(self, message: Dict, evicted: bool = False):
+        """Queue an STM message held elsewhere (e.g. by a remote client) as if it were added or evicted here"""
+        if self.consolidator is not None:
+            if evicted:
+                self._offer_evicted(message)
+            else:
+                self._offer_important(message)
+    
+    def add_to_stm(self, role: str, content: str, metadata: Optional[Dict] = None, tokens: Optional[int] = None,
+                   embedding: Optional[np.ndarray] = None):
+        """Add message to short-term memory, with its token count and embedding if already known"""
+        self.stm.add(role, content, metadata, tokens, embedding)
     
     def _manage_stm_size(self):
         """Manage STM size by removing old messages"""
-        total_tokens = sum(self.count_tokens(msg["content"]) for msg in self.short_term_memory)
-        
-        while total_tokens > self.stm_max_tokens and len(self.short_term_memory) > 1:
-            removed = self.short_term_memory.pop(0)
-            total_tokens -= self.count_tokens(removed["content"])
+        self.stm._manage_size()
     
-    def get_stm_context(self) -> List[Dict]:
-        """Get current short-term memory context"""
-        return self.short_term_memory.copy()
+    def get_stm_context(self, recent: Optional[int] = None) -> List[Dict]:
+        """Get current short-term memory context, optionally only the most recent messages"""
+        return self.stm.get_context(recent)
     
     def add_to_ltm(self, content: str, category: str, importance: int = 5, metadata: Optional[Dict] = None):
         """Add memory to long-term storage"""
-        # Generate embedding
-        embedding = self.embedding_model.encode([content])[0]
-        
-        # Add to FAISS index
-        self.ltm_index.add(np.array([embedding], dtype=np.float32))
-        
-        # Store metadata
-        full_metadata = {
+        self.add_many_to_ltm([{
             "content": content,
             "category": category,
             "importance": importance,
-            "timestamp": datetime.now().isoformat(),
-            **(metadata or {})
+            "metadata": metadata
+        }])
+    
+    def add_many_to_ltm(self, memories: Iterable[Dict], batch_size: int = 64) -> Dict:
+        """Bulk-add memories to long-term storage, embedding and indexing per batch
+        
+        Each memory is a dict with "content", "category" and optional
+        "importance" and "metadata". Accepts any iterable, so large imports
+        can be streamed. The log is synced once at the end.
+        """
+        self._ensure_ltm()
+        start = time.perf_counter()
+        added = 0
+        version = self.ltm_version
+        memories = iter(memories)
+        
+        while True:
+            batch = list(itertools.islice(memories, batch_size))
+            if not batch:
+                break
+            
+            # Generate embeddings for the whole batch in one forward pass
+            embeddings = self._encode([memory["content"] for memory in batch], batch_size=batch_size)
+            
+            with self._ltm_lock.write():
+                added += self._commit_to_ltm(batch, embeddings)
+        
+        # Merged duplicates log updates even when nothing new was added
+        if self.ltm_version != version:
+            with self._ltm_lock.write(), self.metrics.stage("persistence"):
+                self.ltm_store.flush()
+                self._maybe_migrate_index()
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "added": added,
+            "seconds": elapsed,
+            "memories_per_sec": added / elapsed if elapsed > 0 else 0.0
         }
-        self.ltm_metadata.append(full_metadata)
+    
+    def _commit_to_ltm(self, memories: List[Dict], embeddings: np.ndarray) -> int:
+        """Log and index a batch of embedded memories; the caller holds the write lock"""
+        timestamp = datetime.now().isoformat()
+        if self.dedup != "off":
+            memories, embeddings = self._drop_near_duplicates(memories, embeddings, timestamp)
+            if not memories:
+                return 0
+        
+        # Build metadata
+        records = []
+        for memory in memories:
+            records.append({
+                "content": memory["content"],
+                "category": memory["category"],
+                "importance": memory.get("importance", 5),
+                "timestamp": timestamp,
+                "content_hash": content_hash(memory["content"], memory["category"]),
+                **(memory.get("metadata") or {})
+            })
         
-        # Save to disk
-        self._save_ltm()
+        # Append to the write-ahead log before touching the index
+        with self.metrics.stage("persistence"):
+            self.ltm_store.append(self.ltm_index.ntotal, embeddings, records, sync=False)
+        
+        # Add to FAISS index
+        self._writable_index().add(embeddings)
+        self.ltm_metadata.extend(records)
+        self.ltm_filters.extend(records)
+        self._known_hashes().update(record["content_hash"] for record in records)
+        self.ltm_version += 1
+        return len(records)
     
-    def retrieve_from_ltm(self, query: str, n_results: int = 3, category: Optional[str] = None) -> List[Dict]:
-        """Retrieve relevant memories from long-term storage"""
+    def _drop_near_duplicates(self, memories: List[Dict], embeddings: np.ndarray, timestamp: str):
+        """Remove memories nearly identical to stored ones or to earlier ones in the batch
+        
+        Under "merge" the memory they duplicate takes the higher importance
+        and the new timestamp.
+        """
+        stored, earlier = find_near_duplicates(embeddings, *self.nearest_ltm(embeddings), self.dedup_similarity)
+        keep = (stored < 0) & (earlier < 0)
+        
+        if self.dedup == "merge":
+            for row in np.flatnonzero(~keep):
+                importance = memories[row].get("importance", 5)
+                if stored[row] >= 0:
+                    memory_id = int(stored[row])
+                    importance = max(importance, self.ltm_metadata[memory_id].get("importance", 5))
+                    self._update_ltm(memory_id, importance, timestamp)
+                else:
+                    # Merge into the batch's first copy before it is added
+                    target = memories[earlier[row]] = dict(memories[earlier[row]])
+                    target["importance"] = max(importance, target.get("importance", 5))
+        
+        self.dedup_counts["merged" if self.dedup == "merge" else "rejected"] += int((~keep).sum())
+        rows = np.flatnonzero(keep)
+        return [memories[row] for row in rows], embeddings[rows]
+    
+    def _update_ltm(self, memory_id: int, importance: int, timestamp: str):
+        """Change a stored memory's importance and timestamp; the caller holds the write lock"""
+        with self.metrics.stage("persistence"):
+            self.ltm_store.append_update(memory_id, {"importance": importance, "timestamp": timestamp}, sync=False)
+        self.ltm_metadata.update(memory_id, importance, timestamp)
+        self.ltm_filters.update(memory_id, importance, timestamp)
+        self.ltm_version += 1
+    
+    def add_embedded_to_ltm(self, memories: List[Dict], embeddings: np.ndarray) -> int:
+        """Add memories whose embeddings are already computed, syncing the log once"""
+        self._ensure_ltm()
+        with self._ltm_lock.write():
+            added = self._commit_to_ltm(memories, np.asarray(embeddings, dtype=np.float32))
+            with self.metrics.stage("persistence"):
+                self.ltm_store.flush()
+            self._maybe_migrate_index()
+        return added
+    
+    def nearest_ltm(self, embeddings: np.ndarray):
+        """Squared L2 distance to (inf if none) and id of each embedding's nearest stored memory"""
+        self._ensure_ltm()
+        with self._ltm_lock.read():
+            if self.ltm_index.ntotal == 0:
+                return np.full(len(embeddings), np.inf, dtype=np.float32), np.full(len(embeddings), -1, dtype=np.int64)
+            distances, indices = self.ltm_index.search(np.asarray(embeddings, dtype=np.float32), 1)
+        return np.where(indices[:, 0] >= 0, distances[:, 0], np.inf), indices[:, 0]
+    
+    def deduplicate_ltm(self, similarity: Optional[float] = None, dry_run: bool = False) -> Dict:
+        """Collapse clusters of near-identical memories and rebuild the index and snapshot
+        
+        Each cluster keeps its oldest memory, with the highest importance
+        and latest timestamp of the group. Reports the memories removed and
+        the disk space reclaimed.
+        """
+        self._ensure_ltm()
+        similarity = self.dedup_similarity if similarity is None else similarity
+        start = time.perf_counter()
+        
+        with self._ltm_lock.write():
+            self.ltm_store.compact()
+            bytes_before = self.ltm_store.disk_usage()
+            before = self.ltm_index.ntotal
+            
+            labels = duplicate_clusters(self.ltm_index, similarity)
+            keep = np.flatnonzero(labels == np.arange(before))
+            report = {
+                "memories_before": before,
+                "memories_after": len(keep),
+                "removed": before - len(keep),
+                "bytes_before": bytes_before
+            }
+            
+            if len(keep) < before and not dry_run:
+                _, _, importance, timestamps = self.ltm_metadata.columns()
+                top_importance = np.zeros(before, dtype=np.int64)
+                latest = np.zeros(before, dtype=np.float64)
+                np.maximum.at(top_importance, labels, importance)
+                np.maximum.at(latest, labels, timestamps)
+                counts = np.bincount(labels, minlength=before)
+                
+                metadata = ColumnarMetadata()
+                for memory_id in keep:
+                    record = dict(self.ltm_metadata[memory_id])
+                    if counts[memory_id] > 1:
+                        record["importance"] = int(top_importance[memory_id])
+                        record["timestamp"] = datetime.fromtimestamp(latest[memory_id]).isoformat()
+                        record["duplicates_merged"] = record.get("duplicates_merged", 0) + int(counts[memory_id]) - 1
+                    metadata.append(record)
+                
+                vectors = index_vectors(self.ltm_index)[keep]
+                spec = self.index_spec
+                if is_flat(self.ltm_index) or len(keep) < min_training_points(spec, self.embedding_dim):
+                    spec = DEFAULT_INDEX_SPEC
+                index = build_index(spec, self.embedding_dim, vectors)
+                
+                self.ltm_store.rewrite(index, metadata)
+                self.ltm_index = index
+                self.ltm_index_mapped = False
+                self.ltm_metadata = metadata
+                self.ltm_filters = FilterColumns()
+                self.ltm_filters.extend_columns(*metadata.columns())
+                self._content_hashes = None
+                self.ltm_version += 1
+            
+            report["bytes_after"] = self.ltm_store.disk_usage()
+        
+        report["bytes_reclaimed"] = report["bytes_before"] - report["bytes_after"]
+        report["seconds"] = time.perf_counter() - start
+        return report
+    
+    def import_ltm_file(self, path: str, batch_size: int = 64) -> Dict:
+        """Bulk-import memories from a JSONL or CSV file"""
+        return self.add_many_to_ltm(iter_memory_file(path), batch_size=batch_size)
+    
+    def _known_hashes(self) -> set:
+        """Content hashes of all stored memories"""
+        if self._content_hashes is None:
+            self._content_hashes = set(self.ltm_metadata.content_hashes())
+        return self._content_hashes
+    
+    def has_memory(self, content: str, category: str) -> bool:
+        """Check whether identical content is already stored in long-term memory"""
+        self._ensure_ltm()
+        with self._ltm_lock.read():
+            return content_hash(content, category) in self._known_hashes()
+    
+    def retrieve_from_ltm(self, query: str, n_results: int = 3, category: Optional[str] = None,
+                          min_importance: Optional[float] = None, max_importance: Optional[float] = None,
+                          since: TimeBound = None, until: TimeBound = None,
+                          nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                          rerank: Optional[bool] = None, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """Retrieve relevant memories from long-term storage
+        
+        Category, importance and timestamp filters are applied inside the
+        index search, so a filtered query still returns n_results memories
+        whenever that many match. nprobe (IVF) and ef_search (HNSW) trade
+        recall for latency and default to the values given at construction.
+        With rerank (default: the constructor setting) more neighbors are
+        fetched and the best n_results by blended similarity, importance
+        and recency are returned, each with its "score". query_embedding,
+        when the caller has already embedded the query, skips embedding it.
+        Safe to call from many threads; searches run side by side and only
+        wait while a write is being applied.
+        """
+        self._ensure_ltm()
         if self.ltm_index.ntotal == 0:
             return []
         
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])[0]
+        rerank = self.rerank if rerank is None else rerank
+        cache_key = (n_results, category, min_importance, max_importance, since, until, nprobe, ef_search, rerank)
+        if self.query_cache is not None:
+            cached = self.query_cache.get_results(query, cache_key, self.ltm_version)
+            if cached is not None:
+                return cached
         
-        # Search in FAISS
-        distances, indices = self.ltm_index.search(
-            np.array([query_embedding], dtype=np.float32), 
-            min(n_results, self.ltm_index.ntotal)
-        )
+        # Embed before taking the read lock so a slow model never holds up writers
+        if query_embedding is None:
+            query_embedding = self.encode_query(query)
+        query_embedding = np.array([query_embedding], dtype=np.float32)
         
-        # Retrieve metadata
-        memories = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.ltm_metadata):
-                metadata = self.ltm_metadata[idx]
-                if category is None or metadata.get("category") == category:
-                    memories.append({
+        # Index, filters and metadata are read as one consistent state
+        with self._ltm_lock.read():
+            version = self.ltm_version
+            
+            mask = self.ltm_filters.mask(category, min_importance, max_importance, since, until)
+            candidates = self.ltm_index.ntotal if mask is None else int(mask.sum())
+            k = min(n_results, candidates)
+            if k == 0:
+                return []
+            fetch = min(self.reranker.candidates(k), candidates) if rerank else k
+            
+            # Search in FAISS, restricted to matching ids
+            with self.metrics.stage("faiss_search"):
+                selector = MaskSelector(mask) if mask is not None else None
+                distances, indices = self.ltm_index.search(
+                    query_embedding,
+                    fetch,
+                    params=search_params(
+                        self.ltm_index,
+                        nprobe or self.nprobe,
+                        ef_search or self.ef_search,
+                        selector.selector if selector else None
+                    )
+                )
+                
+                # ANN indexes may stop short of k under a selective filter; finish exactly
+                if mask is not None and (indices[0] < 0).any():
+                    distances, indices = search_subset(self.ltm_index, query_embedding, np.flatnonzero(mask), fetch)
+            
+            # ANN indexes pad with -1 when fewer neighbors are found
+            ids, distances = indices[0], distances[0]
+            found = (ids >= 0) & (ids < min(len(self.ltm_metadata), self.ltm_filters.size))
+            ids, distances = ids[found], distances[found]
+            
+            scores = None
+            if rerank:
+                importance, timestamps = self.ltm_filters.values(ids)
+                order, scores = self.reranker.rerank(distances, importance, timestamps, k)
+                ids, distances = ids[order], distances[order]
+            
+            # Retrieve metadata
+            memories = []
+            with self.metrics.stage("metadata_lookup"):
+                for i, idx in enumerate(ids):
+                    metadata = self.ltm_metadata[idx]
+                    memory = {
                         "content": metadata["content"],
                         "metadata": metadata,
-                        "distance": float(distances[0][i])
-                    })
+                        "distance": float(distances[i])
+                    }
+                    if scores is not None:
+                        memory["score"] = float(scores[i])
+                    memories.append(memory)
         
+        if self.query_cache is not None:
+            self.query_cache.put_results(query, cache_key, version, memories)
         return memories
     
     def consolidate_memory(self, stm_message: Dict):
@@ -144,16 +858,34 @@ class MemoryManager:
     
     def clear_stm(self):
         """Clear short-term memory"""
-        self.short_term_memory = []
+        self.stm.clear()
+    
+    def get_ltm_stats(self) -> Dict:
+        """Get long-term memory statistics; never waits for loading"""
+        stats = {
+            "ltm_memories": self.ltm_index.ntotal if self._ltm_loaded else 0,
+            "ltm_index": type(self.ltm_index).__name__,
+            "ltm_index_mapped": self.ltm_index_mapped,
+            "ltm_snapshot_version": self.ltm_store.snapshot_version,
+            "ready": self.is_ready(),
+            "ltm_lock": self._ltm_lock.get_stats()
+        }
+        if self.query_batcher is not None:
+            stats["query_batching"] = self.query_batcher.get_stats()
+        if self.query_cache is not None:
+            stats["query_cache"] = self.query_cache.get_stats()
+        if self.rerank or self.reranker.calls:
+            stats["rerank"] = self.reranker.get_stats()
+        if self.consolidator is not None:
+            stats["consolidation"] = self.consolidator.get_stats()
+        if self.dedup != "off":
+            stats["dedup"] = {"policy": self.dedup, "similarity": self.dedup_similarity, **self.dedup_counts}
+        if self.last_reload is not None or self.reload_error is not None:
+            stats["reload"] = {**(self.last_reload or {}), "error": repr(self.reload_error) if self.reload_error else None}
+        if self.metrics.enabled:
+            stats["latency"] = self.metrics.summary()
+        return stats
     
     def get_memory_stats(self) -> Dict:
         """Get memory statistics"""
-        stm_tokens = sum(self.count_tokens(msg["content"]) for msg in self.short_term_memory)
-        ltm_count = self.ltm_index.ntotal
-        
-        return {
-            "stm_messages": len(self.short_term_memory),
-            "stm_tokens": stm_tokens,
-            "stm_capacity": self.stm_max_tokens,
-            "ltm_memories": ltm_count
-        }
+        return {**self.stm.get_stats(), **self.get_ltm_stats()}
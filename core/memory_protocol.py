@@ -0,0 +1,107 @@
+"""
+Memory Service Protocol for Agentcore Demo
+Length-prefixed frames of JSON plus raw numpy buffers, over a Unix socket or TCP
+"""
+
+import json
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple, Union, BinaryIO
+from urllib.parse import urlparse
+
+import numpy as np
+
+
+# Each frame: JSON length, binary length, then the JSON body and the array bytes it refers to
+FRAME_HEADER = struct.Struct("<II")
+ADDRESS_SCHEMES = ("unix", "tcp")
+
+# Exceptions re-raised under their own type on the client; anything else becomes a RuntimeError
+REMOTE_EXCEPTIONS = {error.__name__: error for error in (ValueError, TypeError, KeyError, IndexError, RuntimeError)}
+
+
+def parse_address(url: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """Socket family and address for unix:///path/to.sock or tcp://host:port"""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix" and parsed.path:
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError(f"Unix sockets are not available on this platform; use tcp://host:port for '{url}'")
+        return socket.AF_UNIX, parsed.path
+    if parsed.scheme == "tcp" and parsed.hostname and parsed.port:
+        return socket.AF_INET, (parsed.hostname, parsed.port)
+    raise ValueError(f"Unknown memory service address '{url}', expected one of {ADDRESS_SCHEMES} "
+                     f"as unix:///path/to.sock or tcp://host:port")
+
+
+def connect(url: str, timeout: Optional[float] = None) -> socket.socket:
+    """Open a client socket to the service"""
+    family, address = parse_address(url)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    sock.settimeout(None)  # Replies are awaited per request, not per read
+    if family == socket.AF_INET:
+        # Small request/response frames; never wait for Nagle
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def encode_frame(message: Dict) -> bytes:
+    """Serialize a message, sending numpy arrays as raw bytes rather than JSON lists"""
+    buffers: List[bytes] = []
+    offset = 0
+    
+    def pack(value):
+        nonlocal offset
+        if isinstance(value, np.ndarray):
+            data = np.ascontiguousarray(value).tobytes()
+            ref = {"__ndarray__": [value.dtype.str, list(value.shape), offset, len(data)]}
+            buffers.append(data)
+            offset += len(data)
+            return ref
+        if isinstance(value, dict):
+            return {key: pack(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [pack(item) for item in value]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+    
+    body = json.dumps(pack(message), default=str).encode('utf-8')
+    binary = b"".join(buffers)
+    return FRAME_HEADER.pack(len(body), len(binary)) + body + binary
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict]:
+    """Read one message, or None once the peer has closed the connection"""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    body_length, binary_length = FRAME_HEADER.unpack(header)
+    body = stream.read(body_length)
+    binary = stream.read(binary_length)
+    if len(body) < body_length or len(binary) < binary_length:
+        return None
+    
+    def unpack(value: Dict):
+        ref = value.get("__ndarray__")
+        if ref is None:
+            return value
+        dtype, shape, start, length = ref
+        return np.frombuffer(binary, dtype=np.dtype(dtype), count=length // np.dtype(dtype).itemsize,
+                             offset=start).reshape(shape)
+    
+    return json.loads(body.decode('utf-8'), object_hook=unpack)
+
+
+def remote_exception(error: List[str]) -> Exception:
+    """Rebuild an exception reported by the service as [type name, message]"""
+    name, message = error
+    exception_type = REMOTE_EXCEPTIONS.get(name)
+    if exception_type is None:
+        return RuntimeError(f"{name}: {message}")
+    return exception_type(message)
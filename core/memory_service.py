@@ -0,0 +1,167 @@
+"""
+Memory Service for Agentcore Demo
+Serves one MemoryManager (encoder, tokenizer and LTM) to many worker processes
+"""
+
+import os
+import socket
+import socketserver
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Callable
+
+from .memory_manager import MemoryManager
+from .memory_protocol import parse_address, encode_frame, read_frame
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        if self.connection.family == socket.AF_INET:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.write_lock = threading.Lock()  # Replies from concurrent requests share the socket
+    
+    def handle(self):
+        """Read requests as they arrive and answer each one as soon as it completes"""
+        service = self.server.service
+        service.connection_opened()
+        try:
+            while True:
+                try:
+                    request = read_frame(self.rfile)
+                except (OSError, ValueError):
+                    break
+                if request is None:
+                    break
+                service.executor.submit(service.dispatch, request, self.reply)
+        finally:
+            service.connection_closed()
+    
+    def reply(self, response: Dict):
+        frame = encode_frame(response)
+        with self.write_lock:
+            try:
+                self.wfile.write(frame)
+                self.wfile.flush()
+            except OSError:
+                pass  # Client went away; its pending replies are dropped
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class MemoryService:
+    def __init__(self, manager: MemoryManager, url: str, workers: int = 16):
+        """Bind the listening socket for a manager
+
+        Each connection may have many requests in flight; they run on a
+        shared pool of worker threads and are answered out of order,
+        matched by request id. Requests without an id get no reply.
+        """
+        self.manager = manager
+        self.url = url
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="memory-service")
+        self.methods: Dict[str, Callable] = {
+            "count_tokens": manager.count_tokens,
+            "tokenize": lambda text: manager.encoding.encode(text),
+            "detokenize": lambda tokens: manager.encoding.decode(tokens),
+            "encode_query": manager.encode_query,
+            "retrieve_from_ltm": manager.retrieve_from_ltm,
+            "add_many_to_ltm": manager.add_many_to_ltm,
+            "has_memory": manager.has_memory,
+            "offer_for_consolidation": manager.offer_for_consolidation,
+            "get_ltm_stats": self.get_ltm_stats,
+            "get_readiness": manager.get_readiness,
+            "start_reload": self.start_reload,
+            "describe": self.describe
+        }
+        self.requests: Counter = Counter()
+        self.errors = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        
+        family, address = parse_address(url)
+        if family == socket.AF_INET:
+            self.server = _TCPServer(address, _ConnectionHandler)
+        else:
+            if os.path.exists(address):
+                os.remove(address)  # Left behind by a service that did not shut down cleanly
+            self.server = _UnixServer(address, _ConnectionHandler)
+        self.server.service = self
+    
+    def describe(self) -> Dict:
+        """Settings a client needs to mirror the manager's short-term memory behaviour"""
+        manager = self.manager
+        return {
+            "stm_max_tokens": manager.stm_max_tokens,
+            "embedding_dim": manager.embedding_dim,
+            "consolidation": manager.consolidator is not None,
+            "consolidation_min_importance": manager.consolidation_min_importance,
+            "consolidation_high_importance": manager.consolidation_high_importance
+        }
+    
+    def get_ltm_stats(self) -> Dict:
+        """The manager's LTM statistics with this service's own"""
+        return {**self.manager.get_ltm_stats(), "memory_service": self.get_stats()}
+    
+    def start_reload(self):
+        """Hot-swap the manager's LTM to the newest snapshot in the background"""
+        self.manager.start_reload()
+    
+    def dispatch(self, request: Dict, reply: Callable[[Dict], None]):
+        """Run one request and reply with its result or error"""
+        name = request.get("method")
+        with self._lock:
+            self.requests[name] += 1
+        try:
+            method = self.methods.get(name)
+            if method is None:
+                raise ValueError(f"Unknown method '{name}', expected one of {tuple(self.methods)}")
+            response = {"id": request.get("id"), "result": method(*request.get("args", []), **request.get("kwargs", {}))}
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            response = {"id": request.get("id"), "error": [type(e).__name__, str(e)]}
+        if request.get("id") is not None:
+            reply(response)
+    
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+    
+    def connection_closed(self):
+        with self._lock:
+            self.connections -= 1
+    
+    def serve_forever(self):
+        """Accept connections until shutdown()"""
+        self.server.serve_forever()
+    
+    def shutdown(self):
+        """Stop accepting connections; call from another thread than serve_forever()"""
+        self.server.shutdown()
+    
+    def close(self):
+        """Release the socket and wait for running requests"""
+        self.server.server_close()
+        self.executor.shutdown(wait=True)
+        family, address = parse_address(self.url)
+        if family != socket.AF_INET and os.path.exists(address):
+            os.remove(address)
+    
+    def get_stats(self) -> Dict:
+        """Open connections and requests served per method"""
+        with self._lock:
+            return {
+                "connections": self.connections,
+                "requests": dict(self.requests),
+                "errors": self.errors
+            }
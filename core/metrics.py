@@ -0,0 +1,137 @@
+"""
+Metrics for Agentcore Demo
+Low-overhead latency histograms and gauges in Prometheus text format
+"""
+
+from typing import List, Dict, Optional, Callable, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+
+# Upper bounds in seconds, from 50µs (cached lookups) to 10s (cold model loads)
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metric families
+STAGE_METRIC = "agentcore_stage_seconds"  # Hot-path operations, labelled by stage
+TURN_STAGE_METRIC = "agentcore_turn_stage_seconds"  # Pipeline stages of a chat turn
+TURN_METRIC = "agentcore_turn_seconds"  # Whole chat turns
+
+HELP = {
+    STAGE_METRIC: "Time spent in instrumented memory and agent operations",
+    TURN_STAGE_METRIC: "Time spent in each pipeline stage of a chat turn",
+    TURN_METRIC: "Time to process a chat turn"
+}
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """Initialize empty bucket counts"""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds: float):
+        """Record one duration"""
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[slot] += 1
+            self.sum += seconds
+            self.count += 1
+    
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Cumulative bucket counts, sum and count"""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = []
+        running = 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+class Metrics:
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """Initialize the registry; when disabled, timing calls record nothing"""
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}  # (family, stage label) -> histogram
+        self._gauges: Dict[str, Tuple[str, Callable[[], Optional[float]]]] = {}
+        self._lock = threading.Lock()
+    
+    def _histogram(self, family: str, stage: str) -> Histogram:
+        """Histogram for a family and stage, created on first use"""
+        key = (family, stage)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+    
+    def observe(self, family: str, seconds: float, stage: str = ""):
+        """Record a duration for a family, optionally labelled with a stage"""
+        if self.enabled:
+            self._histogram(family, stage).observe(seconds)
+    
+    @contextmanager
+    def stage(self, stage: str, family: str = STAGE_METRIC):
+        """Time a block as one observation of a stage"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._histogram(family, stage).observe(time.perf_counter() - start)
+    
+    def gauge(self, name: str, help_text: str, read: Callable[[], Optional[float]]):
+        """Register a value read at scrape time; None skips it for that scrape"""
+        with self._lock:
+            self._gauges[name] = (help_text, read)
+    
+    def summary(self, family: str = STAGE_METRIC) -> Dict[str, Dict]:
+        """Count and mean milliseconds per stage of a family"""
+        with self._lock:
+            histograms = [(stage, histogram) for (name, stage), histogram in self._histograms.items() if name == family]
+        summary = {}
+        for stage, histogram in sorted(histograms):
+            _, total, count = histogram.snapshot()
+            summary[stage or family] = {"count": count, "mean_ms": 1000 * total / count if count else 0.0}
+        return summary
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            gauges = sorted(self._gauges.items())
+        
+        lines = []
+        family = None
+        for (name, stage), histogram in histograms:
+            if name != family:
+                family = name
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            label = f'stage="{stage}",' if stage else ""
+            cumulative, total, count = histogram.snapshot()
+            for bound, value in zip(self.buckets, cumulative):
+                lines.append(f'{name}_bucket{{{label}le="{bound}"}} {value}')
+            lines.append(f'{name}_bucket{{{label}le="+Inf"}} {cumulative[-1]}')
+            suffix = f"{{{label.rstrip(',')}}}" if label else ""
+            lines.append(f"{name}_sum{suffix} {total}")
+            lines.append(f"{name}_count{suffix} {count}")
+        
+        for name, (help_text, read) in gauges:
+            value = read()
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
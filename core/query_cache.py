@@ -0,0 +1,85 @@
+"""
+Query Cache for Agentcore Demo
+Bounded LRU cache of query embeddings and retrieval results
+"""
+
+import numpy as np
+from typing import List, Dict, Optional, Hashable
+from collections import OrderedDict
+import threading
+
+
+class QueryCache:
+    def __init__(self, max_entries: int = 1024):
+        """Initialize an empty cache holding up to max_entries distinct queries"""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {
+            "embedding_hits": 0,
+            "embedding_misses": 0,
+            "result_hits": 0,
+            "result_misses": 0,
+            "evictions": 0
+        }
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Cache key for a query; runs of whitespace tokenize alike, but case may matter to a cased model"""
+        return " ".join(query.split())
+    
+    def _entry(self, query: str, create: bool = False) -> Optional[Dict]:
+        """Look up a query's entry and mark it most recently used"""
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif create:
+            entry = {"embedding": None, "results": {}}
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+        return entry
+    
+    def get_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Cached embedding for a query, if any"""
+        with self._lock:
+            entry = self._entry(query)
+            if entry is None or entry["embedding"] is None:
+                self.counters["embedding_misses"] += 1
+                return None
+            self.counters["embedding_hits"] += 1
+            return entry["embedding"]
+    
+    def put_embedding(self, query: str, embedding: np.ndarray):
+        """Cache a query's embedding"""
+        with self._lock:
+            self._entry(query, create=True)["embedding"] = embedding
+    
+    def get_results(self, query: str, key: Hashable, version: int) -> Optional[List[Dict]]:
+        """Cached results for a query and search options, if still valid for the LTM version"""
+        with self._lock:
+            entry = self._entry(query)
+            cached = entry["results"].get(key) if entry is not None else None
+            if cached is None or cached[0] != version:
+                self.counters["result_misses"] += 1
+                return None
+            self.counters["result_hits"] += 1
+            return [dict(memory) for memory in cached[1]]
+    
+    def put_results(self, query: str, key: Hashable, version: int, results: List[Dict]):
+        """Cache results for a query and search options at an LTM version"""
+        with self._lock:
+            entry = self._entry(query, create=True)
+            entry["results"][key] = (version, [dict(memory) for memory in results])
+    
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        """Hit, miss and eviction counters"""
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, **self.counters}
@@ -0,0 +1,444 @@
+"""
+Remote Memory for Agentcore Demo
+MemoryManager-compatible proxy for a shared memory service, over pooled, pipelined connections
+"""
+
+import itertools
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Iterable, Callable
+
+import numpy as np
+
+from .short_term_memory import ShortTermMemory
+from .memory_manager import iter_memory_file, CONSOLIDATION_SKIP_ROLES
+from .memory_protocol import connect, encode_frame, read_frame, remote_exception
+from .metrics import Metrics
+
+
+READY_POLL_SECONDS = 0.2
+# STM messages waiting to be offered to the service's consolidation; more are dropped
+OFFER_QUEUE_SIZE = 1024
+# Memories per add_many_to_ltm request, and such requests in flight at once
+INGEST_CHUNK = 1024
+INGEST_IN_FLIGHT = 4
+
+
+class _Connection:
+    def __init__(self, url: str, connect_timeout: float):
+        """Open a socket and start reading replies; many requests may be in flight at once"""
+        self.sock = connect(url, connect_timeout)
+        self._stream = self.sock.makefile('rb')
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count()
+        self.closed = False
+        self._reader = threading.Thread(target=self._read_replies, name="memory-client", daemon=True)
+        self._reader.start()
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+    
+    def send(self, method: str, args: tuple, kwargs: Dict, reply: bool = True) -> Optional[Future]:
+        """Write one request without waiting for earlier ones; returns a future for its reply"""
+        request = {"method": method, "args": list(args), "kwargs": kwargs}
+        future = None
+        if reply:
+            future = Future()
+            request["id"] = next(self._ids)
+            with self._pending_lock:
+                if self.closed:
+                    raise ConnectionError("memory service connection is closed")
+                self._pending[request["id"]] = future
+        
+        frame = encode_frame(request)
+        try:
+            with self._send_lock:
+                self.sock.sendall(frame)
+        except OSError as e:
+            self._fail(ConnectionError(f"memory service connection failed: {e}"))
+            raise ConnectionError(f"memory service connection failed: {e}") from e
+        return future
+    
+    def _read_replies(self):
+        """Resolve each request's future as its reply arrives, in whatever order"""
+        error = ConnectionError("memory service closed the connection")
+        try:
+            while True:
+                response = read_frame(self._stream)
+                if response is None:
+                    break
+                with self._pending_lock:
+                    future = self._pending.pop(response["id"], None)
+                if future is None:
+                    continue
+                if "error" in response:
+                    future.set_exception(remote_exception(response["error"]))
+                else:
+                    future.set_result(response["result"])
+        except (OSError, ValueError) as e:
+            error = ConnectionError(f"memory service connection failed: {e}")
+        self._fail(error)
+    
+    def _fail(self, error: Exception):
+        """Mark the connection dead and fail every request still waiting on it"""
+        with self._pending_lock:
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+    
+    def close(self):
+        self._fail(ConnectionError("memory service connection is closed"))
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class ConnectionPool:
+    def __init__(self, url: str, size: int = 4, connect_timeout: float = 5.0):
+        """Up to size connections, opened on demand and replaced when they fail"""
+        self.url = url
+        self.size = max(size, 1)
+        self.connect_timeout = connect_timeout
+        self._connections: List[Optional[_Connection]] = [None] * self.size
+        self._lock = threading.Lock()
+        self.opened = 0
+    
+    def _pick(self) -> _Connection:
+        """The least busy live connection, opening another while every live one is busy"""
+        with self._lock:
+            live = [connection for connection in self._connections if connection is not None and not connection.closed]
+            best = min(live, key=lambda connection: connection.in_flight, default=None)
+            if best is not None and (best.in_flight == 0 or len(live) == self.size):
+                return best
+            
+            slot = next(i for i, connection in enumerate(self._connections)
+                        if connection is None or connection.closed)
+            self._connections[slot] = _Connection(self.url, self.connect_timeout)
+            self.opened += 1
+            return self._connections[slot]
+    
+    def _send(self, method: str, args: tuple, kwargs: Dict, reply: bool) -> Optional[Future]:
+        """Send on a pooled connection, retrying once on a fresh one if it had gone stale"""
+        for attempt in range(2):
+            connection = self._pick()
+            try:
+                return connection.send(method, args, kwargs, reply)
+            except ConnectionError:
+                if attempt:
+                    raise
+    
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """Send a request and return a future for its result"""
+        return self._send(method, args, kwargs, reply=True)
+    
+    def notify(self, method: str, *args, **kwargs):
+        """Send a request that gets no reply"""
+        self._send(method, args, kwargs, reply=False)
+    
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, [None] * self.size
+        for connection in connections:
+            if connection is not None:
+                connection.close()
+    
+    def get_stats(self) -> Dict:
+        """Live connections, requests in flight and connections opened so far"""
+        with self._lock:
+            live = [connection for connection in self._connections if connection is not None and not connection.closed]
+            return {
+                "url": self.url,
+                "pool_size": self.size,
+                "connections": len(live),
+                "in_flight": sum(connection.in_flight for connection in live),
+                "connections_opened": self.opened
+            }
+
+
+class RemoteEncoding:
+    def __init__(self, call: Callable):
+        """Tokenizer whose encode/decode run in the memory service, like a tiktoken Encoding"""
+        self._call = call
+    
+    def encode(self, text: str) -> List[int]:
+        return self._call("tokenize", text)
+    
+    def decode(self, tokens: List[int]) -> str:
+        return self._call("detokenize", list(tokens))
+
+
+class RemoteMemoryManager:
+    def __init__(self, url: str, stm_max_tokens: int = 200, pool_size: int = 4, timeout: float = 30.0,
+                 metrics: bool = True):
+        """Proxy for the MemoryManager of a memory service at url
+
+        url is unix:///path/to.sock or tcp://host:port. The embedding
+        model, tokenizer and long-term memory live in the service;
+        short-term memory windows stay in this process, and messages they
+        evict are offered to the service's consolidation worker. Nothing
+        connects until first use, so the service may start later.
+        """
+        self.url = url
+        self.stm_max_tokens = stm_max_tokens
+        self.timeout = timeout
+        self.pool = ConnectionPool(url, pool_size)
+        self.metrics = Metrics(enabled=metrics)
+        self.encoding = RemoteEncoding(self._call)
+        self._settings: Optional[Dict] = None  # The service's describe(), fetched once
+        self._ready = threading.Event()
+        self._warmup_thread = None
+        self.warmup_error: Optional[BaseException] = None
+        
+        # STM hooks run under the window's lock, so offers are sent from a thread of their own
+        self._offers: queue.Queue = queue.Queue(maxsize=OFFER_QUEUE_SIZE)
+        self.offers_dropped = 0
+        self._offer_thread = threading.Thread(target=self._send_offers, name="memory-offers", daemon=True)
+        self._offer_thread.start()
+        self.stm = self.create_stm()
+    
+    def _call(self, method: str, *args, **kwargs):
+        """Run a method in the service and wait for its result"""
+        with self.metrics.stage(f"rpc_{method}"):
+            return self.pool.submit(method, *args, **kwargs).result(self.timeout)
+    
+    def _service_settings(self) -> Optional[Dict]:
+        """The service's STM and consolidation settings, or None while it is unreachable"""
+        if self._settings is None:
+            try:
+                self._settings = self._call("describe")
+            except (ConnectionError, OSError):
+                return None
+        return self._settings
+    
+    def warm_up(self, then: Optional[Callable[[], None]] = None):
+        """Wait until the service is up and ready, then run an optional follow-up step"""
+        try:
+            if not self.wait_until_ready(retry_unreachable=True):
+                raise RuntimeError(f"Memory service failed to initialize: {self.warmup_error}")
+            if then is not None:
+                then()
+        except BaseException as e:
+            self.warmup_error = e
+            raise
+    
+    def start_warmup(self, then: Optional[Callable[[], None]] = None) -> threading.Thread:
+        """Run warm_up() on a background thread"""
+        def run():
+            try:
+                self.warm_up(then)
+            except Exception:
+                pass  # Kept in warmup_error
+        
+        self._warmup_thread = threading.Thread(target=run, name="memory-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+    
+    def is_ready(self) -> bool:
+        """Whether the service has reported itself ready"""
+        return self._ready.is_set()
+    
+    def wait_until_ready(self, timeout: Optional[float] = None, retry_unreachable: bool = False) -> bool:
+        """Poll the service until it is ready
+        
+        Returns False on timeout or if the service's warm-up failed, and at
+        once while the service cannot be reached unless retry_unreachable.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self._ready.is_set():
+            readiness = self.get_readiness()
+            if readiness["ready"]:
+                self.warmup_error = None
+                self._ready.set()
+                break
+            if readiness["error"]:
+                self.warmup_error = RuntimeError(readiness["error"])
+                if not retry_unreachable or readiness["memory_service"]["reachable"]:
+                    return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(READY_POLL_SECONDS)
+        return True
+    
+    def get_readiness(self) -> Dict:
+        """The service's readiness, or not ready with the connection error while it cannot be reached"""
+        try:
+            readiness = self._call("get_readiness")
+            reachable = True
+        except (ConnectionError, OSError) as e:
+            readiness = {
+                "ready": False,
+                "ltm_loaded": False,
+                "embeddings_loaded": False,
+                "error": f"memory service unreachable: {e}"
+            }
+            reachable = False
+        readiness["memory_service"] = {"url": self.url, "reachable": reachable}
+        return readiness
+    
+    def start_reload(self):
+        """Ask the service to hot-swap its LTM to the newest snapshot"""
+        self._call("start_reload")
+    
+    def close(self):
+        """Send queued consolidation offers and close pooled connections; the service keeps running"""
+        try:
+            self._offers.put_nowait(None)
+        except queue.Full:
+            pass  # A stalled sender is a daemon thread and goes down with the process
+        else:
+            self._offer_thread.join(self.timeout)
+        self.pool.close()
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        """Embed a search query in the service, sharing its cache and batcher"""
+        return self._call("encode_query", query)
+    
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text"""
+        return self._call("count_tokens", text)
+    
+    @property
+    def short_term_memory(self):
+        """Messages in the default short-term memory window"""
+        return self.stm.messages
+    
+    @property
+    def stm_tokens(self) -> int:
+        """Token total of the default short-term memory window"""
+        return self.stm.tokens
+    
+    def create_stm(self, on_resize=None) -> ShortTermMemory:
+        """Create a local short-term memory window that offers messages to the service's consolidation"""
+        return ShortTermMemory(
+            self.stm_max_tokens,
+            self.count_tokens,
+            on_resize=on_resize,
+            on_add=self._offer_important,
+            on_evict=self._offer_evicted
+        )
+    
+    def _offer_important(self, message: Dict):
+        """Queue a newly added STM message for the service; runs under the STM lock, so never blocks"""
+        self._queue_offer(message, False)
+    
+    def _offer_evicted(self, message: Dict):
+        """Queue an evicted STM message for the service; runs under the STM lock, so never blocks"""
+        self._queue_offer(message, True)
+    
+    def _queue_offer(self, message: Dict, evicted: bool):
+        try:
+            self._offers.put_nowait((message, evicted))
+        except queue.Full:
+            self.offers_dropped += 1  # Consolidation is best effort
+    
+    def _send_offers(self):
+        """Send queued STM messages the service's consolidation would keep, in the order they were offered"""
+        while True:
+            item = self._offers.get()
+            if item is None:
+                return
+            message, evicted = item
+            try:
+                settings = self._service_settings()
+                if not settings or not settings["consolidation"] or message["role"] in CONSOLIDATION_SKIP_ROLES:
+                    continue
+                importance = message["metadata"].get("importance", 5)
+                if evicted:
+                    # Offers are sent in order, so an important message's add was handled first
+                    send = not message.get("consolidation_queued") \
+                        and importance >= settings["consolidation_min_importance"]
+                else:
+                    send = importance >= settings["consolidation_high_importance"]
+                    message["consolidation_queued"] = send
+                if send:
+                    self.pool.notify("offer_for_consolidation", message, evicted)
+            except Exception:
+                self.offers_dropped += 1  # Service unreachable or too slow; keep the sender alive
+    
+    def add_to_stm(self, role: str, content: str, metadata: Optional[Dict] = None, tokens: Optional[int] = None,
+                   embedding: Optional[np.ndarray] = None):
+        """Add message to short-term memory, with its token count and embedding if already known"""
+        self.stm.add(role, content, metadata, tokens, embedding)
+    
+    def _manage_stm_size(self):
+        """Manage STM size by removing old messages"""
+        self.stm._manage_size()
+    
+    def get_stm_context(self, recent: Optional[int] = None) -> List[Dict]:
+        """Get current short-term memory context, optionally only the most recent messages"""
+        return self.stm.get_context(recent)
+    
+    def clear_stm(self):
+        """Clear short-term memory"""
+        self.stm.clear()
+    
+    def add_to_ltm(self, content: str, category: str, importance: int = 5, metadata: Optional[Dict] = None):
+        """Add memory to long-term storage"""
+        self.add_many_to_ltm([{
+            "content": content,
+            "category": category,
+            "importance": importance,
+            "metadata": metadata
+        }])
+    
+    def add_many_to_ltm(self, memories: Iterable[Dict], batch_size: int = 64) -> Dict:
+        """Bulk-add memories, streaming chunks to the service with several in flight"""
+        start = time.perf_counter()
+        added = 0
+        in_flight: List[Future] = []
+        memories = iter(memories)
+        while True:
+            chunk = list(itertools.islice(memories, INGEST_CHUNK))
+            if not chunk:
+                break
+            if len(in_flight) >= INGEST_IN_FLIGHT:
+                added += in_flight.pop(0).result(self.timeout)["added"]
+            in_flight.append(self.pool.submit("add_many_to_ltm", chunk, batch_size=batch_size))
+        for future in in_flight:
+            added += future.result(self.timeout)["added"]
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "added": added,
+            "seconds": elapsed,
+            "memories_per_sec": added / elapsed if elapsed > 0 else 0.0
+        }
+    
+    def import_ltm_file(self, path: str, batch_size: int = 64) -> Dict:
+        """Bulk-import memories from a JSONL or CSV file"""
+        return self.add_many_to_ltm(iter_memory_file(path), batch_size=batch_size)
+    
+    def has_memory(self, content: str, category: str) -> bool:
+        """Check whether identical content is already stored in long-term memory"""
+        return self._call("has_memory", content, category)
+    
+    def retrieve_from_ltm(self, query: str, n_results: int = 3, **options) -> List[Dict]:
+        """Retrieve relevant memories from long-term storage; options as for MemoryManager"""
+        return self._call("retrieve_from_ltm", query, n_results=n_results, **options)
+    
+    def get_ltm_stats(self) -> Dict:
+        """The service's long-term memory statistics with this client's pool; never waits for loading"""
+        try:
+            stats = self._call("get_ltm_stats")
+        except (ConnectionError, OSError) as e:
+            stats = {"ltm_memories": 0, "ready": False, "error": str(e)}
+        stats["memory_client"] = {
+            **self.pool.get_stats(),
+            "offers_queued": self._offers.qsize(),
+            "offers_dropped": self.offers_dropped
+        }
+        return stats
+    
+    def get_memory_stats(self) -> Dict:
+        """Get memory statistics"""
+        return {**self.stm.get_stats(), **self.get_ltm_stats()}
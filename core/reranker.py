@@ -0,0 +1,80 @@
+"""
+Retrieval Re-ranker for Agentcore Demo
+Re-scores nearest-neighbor candidates by similarity, importance and recency
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+
+class Reranker:
+    def __init__(self, similarity_weight: float = 1.0, importance_weight: float = 0.3,
+                 recency_weight: float = 0.2, half_life_hours: float = 168.0, overfetch: int = 4,
+                 max_importance: float = 10.0):
+        """Initialize the score blend
+
+        score = similarity_weight * cosine similarity
+              + importance_weight * importance / max_importance
+              + recency_weight * 0.5 ** (age / half_life)
+        """
+        self.similarity_weight = similarity_weight
+        self.importance_weight = importance_weight
+        self.recency_weight = recency_weight
+        self.half_life = half_life_hours * 3600.0
+        self.overfetch = overfetch
+        self.max_importance = max_importance
+        
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+    
+    def candidates(self, k: int) -> int:
+        """How many nearest neighbors to fetch for k results"""
+        return k * self.overfetch
+    
+    def scores(self, distances: np.ndarray, importance: np.ndarray, timestamps: np.ndarray,
+               now: Optional[float] = None) -> np.ndarray:
+        """Blended scores for candidates given their squared L2 distances"""
+        # Embeddings are L2-normalized, so squared L2 distance d means cosine 1 - d / 2
+        similarity = 1.0 - distances / 2.0
+        age = np.maximum((now if now is not None else time.time()) - timestamps, 0.0)
+        recency = np.exp2(-age / self.half_life)
+        return (self.similarity_weight * similarity
+                + self.importance_weight * importance / self.max_importance
+                + self.recency_weight * recency)
+    
+    def rerank(self, distances: np.ndarray, importance: np.ndarray, timestamps: np.ndarray,
+               k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions and scores of the k best candidates, best first"""
+        start = time.perf_counter()
+        scores = self.scores(distances, importance, timestamps)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            top = np.argsort(-scores, kind="stable")
+        
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+        return top, scores[top]
+    
+    def get_stats(self) -> Dict:
+        """Weights and re-rank latency"""
+        with self._lock:
+            return {
+                "weights": {
+                    "similarity": self.similarity_weight,
+                    "importance": self.importance_weight,
+                    "recency": self.recency_weight
+                },
+                "overfetch": self.overfetch,
+                "calls": self.calls,
+                "mean_ms": 1000 * self.total_seconds / self.calls if self.calls else 0.0,
+                "max_ms": 1000 * self.max_seconds
+            }
@@ -0,0 +1,94 @@
+"""
+Reader/Writer Lock for Agentcore Demo
+Many concurrent readers or one writer, with waiting writers served first
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator
+import threading
+import time
+
+
+class RWLock:
+    def __init__(self):
+        """Initialize an unlocked lock
+
+        The writer may re-enter write() and may also take read(), so a
+        write path can call read-locked helpers. A reader must never ask for
+        write() while holding read(); that would wait on itself forever.
+        """
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None  # Ident of the thread holding the write side
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()  # Per-thread read depth, so nested reads never wait
+        self.reads = 0
+        self.writes = 0
+        self.write_wait_seconds = 0.0
+    
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the read side; blocks while a writer holds or waits for the lock"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                nested_in_write = True
+            else:
+                nested_in_write = False
+                depth = getattr(self._local, "depth", 0)
+                if depth == 0:
+                    while self._writer is not None or self._writers_waiting:
+                        self._cond.wait()
+                self._local.depth = depth + 1
+                self._readers += 1
+            self.reads += 1
+        try:
+            yield
+        finally:
+            if not nested_in_write:
+                with self._cond:
+                    self._local.depth -= 1
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+    
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the write side exclusively; reentrant for the owning thread"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+            else:
+                start = time.perf_counter()
+                self._writers_waiting += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._writers_waiting -= 1
+                self._writer = me
+                self._write_depth = 1
+                self.write_wait_seconds += time.perf_counter() - start
+            self.writes += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
+    
+    def get_stats(self) -> Dict:
+        """Acquisition counts and current holders"""
+        with self._cond:
+            return {
+                "reads": self.reads,
+                "writes": self.writes,
+                "write_wait_seconds": self.write_wait_seconds,
+                "active_readers": self._readers,
+                "writer_active": self._writer is not None,
+                "writers_waiting": self._writers_waiting
+            }
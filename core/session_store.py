@@ -0,0 +1,128 @@
+"""
+Session Store for Agentcore Demo
+Per-session short-term memory over a shared long-term memory
+"""
+
+import numpy as np
+from typing import List, Dict, Optional
+from collections import OrderedDict
+import threading
+import time
+
+from .memory_manager import MemoryManager
+from .short_term_memory import ShortTermMemory
+
+
+class SessionMemory:
+    def __init__(self, manager: MemoryManager, stm: ShortTermMemory):
+        """Wrap a shared MemoryManager with a private short-term memory"""
+        self.manager = manager
+        self.stm = stm
+        self.lock = threading.Lock()  # Serializes turns within one conversation
+        self.last_seen = time.monotonic()
+    
+    def __getattr__(self, name):
+        """Long-term memory and everything else comes from the shared manager"""
+        return getattr(self.manager, name)
+    
+    @property
+    def short_term_memory(self):
+        """Messages in this session's window"""
+        return self.stm.messages
+    
+    @property
+    def stm_tokens(self) -> int:
+        """Token total of this session's window"""
+        return self.stm.tokens
+    
+    def add_to_stm(self, role: str, content: str, metadata: Optional[Dict] = None, tokens: Optional[int] = None,
+                   embedding: Optional[np.ndarray] = None):
+        """Add message to this session's short-term memory"""
+        self.stm.add(role, content, metadata, tokens, embedding)
+    
+    def get_stm_context(self, recent: Optional[int] = None) -> List[Dict]:
+        """Get this session's short-term memory context"""
+        return self.stm.get_context(recent)
+    
+    def clear_stm(self):
+        """Clear this session's short-term memory"""
+        self.stm.clear()
+    
+    def get_memory_stats(self) -> Dict:
+        """Get this session's STM statistics with the shared LTM statistics"""
+        return {**self.stm.get_stats(), **self.manager.get_ltm_stats()}
+
+
+class SessionStore:
+    def __init__(self, manager: MemoryManager, max_sessions: int = 10000, ttl_seconds: float = 3600,
+                 max_total_tokens: Optional[int] = None):
+        """Initialize an LRU store of sessions bounded by count, idle time and total STM tokens"""
+        self.manager = manager
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_total_tokens = max_total_tokens
+        
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_tokens = 0
+        self.created = 0
+        self.evictions = {"lru": 0, "ttl": 0, "memory": 0}
+    
+    def get(self, session_id: str) -> SessionMemory:
+        """Get a session's memory, creating it if needed and evicting others to stay in bounds"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = SessionMemory(self.manager, self.manager.create_stm(on_resize=self._on_resize))
+                self._sessions[session_id] = session
+                self.created += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            
+            self._enforce_limits()
+            return session
+    
+    def _on_resize(self, delta: int):
+        """Track the token total across all live sessions"""
+        with self._lock:
+            self.total_tokens += delta
+    
+    def _evict(self, reason: str):
+        """Drop the least recently used session"""
+        _, session = self._sessions.popitem(last=False)
+        session.stm.on_resize = None  # An in-flight turn must not touch our totals any more
+        self.total_tokens -= session.stm.tokens
+        self.evictions[reason] += 1
+    
+    def _expire(self, now: float):
+        """Drop sessions idle for longer than the TTL; they sit at the LRU end"""
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen <= self.ttl_seconds:
+                break
+            self._evict("ttl")
+    
+    def _enforce_limits(self):
+        """Evict LRU sessions over the count or token cap, always keeping the newest"""
+        while len(self._sessions) > self.max_sessions:
+            self._evict("lru")
+        if self.max_total_tokens is not None:
+            while self.total_tokens > self.max_total_tokens and len(self._sessions) > 1:
+                self._evict("memory")
+    
+    def get_stats(self) -> Dict:
+        """Get session store statistics"""
+        with self._lock:
+            return {
+                "live_sessions": len(self._sessions),
+                "session_tokens": self.total_tokens,
+                "sessions_created": self.created,
+                "max_sessions": self.max_sessions,
+                "max_total_tokens": self.max_total_tokens,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": dict(self.evictions)
+            }
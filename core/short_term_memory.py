@@ -0,0 +1,102 @@
+"""
+Short-term Memory for Agentcore Demo
+Token-budgeted window of recent conversation messages
+"""
+
+import numpy as np
+from typing import List, Dict, Optional, Callable
+from collections import deque
+from datetime import datetime
+import itertools
+import threading
+
+
+class ShortTermMemory:
+    def __init__(self, max_tokens: int, count_tokens: Callable[[str], int],
+                 on_resize: Optional[Callable[[int], None]] = None,
+                 on_add: Optional[Callable[[Dict], None]] = None,
+                 on_evict: Optional[Callable[[Dict], None]] = None):
+        """Initialize an empty window with a token budget
+
+        on_resize, if given, is called with the change in token total after
+        every add, eviction or clear. on_add and on_evict are called with
+        each message as it enters the window and as it is pushed out.
+        Safe to share between threads; on_resize is called outside the lock.
+        """
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.on_resize = on_resize
+        self.on_add = on_add
+        self.on_evict = on_evict
+        self.messages = deque()
+        self.tokens = 0  # Running total, kept in step with messages
+        self._lock = threading.RLock()
+    
+    def add(self, role: str, content: str, metadata: Optional[Dict] = None, tokens: Optional[int] = None,
+            embedding: Optional[np.ndarray] = None):
+        """Add message to the window
+        
+        tokens and embedding, when the caller already has them, are kept
+        with the message instead of being computed again.
+        """
+        message = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat(),
+            "metadata": metadata or {},
+            "tokens": tokens if tokens is not None else self.count_tokens(content)  # Reused on eviction and stats
+        }
+        if embedding is not None:
+            message["embedding"] = embedding  # Reused if the message is consolidated into LTM
+        with self._lock:
+            before = self.tokens
+            self.messages.append(message)
+            self.tokens += message["tokens"]
+            if self.on_add is not None:
+                self.on_add(message)
+            self._manage_size()
+            delta = self.tokens - before
+        
+        on_resize = self.on_resize
+        if on_resize is not None:
+            on_resize(delta)
+    
+    def _manage_size(self):
+        """Manage window size by removing old messages"""
+        with self._lock:
+            while self.tokens > self.max_tokens and len(self.messages) > 1:
+                removed = self.messages.popleft()
+                self.tokens -= removed["tokens"]
+                if self.on_evict is not None:
+                    self.on_evict(removed)
+    
+    def get_context(self, recent: Optional[int] = None) -> List[Dict]:
+        """Get messages in the window, optionally only the most recent ones"""
+        with self._lock:
+            if recent is None:
+                return list(self.messages)
+            
+            # Walk from the right end so the cost does not depend on the window size
+            messages = list(itertools.islice(reversed(self.messages), recent))
+        messages.reverse()
+        return messages
+    
+    def clear(self):
+        """Remove all messages"""
+        with self._lock:
+            before = self.tokens
+            self.messages.clear()
+            self.tokens = 0
+        
+        on_resize = self.on_resize
+        if on_resize is not None and before:
+            on_resize(-before)
+    
+    def get_stats(self) -> Dict:
+        """Get window statistics"""
+        with self._lock:
+            return {
+                "stm_messages": len(self.messages),
+                "stm_tokens": self.tokens,
+                "stm_capacity": self.max_tokens
+            }
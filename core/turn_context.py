@@ -0,0 +1,42 @@
+"""
+Turn Context for Agentcore Demo
+Per-turn state shared by the stages of one conversation turn
+"""
+
+import numpy as np
+from typing import List, Dict, Optional
+from contextlib import contextmanager
+import time
+
+
+class TurnContext:
+    def __init__(self, message: str, memory):
+        """Start a turn for a user message against a memory (manager or session view)"""
+        self.message = message
+        self.memory = memory
+        
+        # Stage outputs, each computed once
+        self.tokens: Optional[int] = None  # tokenize
+        self.embedding: Optional[np.ndarray] = None  # embed
+        self.memories: List[Dict] = []  # retrieve
+        self.topic: Optional[Dict] = None  # route
+        self.context = ""  # respond
+        self.context_tokens = 0  # respond
+        self.response: Dict = {}  # respond
+        
+        self.timings: Dict[str, float] = {}  # Stage -> seconds
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Record how long a stage of the turn takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+    
+    def timings_ms(self) -> Dict[str, float]:
+        """Stage timings in milliseconds, plus the total"""
+        timings = {stage: round(1000 * seconds, 3) for stage, seconds in self.timings.items()}
+        timings["total"] = round(1000 * sum(self.timings.values()), 3)
+        return timings
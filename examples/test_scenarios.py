@@ -24,10 +24,12 @@ def scenario_1_conversation_continuity():
     for msg in messages:
         print(f"\nUser: {msg}")
         response = agent.process_message(msg)
-        print(f"Ser Duncan: {response}")
+        print(f"Ser Duncan: {response['response']}")
         
         stats = agent.get_memory_stats()
         print(f"[STM: {stats['stm_messages']} messages, {stats['stm_tokens']} tokens]")
+    
+    memory.close()
 
 
 def scenario_2_knowledge_recall():
@@ -48,13 +50,15 @@ def scenario_2_knowledge_recall():
     for query in queries:
         print(f"\nUser: {query}")
         response = agent.process_message(query)
-        print(f"Ser Duncan: {response}")
+        print(f"Ser Duncan: {response['response']}")
         
-        # Show retrieved memories
-        memories = memory.retrieve_from_ltm(query, n_results=2)
+        # Show the memories the turn retrieved
+        memories = response["memories"][:2]
         print(f"\n[Retrieved {len(memories)} relevant memories from LTM]")
         for i, mem in enumerate(memories, 1):
             print(f"  {i}. {mem['content'][:80]}...")
+    
+    memory.close()
 
 
 def scenario_3_memory_capacity():
@@ -77,6 +81,8 @@ def scenario_3_memory_capacity():
         
         if stats['stm_tokens'] >= stats['stm_capacity'] * 0.9:
             print("⚠️  STM near capacity - oldest messages being removed")
+    
+    memory.close()
 
 
 def scenario_4_hybrid_retrieval():
@@ -100,15 +106,17 @@ def scenario_4_hybrid_retrieval():
         print(f"[{note}]")
         
         response = agent.process_message(msg)
-        print(f"Ser Duncan: {response}")
+        print(f"Ser Duncan: {response['response']}")
         
         # Show context sources
         stm_context = memory.get_stm_context()
-        ltm_memories = memory.retrieve_from_ltm(msg, n_results=2)
+        ltm_memories = response["memories"]
         
         print(f"\nContext sources:")
         print(f"  - STM: {len(stm_context)} recent messages")
         print(f"  - LTM: {len(ltm_memories)} relevant memories")
+    
+    memory.close()
 
 
 def scenario_5_memory_persistence():
@@ -125,10 +133,11 @@ def scenario_5_memory_persistence():
     msg = "Tell me about your shield"
     print(f"User: {msg}")
     response = agent1.process_message(msg)
-    print(f"Ser Duncan: {response}")
+    print(f"Ser Duncan: {response['response']}")
     
     stats1 = agent1.get_memory_stats()
     print(f"LTM memories: {stats1['ltm_memories']}")
+    memory1.close()  # Only one open manager may write a collection
     
     # Session 2 (new instance, same collection)
     print("\n--- Session 2 (New Instance) ---")
@@ -143,7 +152,8 @@ def scenario_5_memory_persistence():
     msg2 = "What symbols are on your shield?"
     print(f"\nUser: {msg2}")
     response2 = agent2.process_message(msg2)
-    print(f"Ser Duncan: {response2}")
+    print(f"Ser Duncan: {response2['response']}")
+    memory2.close()
 
 
 def run_all_scenarios():
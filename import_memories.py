@@ -0,0 +1,36 @@
+"""
+Bulk Import of Long-term Memories
+Loads a JSONL or CSV file of memories into the LTM collection
+"""
+
+import argparse
+from dotenv import load_dotenv
+from core import MemoryManager, memory_settings_from_env
+
+# Load environment variables
+load_dotenv()
+
+
+def main():
+    """Import memories and report throughput"""
+    parser = argparse.ArgumentParser(description="Bulk-import memories into long-term memory")
+    parser.add_argument("path", help="JSONL or CSV file of memories")
+    parser.add_argument("--batch-size", type=int, default=64, help="Memories embedded per batch")
+    parser.add_argument("--collection", help="LTM collection (defaults to LTM_COLLECTION_NAME)")
+    args = parser.parse_args()
+    
+    settings = memory_settings_from_env()
+    if args.collection:
+        settings["collection_name"] = args.collection
+    memory_manager = MemoryManager(**settings)
+    
+    result = memory_manager.import_ltm_file(args.path, batch_size=args.batch_size)
+    memory_manager.close()
+    
+    print(f"✓ Imported {result['added']} memories in {result['seconds']:.2f}s "
+          f"({result['memories_per_sec']:.1f} memories/sec)")
+    print(f"Long-term Memory: {memory_manager.ltm_index.ntotal} stored memories")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,8 @@ Main CLI Demo for Agentcore Memory System
 Knight of the Seven Kingdoms
 """
 
-import os
 from dotenv import load_dotenv
-from core import MemoryManager, KnightAgent
+from core import MemoryManager, KnightAgent, memory_settings_from_env, agent_settings_from_env
 
 # Load environment variables
 load_dotenv()
@@ -40,17 +39,14 @@ def main():
     
     # Initialize memory manager
     print("Initializing memory systems...")
-    stm_max_tokens = int(os.getenv("STM_MAX_TOKENS", 200))
-    collection_name = os.getenv("LTM_COLLECTION_NAME", "knight_memories")
-    
-    memory_manager = MemoryManager(
-        stm_max_tokens=stm_max_tokens,
-        collection_name=collection_name
-    )
+    memory_manager = MemoryManager(**memory_settings_from_env())
     
     # Initialize agent
-    agent = KnightAgent(memory_manager)
-    print("✓ Memory systems initialized")
+    agent = KnightAgent(memory_manager, **agent_settings_from_env())
+    timings = memory_manager.get_readiness()["startup_timings"]
+    print("✓ Memory systems initialized (" + ", ".join(
+        f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()
+    ) + ")")
     print("✓ Knight persona loaded\n")
     
     # Display greeting
@@ -77,14 +73,16 @@ def main():
             
             # Process message
             response = agent.process_message(user_input)
-            print(f"\nSer Duncan: {response}\n")
-            
+            print(f"\nSer Duncan: {response['response']}\n")
+        
         except KeyboardInterrupt:
             print("\n\nSer Duncan: Farewell, friend. May honor guide your path.")
             break
         except Exception as e:
             print(f"\nError: {e}")
             print("Please try again.\n")
+    
+    memory_manager.close()
 
 
 if __name__ == "__main__":
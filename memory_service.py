@@ -0,0 +1,54 @@
+"""
+Shared Memory Service
+Loads the embedding model, tokenizer and long-term memory once and serves them to every web worker
+
+Point workers at it with MEMORY_SERVICE_URL, e.g. unix:///tmp/agentcore-memory.sock or tcp://127.0.0.1:7700.
+Send SIGHUP to hot-swap LTM to the newest snapshot.
+"""
+
+import argparse
+import os
+import signal
+import threading
+from dotenv import load_dotenv
+from core import MemoryManager, MemoryService, KnightAgent, memory_settings_from_env, agent_settings_from_env
+
+# Load environment variables
+load_dotenv()
+
+
+def main():
+    """Warm up in the background and serve requests until SIGINT or SIGTERM"""
+    parser = argparse.ArgumentParser(description="Serve one MemoryManager to many web workers")
+    parser.add_argument("--address", default=os.getenv("MEMORY_SERVICE_URL"),
+                        help="unix:///path/to.sock or tcp://host:port (defaults to MEMORY_SERVICE_URL)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MEMORY_SERVICE_WORKERS", 16)),
+                        help="Threads running requests (defaults to MEMORY_SERVICE_WORKERS)")
+    args = parser.parse_args()
+    if not args.address:
+        parser.error("--address or MEMORY_SERVICE_URL is required")
+    
+    # Bind first so workers can connect (and see "not ready") while the model loads
+    memory_manager = MemoryManager(**memory_settings_from_env(), lazy_load=True)
+    service = MemoryService(memory_manager, args.address, workers=args.workers)
+    agent = KnightAgent(memory_manager, seed_core_memories=False, **agent_settings_from_env())
+    memory_manager.start_warmup(then=agent.initialize_core_memories)
+    
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: memory_manager.start_reload())
+    # shutdown() waits for serve_forever() to return, so it must not run on the main thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=service.shutdown).start())
+    
+    print(f"✓ Memory service listening on {args.address} with {args.workers} workers")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        memory_manager.close()
+    print("✓ Memory service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Concurrency Tests for Agentcore Demo
+A short, bounded run of benchmarks.stress_concurrency: reads, writes, reloads and rebuilds at once
+"""
+
+import threading
+import time
+
+from core import MemoryManager
+from benchmarks.common import synthetic_memories
+from benchmarks.stress_concurrency import Stress, check_final_state
+
+
+SETTINGS = dict(collection_name="stress", embedding_backend="hash", fsync_policy="never", stm_max_tokens=500)
+
+
+def test_reads_writes_and_swaps_lose_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    memory = MemoryManager(compact_every=200, **SETTINGS)
+    stored = list(synthetic_memories(300, seed=7))
+    memory.add_many_to_ltm(stored, batch_size=128)
+    
+    stress = Stress(memory, list(stored), time.monotonic() + 1.5)
+    threads = [threading.Thread(target=stress.reader, args=(i,)) for i in range(4)]
+    threads += [threading.Thread(target=stress.writer, args=(i, 8)) for i in range(2)]
+    threads += [threading.Thread(target=stress.swapper, args=(0,))]
+    threads += [threading.Thread(target=stress.stm_worker, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not any(thread.is_alive() for thread in threads)
+    
+    check_final_state(stress, len(stress.stored))
+    memory.close()
+    assert stress.errors == []
+    assert stress.swaps > 0
+    assert len(stress.stored) > len(stored)
+    
+    # Every acknowledged write is still there after a restart
+    stress.memory = MemoryManager(**SETTINGS)
+    check_final_state(stress, len(stress.stored))
+    stress.memory.close()
+    assert stress.errors == []
@@ -0,0 +1,25 @@
+"""
+Encoder Tests for Agentcore Demo
+Every backend must implement encode() and return unit-length rows
+"""
+
+import numpy as np
+import pytest
+
+from core.encoders import Encoder, HashEncoder
+
+
+def test_encoder_without_encode_cannot_be_built():
+    class Incomplete(Encoder):
+        backend = "incomplete"
+    
+    with pytest.raises(TypeError):
+        Encoder("model")
+    with pytest.raises(TypeError):
+        Incomplete("model")
+
+
+def test_hash_encoder_returns_unit_rows():
+    embeddings = HashEncoder().encode(["Sir Kay keeps the keys", "", "keys keys keys"])
+    assert embeddings.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-6)
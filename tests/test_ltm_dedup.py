@@ -0,0 +1,75 @@
+"""
+LTM Dedup Tests for Agentcore Demo
+A merged near-duplicate must replay from the log to the same row and importance after a crash
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+from core import MemoryManager
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETTINGS = dict(collection_name="dedup", embedding_backend="hash", dedup="merge")
+
+
+def merge_and_kill(base_dir):
+    """Store a memory, merge a more important duplicate into it and exit without close(); returns its row"""
+    script = textwrap.dedent(f"""
+        import json
+        import os
+        from core import MemoryManager
+
+        os.chdir({str(base_dir)!r})
+        memory = MemoryManager(**{SETTINGS!r})
+        memory.add_to_ltm("Sir Kay keeps the keys to the armory", "fact", importance=4)
+        memory.add_to_ltm("Lady Lyonesse rides a grey mare", "fact", importance=5)
+        memory.add_to_ltm("Sir Kay keeps the keys to the armory", "fact", importance=8)
+        print(json.dumps({{"total": memory.ltm_index.ntotal, "merged": memory.dedup_counts["merged"],
+                          "row": memory.ltm_metadata[0]}}))
+        os._exit(0)  # Killed: no close(), the merge exists only as a logged update
+    """)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", script], check=True, env=env, timeout=120,
+                            capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_merge_replays_to_the_same_row_after_a_crash(tmp_path, monkeypatch):
+    before = merge_and_kill(tmp_path)
+    assert before["total"] == 2
+    assert before["merged"] == 1
+    assert before["row"]["importance"] == 8
+    
+    monkeypatch.chdir(tmp_path)
+    # The first restart replays the update from the log, the second reads the compacted snapshot
+    for _ in range(2):
+        memory = MemoryManager(**SETTINGS)
+        assert memory.ltm_index.ntotal == 2
+        assert memory.ltm_metadata[0] == before["row"]
+        results = memory.retrieve_from_ltm("Sir Kay keeps the keys to the armory", n_results=2, min_importance=8)
+        assert [result["content"] for result in results] == ["Sir Kay keeps the keys to the armory"]
+        
+        memory.add_to_ltm("Sir Kay keeps the keys to the armory", "fact", importance=3)
+        assert memory.ltm_index.ntotal == 2
+        assert memory.ltm_metadata[0]["importance"] == 8
+        memory.close()
+        before["row"] = dict(before["row"], timestamp=memory.ltm_metadata[0]["timestamp"])
+
+
+def test_merge_within_one_batch_keeps_the_first_copy(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    memory = MemoryManager(**SETTINGS)
+    memory.add_many_to_ltm([
+        {"content": "The bridge at Camlann is out", "category": "fact", "importance": 3},
+        {"content": "The bridge at Camlann is out", "category": "fact", "importance": 9},
+    ])
+    memory.close()
+    
+    memory = MemoryManager(**SETTINGS)
+    assert memory.ltm_index.ntotal == 1
+    assert memory.ltm_metadata[0]["importance"] == 9
+    memory.close()
@@ -0,0 +1,123 @@
+"""
+LTM Metadata Tests for Agentcore Demo
+Columnar snapshots must read back exactly what was written, including legacy pickles and mapped reopens
+"""
+
+import os
+import pickle
+
+import faiss
+import numpy as np
+
+from core.ltm_index import MMAP_FLAG
+from core.ltm_metadata import ColumnarMetadata, content_hash
+from core.ltm_store import LTMStore
+
+
+DIM = 8
+
+RECORDS = [
+    {"content": "Sir Galahad guards the northern pass", "category": "fact", "importance": 7,
+     "timestamp": "2026-01-01T08:30:00"},
+    {"content": "Der Drache schläft unter dem Berg 🐉", "category": "lore", "importance": 3,
+     "timestamp": "2026-01-02T12:00:00.250000", "source": "import", "tags": ["dragon", "mountain"]},
+    {"content": "", "category": "fact", "importance": 5, "timestamp": "2026-01-03T00:00:00"},
+]
+
+
+def expected(record):
+    """A record as the columnar table returns it, with its content hash filled in"""
+    return {**record, "content_hash": content_hash(record["content"], record["category"])}
+
+
+def write_table(metadata, path):
+    with open(path, 'wb') as f:
+        metadata.write(f)
+    return ColumnarMetadata.open(str(path))
+
+
+def test_round_trip_keeps_every_field(tmp_path):
+    metadata = ColumnarMetadata()
+    metadata.extend(RECORDS)
+    table = write_table(metadata, tmp_path / "table.col")
+    
+    assert len(table) == len(RECORDS)
+    assert list(table) == [expected(record) for record in RECORDS]
+    assert table[-1] == expected(RECORDS[-1])
+    assert list(table.content_hashes()) == [expected(record)["content_hash"] for record in RECORDS]
+    
+    categories, category, importance, _ = table.columns()
+    assert [categories[code] for code in category] == ["fact", "lore", "fact"]
+    assert importance.tolist() == [7, 3, 5]
+
+
+def test_updates_and_new_rows_survive_a_second_write(tmp_path):
+    metadata = ColumnarMetadata()
+    metadata.extend(RECORDS)
+    table = write_table(metadata, tmp_path / "first.col")
+    
+    table.update(0, 9, "2026-03-01T00:00:00")
+    table.append({"content": "A new oath", "category": "oath", "importance": 8, "timestamp": "2026-03-02T00:00:00"})
+    assert table[0]["importance"] == 9
+    
+    reopened = write_table(table, tmp_path / "second.col")
+    assert len(reopened) == 4
+    assert reopened[0] == {**expected(RECORDS[0]), "importance": 9, "timestamp": "2026-03-01T00:00:00"}
+    assert reopened[1] == expected(RECORDS[1])
+    assert reopened[3]["category"] == "oath"
+    assert reopened.columns()[2].tolist() == [9, 3, 5, 8]
+
+
+def test_truncate_drops_mapped_and_tail_rows(tmp_path):
+    metadata = ColumnarMetadata()
+    metadata.extend(RECORDS)
+    table = write_table(metadata, tmp_path / "table.col")
+    table.append(dict(RECORDS[0]))
+    
+    table.truncate(3)
+    assert len(table) == 3
+    table.truncate(1)
+    assert list(table) == [expected(RECORDS[0])]
+
+
+def test_legacy_pickle_is_migrated_to_columnar(tmp_path):
+    vectors = np.arange(len(RECORDS) * DIM, dtype=np.float32).reshape(len(RECORDS), DIM)
+    index = faiss.IndexFlatL2(DIM)
+    index.add(vectors)
+    faiss.write_index(index, str(tmp_path / "legacy_index.faiss"))
+    with open(tmp_path / "legacy_metadata.pkl", 'wb') as f:
+        pickle.dump(RECORDS, f)
+    
+    store = LTMStore("legacy", DIM, base_dir=str(tmp_path))
+    index, metadata = store.load()
+    store.close()
+    assert index.ntotal == len(RECORDS)
+    assert list(metadata) == [expected(record) for record in RECORDS]
+    assert not os.path.exists(tmp_path / "legacy_metadata.pkl")
+    assert os.path.exists(tmp_path / "legacy_metadata.col")
+    
+    # Second start reads the columnar file directly
+    store = LTMStore("legacy", DIM, base_dir=str(tmp_path))
+    index, metadata = store.load()
+    store.close()
+    assert list(metadata) == [expected(record) for record in RECORDS]
+    np.testing.assert_array_equal(index.reconstruct(2), vectors[2])
+
+
+def test_mmap_reopen_folds_the_log_and_maps_the_snapshot(tmp_path):
+    vectors = np.random.default_rng(0).random((len(RECORDS), DIM), dtype=np.float32)
+    store = LTMStore("mapped", DIM, base_dir=str(tmp_path), mmap_index=True)
+    store.load()
+    store.append(0, vectors, [dict(record) for record in RECORDS])
+    store.close()
+    
+    for _ in range(2):
+        store = LTMStore("mapped", DIM, base_dir=str(tmp_path), mmap_index=True)
+        index, metadata = store.load()
+        assert store.index_mapped == (MMAP_FLAG is not None)
+        assert store.snapshot_version > 0
+        assert index.ntotal == len(RECORDS)
+        assert list(metadata) == [expected(record) for record in RECORDS]
+        _, ids = index.search(vectors[1:2], 1)
+        assert ids[0][0] == 1
+        store.close()
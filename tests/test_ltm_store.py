@@ -0,0 +1,189 @@
+"""
+LTM Store Tests for Agentcore Demo
+Writes acknowledged before a crash must come back from the log; torn or corrupt tails must not
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import numpy as np
+import pytest
+
+from core.ltm_store import LTMStore, RECORD_HEADER
+
+
+DIM = 8
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def vector(i):
+    """Distinct, reproducible vector for memory i"""
+    return np.full(DIM, i, dtype=np.float32)
+
+
+def record(i):
+    return {"content": f"memory {i}", "category": "test", "importance": 5, "timestamp": "2026-01-01T00:00:00"}
+
+
+def write_and_kill(base_dir, count, fsync_policy="always", updates=()):
+    """Append count memories (and importance updates) in a child process that exits without close()"""
+    script = textwrap.dedent(f"""
+        import os
+        import numpy as np
+        from core.ltm_store import LTMStore
+
+        store = LTMStore("crash", {DIM}, base_dir={str(base_dir)!r}, fsync_policy={fsync_policy!r})
+        store.load()
+        for i in range({count}):
+            store.append(i, np.full((1, {DIM}), i, dtype=np.float32),
+                         [{{"content": f"memory {{i}}", "category": "test", "importance": 5,
+                           "timestamp": "2026-01-01T00:00:00"}}])
+        for memory_id, importance in {list(updates)!r}:
+            store.append_update(memory_id, {{"importance": importance, "timestamp": "2026-02-01T00:00:00"}})
+        os._exit(0)  # Killed: no close(), no flush beyond what append() acknowledged
+    """)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    subprocess.run([sys.executable, "-c", script], check=True, env=env, timeout=60)
+
+
+def reopen(base_dir, **kwargs):
+    """Load the collection the child left behind and release it again"""
+    store = LTMStore("crash", DIM, base_dir=str(base_dir), **kwargs)
+    index, metadata = store.load()
+    store.close()
+    return index, metadata
+
+
+def segment(base_dir):
+    """The single log segment the child wrote"""
+    segments = sorted(name for name in os.listdir(base_dir) if name.startswith("crash_wal."))
+    assert len(segments) == 1
+    return os.path.join(base_dir, segments[0])
+
+
+@pytest.mark.parametrize("fsync_policy", ["always", "interval", "never"])
+def test_replay_after_kill_keeps_every_acknowledged_write(tmp_path, fsync_policy):
+    write_and_kill(tmp_path, 5, fsync_policy)
+    index, metadata = reopen(tmp_path)
+    assert index.ntotal == 5
+    assert [row["content"] for row in metadata] == [f"memory {i}" for i in range(5)]
+    np.testing.assert_array_equal(index.reconstruct(4), vector(4))
+
+
+def test_torn_tail_drops_only_the_partial_record(tmp_path):
+    write_and_kill(tmp_path, 5)
+    path = segment(tmp_path)
+    os.truncate(path, os.path.getsize(path) - 3)
+    
+    index, metadata = reopen(tmp_path)
+    assert index.ntotal == 4
+    assert metadata[-1]["content"] == "memory 3"
+    np.testing.assert_array_equal(index.reconstruct(3), vector(3))
+
+
+def test_torn_header_drops_only_the_partial_record(tmp_path):
+    write_and_kill(tmp_path, 5)
+    path = segment(tmp_path)
+    record_size = os.path.getsize(path) // 5
+    os.truncate(path, 4 * record_size + RECORD_HEADER.size - 1)
+    
+    index, metadata = reopen(tmp_path)
+    assert index.ntotal == 4
+    assert metadata[-1]["content"] == "memory 3"
+
+
+def test_crc_mismatch_stops_replay_at_the_bad_record(tmp_path):
+    write_and_kill(tmp_path, 5)
+    path = segment(tmp_path)
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    
+    index, metadata = reopen(tmp_path)
+    assert index.ntotal == 4
+    assert metadata[-1]["content"] == "memory 3"
+
+
+def test_writes_after_a_torn_tail_survive_the_next_restart(tmp_path):
+    write_and_kill(tmp_path, 5)
+    path = segment(tmp_path)
+    os.truncate(path, os.path.getsize(path) - 3)
+    
+    store = LTMStore("crash", DIM, base_dir=str(tmp_path))
+    index, _ = store.load()
+    store.append(index.ntotal, vector(4)[None, :], [record(4)])
+    store.close()
+    
+    index, metadata = reopen(tmp_path)
+    assert index.ntotal == 5
+    assert metadata[-1]["content"] == "memory 4"
+
+
+def test_replayed_updates_survive_a_kill(tmp_path):
+    write_and_kill(tmp_path, 3, updates=[(1, 9)])
+    _, metadata = reopen(tmp_path)
+    assert metadata[1]["importance"] == 9
+    assert metadata[1]["timestamp"] == "2026-02-01T00:00:00"
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Count os.fsync calls"""
+    calls = []
+    real_fsync = os.fsync
+    
+    def counting_fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+    
+    monkeypatch.setattr(os, "fsync", counting_fsync)
+    return calls
+
+
+def open_store(tmp_path, fsync_policy, fsync_interval=1.0):
+    store = LTMStore("policy", DIM, base_dir=str(tmp_path), fsync_policy=fsync_policy, fsync_interval=fsync_interval)
+    store.load()
+    return store
+
+
+def test_always_policy_syncs_every_append(tmp_path, fsyncs):
+    store = open_store(tmp_path, "always")
+    for i in range(3):
+        store.append(i, vector(i)[None, :], [record(i)])
+    assert len(fsyncs) == 3
+    store.close()
+
+
+def test_never_policy_leaves_syncing_to_close(tmp_path, fsyncs):
+    store = open_store(tmp_path, "never")
+    for i in range(3):
+        store.append(i, vector(i)[None, :], [record(i)])
+    assert fsyncs == []
+    store.close()
+    assert len(fsyncs) == 1
+
+
+def test_interval_policy_syncs_a_lone_write_without_another_append(tmp_path, fsyncs):
+    store = open_store(tmp_path, "interval", fsync_interval=0.1)
+    store.append(0, vector(0)[None, :], [record(0)])
+    assert fsyncs == []
+    
+    deadline = time.monotonic() + 5.0
+    while not fsyncs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(fsyncs) == 1
+    store.close()
+
+
+def test_interval_policy_batches_writes_within_the_interval(tmp_path, fsyncs):
+    store = open_store(tmp_path, "interval", fsync_interval=60.0)
+    for i in range(10):
+        store.append(i, vector(i)[None, :], [record(i)])
+    assert fsyncs == []
+    store.close()
+    assert len(fsyncs) == 1
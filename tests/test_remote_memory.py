@@ -0,0 +1,49 @@
+"""
+Remote Memory Tests for Agentcore Demo
+A client pointed at a memory service that is not running must fail fast, not hang
+"""
+
+import socket
+import time
+
+import pytest
+
+from core import RemoteMemoryManager, KnightAgent, SessionStore, ChatService, MemoryUnavailableError
+
+
+@pytest.fixture
+def closed_port_url():
+    """tcp:// URL of a local port nothing is listening on"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"tcp://127.0.0.1:{port}"
+
+
+def test_readiness_reports_unreachable_service(closed_port_url):
+    memory = RemoteMemoryManager(closed_port_url, timeout=1.0)
+    readiness = memory.get_readiness()
+    assert readiness["ready"] is False
+    assert readiness["error"].startswith("memory service unreachable")
+    assert readiness["memory_service"]["reachable"] is False
+    memory.close()
+
+
+def test_wait_until_ready_returns_at_once_when_unreachable(closed_port_url):
+    memory = RemoteMemoryManager(closed_port_url, timeout=1.0)
+    start = time.monotonic()
+    assert memory.wait_until_ready() is False
+    assert time.monotonic() - start < 1.0
+    assert memory.warmup_error is not None
+    memory.close()
+
+
+def test_chat_raises_unavailable_instead_of_blocking(closed_port_url):
+    memory = RemoteMemoryManager(closed_port_url, timeout=1.0)
+    agent = KnightAgent(memory, seed_core_memories=False)
+    service = ChatService(memory, agent, SessionStore(memory), ready_timeout=1.0)
+    start = time.monotonic()
+    with pytest.raises(MemoryUnavailableError):
+        service.chat("session", "Hello there")
+    assert time.monotonic() - start < 2.0
+    service.close()